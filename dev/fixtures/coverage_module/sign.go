@@ -0,0 +1,12 @@
+package renamed
+
+// Sign returns -1, 0 or 1 depending on the sign of n
+func Sign(n int) int {
+	if n < 0 {
+		return -1
+	}
+	if n == 0 {
+		return 0
+	}
+	return 1
+}
@@ -0,0 +1,9 @@
+package renamed
+
+import "testing"
+
+func TestSign(t *testing.T) {
+	if Sign(5) != 1 {
+		t.Fatal("expected 1")
+	}
+}
@@ -0,0 +1,113 @@
+# coding: utf-8
+"""
+Writes go1.22.trace, a small execution trace in the format used since Go 1.22,
+for the GolangTraceReader() tests. Run with: python make_trace.py go1.22.trace
+
+Timestamps are in ticks of 1us. The trace contains:
+
+ - goroutine 1 running on M 1, creating goroutine 2
+ - a 100 tick syscall
+ - a 50 tick "GC sweep termination" stop-the-world pause, with a stack
+ - a 20 tick "trace start" stop-the-world pause, without a stack
+ - goroutine 1 blocking on a channel receive for 314 ticks
+ - a GC cycle running for 499 ticks, ending in the second generation
+"""
+
+from __future__ import unicode_literals, division, absolute_import, print_function
+
+import sys
+
+
+NO_M = 2 ** 64 - 1
+
+
+def uvarint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return out
+
+
+def event(kind, *args):
+    out = bytearray([kind])
+    for arg in args:
+        out += uvarint(arg)
+    return out
+
+
+def batch(generation, m, ts, data):
+    return bytearray([1]) + uvarint(generation) + uvarint(m) + uvarint(ts) + uvarint(len(data)) + data
+
+
+def strings(*entries):
+    out = bytearray([4])
+    for string_id, value in entries:
+        value = value.encode('utf-8')
+        out += bytearray([5]) + uvarint(string_id) + uvarint(len(value)) + value
+    return out
+
+
+def stacks(*entries):
+    out = bytearray([2])
+    for stack_id, frames in entries:
+        out += event(3, stack_id, len(frames), *[value for frame in frames for value in frame])
+    return out
+
+
+def main(path):
+    trace = bytearray(b'go 1.22 trace\x00\x00\x00')
+
+    trace += batch(1, 1, 1000, (
+        # GoStatus g=1 m=1 running
+        event(25, 0, 1, 1, 2) +
+        # GoCreate new_g=2
+        event(14, 10, 2, 0, 1) +
+        # GoSyscallBegin, GoSyscallEnd
+        event(22, 5, 1, 2) + event(23, 100) +
+        # STWBegin kind="GC sweep termination" stack=4, STWEnd
+        event(26, 1, 11, 4) + event(27, 50) +
+        # STWBegin kind="trace start" stack=0, STWEnd
+        event(26, 5, 13, 0) + event(27, 20) +
+        # GoBlock reason="chan receive" stack=3
+        event(20, 5, 10, 3)
+    ))
+    trace += batch(1, 2, 1000, (
+        # GoStart g=2, GoUnblock g=1, GCBegin seq=1
+        event(16, 10, 2, 1) + event(21, 500, 1, 1, 0) + event(29, 1, 1, 0)
+    ))
+    trace += batch(1, NO_M, 0, strings(
+        (10, 'chan receive'),
+        (11, 'GC sweep termination'),
+        (13, 'trace start'),
+        (20, 'main.f'),
+        (21, '/w/x_test.go'),
+        (22, 'runtime.chanrecv1'),
+        (23, '/go/src/runtime/chan.go'),
+        (24, 'syscall.read'),
+        (25, '/go/src/syscall/x.go'),
+    ))
+    trace += batch(1, NO_M, 0, stacks(
+        (2, [(100, 24, 25, 10), (101, 20, 21, 5)]),
+        (3, [(102, 22, 23, 7), (101, 20, 21, 5)]),
+        (4, [(103, 20, 21, 9)]),
+    ))
+    # Frequency of 1,000,000 ticks per second
+    trace += batch(1, NO_M, 0, event(8, 1000000))
+
+    trace += batch(2, 2, 2000, (
+        # GCEnd seq=1, GoStart g=2, GoDestroy
+        event(30, 10, 1) + event(16, 1, 2, 3) + event(17, 5)
+    ))
+    trace += batch(2, NO_M, 0, event(8, 1000000))
+
+    with open(path, 'wb') as f:
+        f.write(bytes(trace))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,12 @@
+package failing
+
+import (
+	"testing"
+)
+
+func TestPasses(t *testing.T) {
+}
+
+func TestFails(t *testing.T) {
+	t.Errorf("this test always fails")
+}
@@ -34,3 +34,12 @@ func BenchmarkRuneLenResumeNew(b *testing.B) {
 		RuneLen("résumé – new")
 	}
 }
+
+func FuzzRuneLen(f *testing.F) {
+	f.Add("résumé")
+	f.Fuzz(func(t *testing.T, s string) {
+		if RuneLen(s) > len(s) {
+			t.Errorf("RuneLen(%q) > %d", s, len(s))
+		}
+	})
+}
@@ -0,0 +1,20 @@
+package main
+
+import (
+	"fmt"
+	"sync"
+)
+
+func main() {
+	counter := 0
+	var wg sync.WaitGroup
+	for i := 0; i < 10; i++ {
+		wg.Add(1)
+		go func() {
+			counter++
+			wg.Done()
+		}()
+	}
+	wg.Wait()
+	fmt.Println(counter)
+}
@@ -9,6 +9,11 @@ import time
 import re
 import shutil
 import os
+import socket
+import json
+import tempfile
+import zipfile
+import zlib
 
 import sublime
 
@@ -20,11 +25,12 @@ if sys.version_info < (3,):
 else:
     from queue import Queue
 
-from .mocks import GolangBuildMock
+from .mocks import GolangBuildMock, golang_build
 
 
 TEST_GOPATH = path.join(path.dirname(__file__), 'go_projects')
 TEST_GOPATH2 = path.join(path.dirname(__file__), 'go_projects2')
+FIXTURES_DIR = path.join(path.dirname(__file__), 'fixtures')
 VIEW_SETTINGS = {
     'GOPATH': TEST_GOPATH,
     'GOOS': None,
@@ -41,7 +47,7 @@ class GolangBuildTests(unittest.TestCase):
 
     def setUp(self):
         skip_entries = {}
-        skip_entries[TEST_GOPATH] = set(['.git-keep', 'good', 'bad', 'runnable'])
+        skip_entries[TEST_GOPATH] = set(['.git-keep', 'good', 'bad', 'runnable', 'failing', 'racy'])
         skip_entries[TEST_GOPATH2] = set(['.git-keep', 'runnable2'])
 
         for gopath in (TEST_GOPATH, TEST_GOPATH2):
@@ -96,6 +102,44 @@ class GolangBuildTests(unittest.TestCase):
             self.assertEqual('success', result)
             self.assertTrue(confirm_user('Did "go build" succeed and print all commands?'))
 
+    def test_build_profile(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'build_profile'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Did "go build" succeed and list the compile time of package "good"?'))
+
+    def test_build_folder_only(self):
+        ensure_not_ui_thread()
+
+        result_queue = Queue()
+
+        def _run_build():
+            sublime.run_command('new_window')
+            window = sublime.active_window()
+            window.set_project_data({
+                'folders': [{'path': path.join(TEST_GOPATH, 'src', 'good')}],
+                'settings': {'golang': VIEW_SETTINGS}
+            })
+            window.run_command('golang_build')
+
+            def _close_window():
+                if not result_queue.empty():
+                    window.run_command('close_window')
+                    return
+                sublime.set_timeout(_close_window, 100)
+            sublime.set_timeout(_close_window, 100)
+
+        sublime.set_timeout(_run_build, 50)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+
     def test_install_flags_from_view_settings(self):
         ensure_not_ui_thread()
 
@@ -138,6 +182,445 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go test" succeed?'))
 
+    def test_test_sharded(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'test_sharded'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['test_sharded:shards'] = 2
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Did "go test" succeed and list the predicted and actual time of the shard?'))
+
+    def test_flaky(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'failing', 'failing_test.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'flaky'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['flaky:runs'] = 4
+        custom_view_settings['flaky:shards'] = 2
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+        self.assertTrue(confirm_user('Was TestFails reported as failing every one of 4 runs?'))
+
+    def test_flaky_history(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'failing', 'failing_test.go')
+        runs = golang_build._history_runs()
+        last_id = runs[0]['id'] if runs else 0
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'flaky'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['flaky:runs'] = 4
+        custom_view_settings['flaky:shards'] = 2
+
+        open_file(file_path, custom_view_settings, _run_build)
+        for _ in range(100):
+            new_runs = [run for run in golang_build._history_runs() if run['id'] > last_id]
+            if new_runs:
+                break
+            time.sleep(0.1)
+        # Give a second process, if recorded separately, time to show up
+        time.sleep(1)
+        new_runs = [run for run in golang_build._history_runs() if run['id'] > last_id]
+
+        # Both processes and the summary are a single run
+        self.assertEqual(1, len(new_runs))
+        self.assertEqual('flaky', new_runs[0]['task'])
+        self.assertEqual('error', new_runs[0]['result'])
+        history_path = golang_build._storage_path('history', '%d.zlib' % new_runs[0]['id'])
+        with open(history_path, 'rb') as f:
+            output = zlib.decompress(f.read()).decode('utf-8')
+        self.assertEqual(2, output.count('> Command: '))
+        self.assertTrue('> Runs: 4 of each test across 2 processes' in output)
+
+    def test_fuzz(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len_test.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'fuzz'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['fuzz:fuzztime'] = '5s'
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was FuzzRuneLen fuzzed with a single status line showing execs/sec?'))
+
+    def test_coverage(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'coverage'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was 100.0% coverage reported for package "good"?'))
+
+    def test_coverage_module_path(self):
+        ensure_not_ui_thread()
+
+        # The module path, example.com/renamed, does not match the directory
+        file_path = path.join(FIXTURES_DIR, 'coverage_module', 'sign.go')
+
+        def _run_build(view, result_queue):
+            result_queue.put(view)
+            view.window().run_command('golang_build', {'task': 'coverage'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        view = result_queue.get(timeout=5)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+        time.sleep(0.5)
+
+        lines = [view.rowcol(region.begin())[0] + 1 for region in view.get_regions('golang_build_coverage')]
+        self.assertEqual(list(range(5, 11)), lines)
+        sublime.set_timeout(lambda: view.window().run_command('golang_build_coverage_clear'), 1)
+
+    def test_rerun_failures(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'failing', 'failing_test.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'test'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+
+        def _rerun():
+            sublime.active_window().run_command('golang_build_rerun_failures')
+        sublime.set_timeout(_rerun, 1)
+
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+        self.assertTrue(confirm_user('Was "go test" run again with -run \'^(TestFails)$\'?'))
+
+    def test_history(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'failing', 'failing_test.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'test'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+
+        def _search():
+            sublime.active_window().run_command('golang_build_history', {'query': 'TestFails'})
+        sublime.set_timeout(_search, 1)
+
+        self.assertTrue(confirm_user(
+            'Was the failed run listed, and did selecting it open its output in a read-only view?'
+        ))
+
+    def test_jsonl_log(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+        log_path = path.join(TEST_GOPATH, 'build.jsonl')
+        if path.exists(log_path):
+            os.remove(log_path)
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'build'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['log:jsonl'] = log_path
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+
+        # Records are written in batches by a background thread
+        time.sleep(2)
+        with open(log_path, 'rb') as f:
+            records = [json.loads(line.decode('utf-8')) for line in f.read().splitlines()]
+        os.remove(log_path)
+        self.assertEqual('header', records[0]['type'])
+        self.assertEqual(path.dirname(file_path), records[0]['cwd'])
+        self.assertEqual('footer', records[-1]['type'])
+        self.assertEqual('success', records[-1]['result'])
+        self.assertEqual(1, len(set(record['run'] for record in records)))
+
+    def test_metrics_file(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+        metrics_path = path.join(TEST_GOPATH, 'metrics.prom')
+        if path.exists(metrics_path):
+            os.remove(metrics_path)
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'build'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['metrics:file'] = metrics_path
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+
+        with open(metrics_path, 'rb') as f:
+            metrics = f.read().decode('utf-8')
+        os.remove(metrics_path)
+        self.assertTrue(re.search(r'^golang_build_builds_total\{task="build",result="success"\} \d+$', metrics, re.M))
+        self.assertTrue(re.search(r'^golang_build_duration_seconds_count\{task="build"\} \d+$', metrics, re.M))
+
+    def test_metrics_server(self):
+        if sys.version_info < (3,):
+            from urllib2 import urlopen
+        else:
+            from urllib.request import urlopen
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        url = 'http://127.0.0.1:%d/metrics' % port
+
+        metrics = golang_build.GolangMetrics()
+        metrics.configure(None, port)
+        metrics.record('build', 'success', 1.5, 0.25, 10)
+        try:
+            body = urlopen(url).read().decode('utf-8')
+        finally:
+            metrics.close()
+        self.assertTrue('golang_build_builds_total{task="build",result="success"} 1\n' in body)
+        self.assertRaises(IOError, urlopen, url)
+
+        # The port is released, so the package can serve on it once reloaded
+        metrics = golang_build.GolangMetrics()
+        metrics.configure(None, port)
+        try:
+            body = urlopen(url).read().decode('utf-8')
+        finally:
+            metrics.close()
+        self.assertTrue('golang_build_builds_total' in body)
+
+    def test_build_qos(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'build', 'qos': 'idle'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was "go build" run with "-p 1", and did the footer show "QoS: idle"?'))
+
+    def test_qos_may_download(self):
+        def _env(**values):
+            env = {}
+            for name, value in values.items():
+                golang_build._set_env(env, name, value)
+            return env
+
+        self.assertTrue(golang_build._may_download(_env()))
+        self.assertTrue(golang_build._may_download(_env(GOPROXY='https://proxy.golang.org', GOFLAGS='-mod=mod')))
+        self.assertFalse(golang_build._may_download(_env(GOPROXY='off')))
+        self.assertFalse(golang_build._may_download(_env(GOFLAGS='-v -mod=vendor')))
+
+    def test_build_progress(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+        events = []
+
+        def _record_event(package_name, event_name, payload):
+            events.append((event_name, payload))
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'benchmark'})
+
+        package_events.listen('Golang Build', _record_event)
+        try:
+            result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+            result = wait_build(result_queue)
+        finally:
+            package_events.unlisten('Golang Build', _record_event)
+        self.assertEqual('success', result)
+
+        progress = [payload for event_name, payload in events if event_name == 'build_progress']
+        self.assertEqual(['good'], [payload.package for payload in progress if payload.action == 'finished'])
+        self.assertEqual('benchmark', progress[0].task)
+        complete = [payload for event_name, payload in events if event_name == 'build_complete']
+        self.assertEqual('benchmark', complete[0].task)
+
+    def test_run_race(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'racy', 'main.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'run_race'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('error', result)
+        self.assertTrue(confirm_user('Was each data race displayed once, with clickable frames in main.go?'))
+
+    def test_race_log_dir(self):
+        class _Window():
+            def id(self):
+                return 1
+
+        temp_dir = tempfile.mkdtemp()
+        original_tempdir = tempfile.tempdir
+        try:
+            tempfile.tempdir = temp_dir
+            log_dir = golang_build._race_log_dir(_Window())
+            self.assertEqual(path.join(temp_dir, 'golang_build', 'race', '1'), log_dir)
+
+            # GORACE options are separated by whitespace
+            tempfile.tempdir = path.join(temp_dir, 'with space')
+            os.makedirs(tempfile.tempdir)
+            log_dir = golang_build._race_log_dir(_Window())
+            if sys.platform == 'win32':
+                self.assertTrue(log_dir is None or ' ' not in log_dir)
+            else:
+                self.assertEqual(None, log_dir)
+        finally:
+            tempfile.tempdir = original_tempdir
+            shutil.rmtree(temp_dir)
+
+    def test_race_handler(self):
+        log_dir = golang_build._temp_path('race', 'test')
+        for entry in os.listdir(log_dir):
+            os.remove(path.join(log_dir, entry))
+
+        class _Panel():
+            def __init__(self):
+                self.output = ''
+
+            def write(self, string, content_separator=None, event=None):
+                self.output += string
+
+        report = (
+            '==================\n'
+            'WARNING: DATA RACE\n'
+            'Write at 0x00c0000a4010 by goroutine %d:\n'
+            '  main.main.func1()\n'
+            '      /src/app/main.go:10 +0x44\n'
+            '\n'
+            'Previous read at 0x00c0000a4010 by main goroutine:\n'
+            '  main.main()\n'
+            '      /src/app/main.go:13 +0x88\n'
+            '==================\n'
+        )
+        with open(path.join(log_dir, 'race.1'), 'wb') as f:
+            f.write(''.join(report % goroutine for goroutine in range(3)).encode('utf-8'))
+
+        # The log files are only polled once the process has started
+        threads = threading.active_count()
+        panel = _Panel()
+        handler = golang_build.GolangRaceHandler(panel, log_dir)
+        self.assertEqual(threads, threading.active_count())
+
+        handler.start(None)
+        summary = handler.complete(None)
+        self.assertEqual(threads, threading.active_count())
+        self.assertEqual(1, panel.output.count('> Data race #'))
+        self.assertTrue(summary.startswith('> Data races: 1 unique, 3 reports\n'))
+        self.assertTrue('#1: 3 reports - main.main.func1() at main.go:10' in summary)
+
+    def test_test_at_cursor(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'failing', 'failing_test.go')
+
+        def _run_build(view, result_queue):
+            # Place the cursor inside of TestPasses()
+            view.sel().clear()
+            view.sel().add(sublime.Region(view.text_point(7, 0)))
+            view.window().run_command('golang_build_test_at_cursor')
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was "go test" run with -run \'^TestPasses$\'?'))
+
+    def test_test_at_cursor_non_test_file(self):
+        ensure_not_ui_thread()
+
+        # Line 7 of rune_len.go is also inside TestRuneLen() in rune_len_test.go
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            messages = []
+            error_message = golang_build.sublime.error_message
+            golang_build.sublime.error_message = messages.append
+            try:
+                view.sel().clear()
+                view.sel().add(sublime.Region(view.text_point(6, 0)))
+                view.window().run_command('golang_build_test_at_cursor')
+            finally:
+                golang_build.sublime.error_message = error_message
+            result_queue.put(messages)
+
+        messages = open_file(file_path, VIEW_SETTINGS, _run_build).get(timeout=5)
+        self.assertEqual(1, len(messages))
+        self.assertTrue('not inside of a Test' in messages[0])
+
+    def test_package_test_functions(self):
+        package_dir = golang_build._temp_path('test_index')
+        for entry in os.listdir(package_dir):
+            os.remove(path.join(package_dir, entry))
+
+        def _write(name, source, mtime):
+            file_name = path.join(package_dir, name)
+            with open(file_name, 'wb') as f:
+                f.write(source.encode('utf-8'))
+            os.utime(file_name, (mtime, mtime))
+            return file_name
+
+        a_path = _write('a_test.go', 'package x\n\nfunc TestA(t *testing.T) {\n}\n', 1000)
+        b_path = _write('b_test.go', 'package x\n\nfunc BenchmarkB(b *testing.B) {\n}\n', 1000)
+        _write('c.go', 'package x\n\nfunc TestNotATestFile() {\n}\n', 1000)
+
+        functions = golang_build._package_test_functions(package_dir)
+        self.assertEqual(set([a_path, b_path]), set(functions.keys()))
+        self.assertEqual(['TestA'], [function['name'] for function in functions[a_path]])
+        self.assertEqual([(3, 4)], [(function['start'], function['end']) for function in functions[a_path]])
+        self.assertEqual(['BenchmarkB'], [function['name'] for function in functions[b_path]])
+
+        # Unmodified files are not read again
+        again = golang_build._package_test_functions(package_dir)
+        self.assertTrue(again[a_path] is functions[a_path])
+
+        _write('a_test.go', 'package x\n\nfunc TestA2(t *testing.T) {\n}\n', 2000)
+        os.remove(b_path)
+        functions = golang_build._package_test_functions(package_dir)
+        self.assertEqual([a_path], list(functions.keys()))
+        self.assertEqual(['TestA2'], [function['name'] for function in functions[a_path]])
+        self.assertEqual([a_path], list(golang_build._TEST_INDEX[package_dir].keys()))
+
     def test_benchmark(self):
         ensure_not_ui_thread()
 
@@ -151,6 +634,102 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go test" succeed running all benchmarks?'))
 
+    def test_benchmark_budgets(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'benchmark'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['benchmark:budgets'] = {'BenchmarkRuneLen.*': {'ns/op': 0.001}}
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+        self.assertTrue(confirm_user('Were both benchmarks listed as budget violations?'))
+
+    def test_benchmark_cpu_counts(self):
+        env = {}
+        self.assertEqual(None, golang_build._benchmark_cpu_counts(['go', 'test', '-bench=.'], env))
+        self.assertEqual([1, 4], golang_build._benchmark_cpu_counts(['go', 'test', '-cpu', '1,4'], env))
+        self.assertEqual([2], golang_build._benchmark_cpu_counts(['go', 'test', '-cpu=2', './...'], env))
+
+        golang_build._set_env(env, 'GOMAXPROCS', '8')
+        self.assertEqual([8], golang_build._benchmark_cpu_counts(['go', 'test', '-bench=.'], env))
+
+        # Only the GOMAXPROCS of the run is removed from sub-benchmark names
+        name = 'BenchmarkEncode/size-1024-8'
+        cpu_counts = golang_build._benchmark_cpu_counts(['go', 'test', '-bench=.'], env)
+        self.assertEqual(('BenchmarkEncode/size-1024', 8), golang_build._split_benchmark_procs(name, cpu_counts))
+        cpu_counts = golang_build._benchmark_cpu_counts(['go', 'test', '-cpu', '4'], env)
+        self.assertEqual(('BenchmarkEncode/size-1024-8', 1), golang_build._split_benchmark_procs(name, cpu_counts))
+
+    def test_test_trace(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'test_trace'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was a trace summary displayed with goroutine, blocking and GC totals?'))
+
+    def test_trace_reader(self):
+        # See fixtures/make_trace.py for the events of the trace
+        reader = golang_build.GolangTraceReader('/w')
+        reader.read(path.join(FIXTURES_DIR, 'go1.22.trace'))
+
+        self.assertEqual(0, reader.skipped)
+        self.assertFalse(reader.truncated)
+        self.assertEqual(22, reader.version)
+        self.assertEqual(1000.0, reader.tick_ns)
+        self.assertEqual(1, reader.created)
+        self.assertEqual(2, reader.peak)
+        self.assertEqual({'gc': [50, 1, 50], 'other': [20, 1, 20]}, reader.stw)
+        self.assertEqual({'syscall': [100, 1], 'sync': [314, 1]}, reader.blocked)
+        self.assertEqual((1, 499), (reader.gc_count, reader.gc_ticks))
+
+        longest = [event for _, _, event in sorted(reader.longest, reverse=True)]
+        self.assertEqual(['sync', 'syscall'], [event['category'] for event in longest])
+        self.assertEqual('chan receive', longest[0]['reason'])
+
+    def test_benchmark_scaling(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'benchmark_scaling'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['benchmark_scaling:max_cpu'] = 2
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was a scaling table displayed for 1 and 2 CPUs?'))
+
+    def test_benchmark_compare(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build_benchmark_compare', {'revision': 'HEAD'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['benchmark_compare:rounds'] = 2
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue, timeout=30)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was a comparison of BenchmarkRuneLenResume against HEAD displayed?'))
+
     def test_benchmark_with_bench_flag(self):
         ensure_not_ui_thread()
 
@@ -183,6 +762,32 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go test" succeed running benchmarks with memory allocation stats?'))
 
+    def test_benchmark_profile(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'benchmark_profile'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Were CPU and memory profile tables listing good.RuneLen displayed?'))
+
+    def test_read_pprof_invalid(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            profile_path = path.join(temp_dir, 'cpu.pprof')
+            # A fixed64 field with only 2 of its 8 bytes, a varint field
+            # where a message is expected, and a truncated string
+            for data in (b'\x09\x01\x02', b'\x08\x01', b'\x32\x05ab'):
+                with open(profile_path, 'wb') as f:
+                    f.write(data)
+                self.assertRaises(ValueError, golang_build._read_pprof, profile_path)
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_run(self):
         ensure_not_ui_thread()
 
@@ -196,6 +801,37 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go run" succeed?'))
 
+    def test_run_telemetry(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'runnable', 'main.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'run'})
+
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['run:telemetry'] = True
+        custom_view_settings['run:schedtrace'] = 1
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Was a "> Runtime:" summary displayed instead of the SCHED lines?'))
+
+    def test_run_telemetry_exec(self):
+        wrapper = 'env GODEBUG=gctrace=1'
+        if sys.platform == 'win32':
+            wrapper = 'cmd /c set GODEBUG=gctrace=1&&'
+
+        flags = golang_build._telemetry_exec_flags(['-v', 'main.go', '-exec'], 'gctrace=1')
+        self.assertEqual(['-exec', wrapper, '-v', 'main.go', '-exec'], flags)
+
+        flags = golang_build._telemetry_exec_flags(['-exec', 'wrap', 'main.go'], 'gctrace=1')
+        self.assertEqual(['-exec', wrapper + ' wrap', 'main.go'], flags)
+
+        flags = golang_build._telemetry_exec_flags(['-exec=wrap', 'main.go'], 'gctrace=1')
+        self.assertEqual(['-exec=' + wrapper + ' wrap', 'main.go'], flags)
+
     def test_run_with_file_path_flag_absolute(self):
         ensure_not_ui_thread()
 
@@ -258,6 +894,19 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go install" succeed?'))
 
+    def test_binary_size(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'runnable', 'main.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build', {'task': 'install'})
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('success', result)
+        self.assertTrue(confirm_user('Were the largest packages of the "runnable" executable listed?'))
+
     def test_cross_compile(self):
         ensure_not_ui_thread()
 
@@ -338,6 +987,303 @@ class GolangBuildTests(unittest.TestCase):
         self.assertEqual('success', result)
         self.assertTrue(confirm_user('Did "go get" succeed for "github.com/golang/example/hello"?'))
 
+    def test_get_urls(self):
+        ensure_not_ui_thread()
+
+        proxy_dir = path.join(TEST_GOPATH, 'pkg', 'goproxy')
+        write_goproxy(proxy_dir, ['example.com/hello', 'example.com/world'])
+
+        module_dir = path.join(TEST_GOPATH, 'src', 'getter')
+        os.makedirs(module_dir)
+        with open(path.join(module_dir, 'go.mod'), 'wb') as f:
+            f.write(b'module getter\n\ngo 1.16\n')
+        file_path = path.join(module_dir, 'main.go')
+        with open(file_path, 'wb') as f:
+            f.write(b'package main\n\nfunc main() {}\n')
+
+        settings = VIEW_SETTINGS.copy()
+        settings.update({
+            'GOPROXY': 'file:///' + proxy_dir.replace(os.sep, '/').lstrip('/'),
+            'GOSUMDB': 'off',
+            # Allows setUp() to remove the module cache
+            'GOFLAGS': '-modcacherw',
+        })
+
+        windows = []
+
+        def _run_build(view, result_queue):
+            windows.append(view.window())
+            view.window().run_command('golang_build_get', {
+                'urls': ['example.com/hello', 'example.com/world']
+            })
+
+        result_queue = open_file(file_path, settings, _run_build)
+        result = wait_build(result_queue, timeout=15)
+        self.assertEqual('success', result)
+
+        panel = golang_build._get_panel(windows[0]).panel
+        for _ in range(20):
+            output = panel.substr(sublime.Region(0, panel.size()))
+            if '> Get: ' in output:
+                break
+            time.sleep(0.1)
+        self.assertTrue('> Get: 2 of 2 succeeded' in output)
+        with open(path.join(module_dir, 'go.mod'), 'rb') as f:
+            go_mod = f.read().decode('utf-8')
+        self.assertTrue('example.com/hello v1.0.0' in go_mod)
+        self.assertTrue('example.com/world v1.0.0' in go_mod)
+
+    def test_cache_usage(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.window().run_command('golang_build_cache_usage')
+
+        open_file(file_path, VIEW_SETTINGS, _run_build)
+        time.sleep(2)
+        self.assertTrue(confirm_user('Was the size of the build and module caches displayed?'))
+
+    def test_cache_trim(self):
+        # A unicode path, since names are only listed as unicode strings
+        temp_dir = golang_build._temp_path('cache_trim')
+        golang_build._remove_tree(temp_dir)
+        build_root = path.join(temp_dir, 'build')
+        module_root = path.join(temp_dir, 'mod')
+
+        def _write(root, relative_path, size, last_used):
+            full_path = path.join(root, *relative_path.split('/'))
+            if not path.exists(path.dirname(full_path)):
+                os.makedirs(path.dirname(full_path))
+            with open(full_path, 'wb') as f:
+                f.write(b'x' * size)
+            os.utime(full_path, (last_used, last_used))
+            return full_path
+
+        def _make_read_only(folder):
+            # The go tool extracts modules into read-only directories
+            for dirpath, dirnames, filenames in os.walk(folder, topdown=False):
+                for name in filenames:
+                    os.chmod(path.join(dirpath, name), 0o444)
+                os.chmod(dirpath, 0o555)
+
+        try:
+            _write(build_root, 'README', 10, 500)
+            _write(build_root, 'ab/ab01-a', 100, 1000)
+            _write(build_root, 'cd/cd01-d', 200, 4000)
+
+            toml_zip = _write(module_root, 'cache/download/github.com/!burnt!sushi/toml/@v/v1.0.0.zip', 300, 3000)
+            _write(module_root, 'cache/download/github.com/!burnt!sushi/toml/@v/list', 5, 3000)
+            _write(module_root, 'cache/download/github.com/!burnt!sushi/toml/@v/list.lock', 0, 3000)
+            _write(module_root, 'cache/download/github.com/!burnt!sushi/toml/@v/v1.0.0.lock', 0, 3000)
+            _write(module_root, 'github.com/!burnt!sushi/toml@v1.0.0/decode.go', 400, 3000)
+            _write(module_root, 'example.com/old@v0.1.0/old.go', 50, 2000)
+            _make_read_only(path.join(module_root, 'github.com', '!burnt!sushi', 'toml@v1.0.0'))
+            _make_read_only(path.join(module_root, 'example.com', 'old@v0.1.0'))
+
+            results = []
+            for kind, root in (('build', build_root), ('module', module_root)):
+                scanner = golang_build.GolangCacheScanner(root, {})
+                results.append((kind, root, golang_build._cache_entries(kind, scanner.scan()), scanner))
+            build_entries = results[0][2]
+            module_entries = results[1][2]
+
+            self.assertEqual(set(['', 'ab/ab01-a', 'cd/cd01-d']), set(build_entries.keys()))
+            self.assertEqual(10, build_entries['']['size'])
+
+            # Downloads and extracted files are one entry, with "!" unescaped.
+            # The list files of the module belong to no version.
+            toml = module_entries['github.com/BurntSushi/toml@v1.0.0']
+            self.assertEqual(700, toml['size'])
+            self.assertEqual(3000, toml['last_used'])
+            self.assertEqual(
+                set([
+                    'cache/download/github.com/!burnt!sushi/toml/@v/v1.0.0.zip',
+                    'cache/download/github.com/!burnt!sushi/toml/@v/v1.0.0.lock',
+                    'github.com/!burnt!sushi/toml@v1.0.0',
+                ]),
+                toml['paths']
+            )
+            self.assertEqual(set(['', 'github.com/BurntSushi/toml@v1.0.0', 'example.com/old@v0.1.0']),
+                             set(module_entries.keys()))
+            self.assertEqual(5, module_entries['']['size'])
+
+            # Least recently used first, across both caches
+            candidates = golang_build._cache_trim_candidates(results, 215)
+            self.assertEqual(
+                [
+                    (build_root, 'ab/ab01-a'),
+                    (module_root, 'example.com/old@v0.1.0'),
+                    (module_root, 'github.com/BurntSushi/toml@v1.0.0'),
+                ],
+                [(root, key) for root, key, _ in candidates]
+            )
+
+            # The go tool used the toml module since the scan
+            os.utime(toml_zip, (5000, 5000))
+            self.assertEqual((2, 150), golang_build._trim_caches(candidates))
+            self.assertFalse(path.exists(path.join(build_root, 'ab', 'ab01-a')))
+            self.assertFalse(path.exists(path.join(module_root, 'example.com', 'old@v0.1.0')))
+            self.assertTrue(path.exists(toml_zip))
+            self.assertTrue(path.exists(path.join(module_root, 'github.com', '!burnt!sushi', 'toml@v1.0.0')))
+            self.assertTrue(path.exists(path.join(build_root, 'README')))
+        finally:
+            golang_build._remove_tree(temp_dir)
+
+    def test_prefetch_file_proxy(self):
+        ensure_not_ui_thread()
+
+        proxy_dir = path.join(TEST_GOPATH, 'pkg', 'goproxy')
+        write_goproxy(proxy_dir, ['example.com/hello'])
+
+        module_dir = path.join(TEST_GOPATH, 'src', 'prefetched')
+        os.makedirs(module_dir)
+        go_mod_path = path.join(module_dir, 'go.mod')
+        with open(go_mod_path, 'wb') as f:
+            f.write(b'module prefetched\n\ngo 1.16\n')
+
+        settings = VIEW_SETTINGS.copy()
+        settings.update({
+            # A plain directory path, which is rewritten to a file:// URL
+            'GOPROXY': proxy_dir,
+            'GOSUMDB': 'off',
+            # Allows setUp() to remove the module cache
+            'GOFLAGS': '-modcacherw',
+            'prefetch:enabled': True,
+        })
+
+        def _save_go_mod(window, result_queue):
+            view = window.open_file(go_mod_path)
+
+            def _when_loaded():
+                if view.is_loading():
+                    sublime.set_timeout(_when_loaded, 50)
+                    return
+                view.run_command('append', {'characters': '\nrequire example.com/hello v1.0.0\n'})
+                view.run_command('save')
+                result_queue.put(window)
+            _when_loaded()
+
+        window = open_folder(module_dir, settings, _save_go_mod).get(timeout=5)
+        module_file = path.join(TEST_GOPATH, 'pkg', 'mod', 'example.com', 'hello@v1.0.0', 'hello.go')
+        for _ in range(100):
+            if path.exists(module_file):
+                break
+            time.sleep(0.1)
+        close_window(window)
+        self.assertTrue(path.exists(module_file))
+
+    def test_normalize_goproxy(self):
+        env = {}
+        golang_build._set_env(env, 'GOPROXY', 'https://proxy.golang.org|%s,off' % TEST_GOPATH)
+        golang_build._normalize_goproxy(env)
+
+        url = 'file:///' + TEST_GOPATH.replace(os.sep, '/').lstrip('/')
+        self.assertEqual('https://proxy.golang.org|%s,off' % url, golang_build._get_env(env, 'GOPROXY'))
+
+    def test_git_head(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            def _write(relative_path, contents):
+                full_path = path.join(temp_dir, *relative_path.split('/'))
+                if not path.exists(path.dirname(full_path)):
+                    os.makedirs(path.dirname(full_path))
+                with open(full_path, 'wb') as f:
+                    f.write(contents.encode('utf-8'))
+
+            main_commit = '1' * 40
+            feature_commit = '2' * 40
+            _write('main/.git/HEAD', 'ref: refs/heads/main\n')
+            _write('main/.git/refs/heads/main', main_commit + '\n')
+            _write('main/.git/packed-refs', '# pack-refs with: peeled\n%s refs/heads/feature\n' % feature_commit)
+            _write('main/pkg/sub/x.go', 'package sub\n')
+            self.assertEqual(main_commit, golang_build._git_head(path.join(temp_dir, 'main', 'pkg', 'sub')))
+
+            # A worktree has a .git file, and its branches are in the main git dir
+            _write('main/.git/worktrees/wt/HEAD', 'ref: refs/heads/feature\n')
+            _write('main/.git/worktrees/wt/commondir', '../..\n')
+            _write('wt/.git', 'gitdir: ../main/.git/worktrees/wt\n')
+            self.assertEqual(feature_commit, golang_build._git_head(path.join(temp_dir, 'wt')))
+
+            _write('main/.git/worktrees/wt/HEAD', main_commit + '\n')
+            self.assertEqual(main_commit, golang_build._git_head(path.join(temp_dir, 'wt')))
+
+            # A branch with no commits yet
+            _write('main/.git/HEAD', 'ref: refs/heads/empty\n')
+            self.assertEqual('refs/heads/empty', golang_build._git_head(path.join(temp_dir, 'main')))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_prewarm_yield(self):
+        ensure_not_ui_thread()
+
+        module_dir = path.join(TEST_GOPATH, 'src', 'prewarmed')
+        os.makedirs(module_dir)
+        with open(path.join(module_dir, 'go.mod'), 'wb') as f:
+            f.write(b'module prewarmed\n\ngo 1.16\n')
+        with open(path.join(module_dir, 'main.go'), 'wb') as f:
+            f.write(b'package main\n\nimport "time"\n\nfunc main() {\n\ttime.Sleep(time.Minute)\n}\n')
+
+        def _get_config(window, result_queue):
+            result_queue.put(window)
+            result_queue.put(golang_build._get_config(
+                'go',
+                set(['GOPATH']),
+                golang_build.GO_ENV_VARS - set(['GOPATH']),
+                window=window
+            ))
+
+        result_queue = open_folder(module_dir, VIEW_SETTINGS, _get_config)
+        window = result_queue.get(timeout=5)
+        go_bin, env = result_queue.get(timeout=5)
+
+        try:
+            prewarm = golang_build._get_prewarm(window)
+            thread = threading.Thread(target=prewarm._run, args=([[go_bin, 'run', 'main.go']], module_dir, env))
+            thread.start()
+            for _ in range(100):
+                if prewarm.running():
+                    break
+                time.sleep(0.1)
+            self.assertTrue(prewarm.running())
+
+            self.assertFalse(golang_build._yield_to_running_build(window))
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual('cancelled', prewarm.proc.result)
+        finally:
+            close_window(window)
+
+    def test_prewarm_writes_nothing(self):
+        ensure_not_ui_thread()
+
+        module_dir = path.join(TEST_GOPATH, 'src', 'prewarmed')
+        os.makedirs(module_dir)
+        with open(path.join(module_dir, 'go.mod'), 'wb') as f:
+            f.write(b'module prewarmed\n\ngo 1.16\n')
+        with open(path.join(module_dir, 'main.go'), 'wb') as f:
+            f.write(b'package main\n\nfunc main() {\n}\n')
+        before = sorted(os.listdir(module_dir))
+
+        def _start_prewarm(window, result_queue):
+            prewarm = golang_build._get_prewarm(window)
+            prewarm.start(window)
+            result_queue.put((window, prewarm))
+
+        window, prewarm = open_folder(module_dir, VIEW_SETTINGS, _start_prewarm).get(timeout=5)
+        try:
+            # The prewarm is finished once the second job, "go test", is
+            for _ in range(300):
+                if prewarm.proc and prewarm.proc.args[1] == 'test' and prewarm.proc.finished:
+                    break
+                time.sleep(0.1)
+            self.assertEqual('test', prewarm.proc.args[1])
+            self.assertEqual('success', prewarm.proc.result)
+        finally:
+            close_window(window)
+        self.assertEqual(before, sorted(os.listdir(module_dir)))
+
     def test_terminal(self):
         ensure_not_ui_thread()
 
@@ -349,6 +1295,55 @@ class GolangBuildTests(unittest.TestCase):
         open_file(file_path, VIEW_SETTINGS, _run_build)
         self.assertTrue(confirm_user('Did a terminal open to Packages/Golang Build/dev/go_projects/src/good/?'))
 
+    def test_overlay(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            view.run_command('append', {'characters': '\nfunc Broken() int {\n\treturn "broken"\n}\n'})
+            view.window().run_command('golang_build_overlay')
+
+            def _revert():
+                view.run_command('revert')
+            sublime.set_timeout(_revert, 2000)
+
+        result_queue = open_file(file_path, VIEW_SETTINGS, _run_build)
+        result = wait_build(result_queue)
+        self.assertEqual('error', result)
+        self.assertTrue(confirm_user('Did "go build" fail with an error about func Broken() in the unsaved buffer?'))
+
+    def test_overlay_cancel(self):
+        ensure_not_ui_thread()
+
+        file_path = path.join(TEST_GOPATH, 'src', 'good', 'rune_len.go')
+
+        def _run_build(view, result_queue):
+            window = view.window()
+            view.run_command('append', {'characters': '\n'})
+            window.run_command('golang_build_overlay', {'show_panel': False})
+
+            overlay = golang_build._get_overlay(window)
+            result_queue.put(golang_build._get_proc(window) is overlay.proc)
+            result_queue.put(overlay.panel.name)
+
+            def _cancel_build():
+                window.run_command('golang_build_cancel')
+                view.run_command('revert')
+            sublime.set_timeout(_cancel_build, 50)
+
+        # We perform a cross-compile so the user has time to interrupt the build
+        custom_view_settings = VIEW_SETTINGS.copy()
+        custom_view_settings['GOOS'] = CROSS_COMPILE_OS
+        custom_view_settings['GOARCH'] = 'amd64'
+
+        result_queue = open_file(file_path, custom_view_settings, _run_build)
+        self.assertTrue(result_queue.get(timeout=5))
+        self.assertEqual('golang_build_overlay', result_queue.get(timeout=5))
+        result = wait_build(result_queue)
+        self.assertEqual('cancelled', result)
+        self.assertTrue(confirm_user('Was the "golang_build" output panel left hidden and unchanged?'))
+
     def test_build_bad(self):
         ensure_not_ui_thread()
 
@@ -555,6 +1550,86 @@ def open_file(file_path, view_settings, callback):
     return result_queue
 
 
+def open_folder(folder, settings, callback):
+    """
+    Opens a folder in a new Sublime Text window and then executes the callback
+
+    :param folder:
+        A unicode string of the path to the folder to open
+
+    :param settings:
+        A dict of settings to set the "golang" key of the project's settings to
+
+    :param callback:
+        The callback to execute in the UI thread once the folder is opened. It
+        is passed the sublime.Window and a Queue() it can use to communicate
+        with the test.
+
+    :return:
+        The Queue() passed to the callback
+    """
+
+    result_queue = Queue()
+
+    def open_folder_callback():
+        sublime.run_command('new_window')
+        window = sublime.active_window()
+        window.set_project_data({
+            'folders': [{'path': folder}],
+            'settings': {'golang': settings}
+        })
+        callback(window, result_queue)
+    sublime.set_timeout(open_folder_callback, 50)
+    return result_queue
+
+
+def close_window(window):
+    """
+    Closes a window opened by open_folder()
+
+    :param window:
+        The sublime.Window to close
+    """
+
+    sublime.set_timeout(lambda: window.run_command('close_window'), 1)
+
+
+def write_goproxy(proxy_dir, modules):
+    """
+    Writes a module proxy that can be used offline via GOPROXY=file:///...,
+    with a v1.0.0 of each module containing a single package
+
+    :param proxy_dir:
+        A unicode string of the directory to write the proxy to
+
+    :param modules:
+        A list of unicode strings of module paths
+    """
+
+    for module in modules:
+        name = module.rsplit('/', 1)[-1]
+        go_mod = 'module %s\n\ngo 1.16\n' % module
+        version_dir = path.join(proxy_dir, *(module.split('/') + ['@v']))
+        os.makedirs(version_dir)
+
+        with open(path.join(version_dir, 'list'), 'wb') as f:
+            f.write(b'v1.0.0\n')
+        with open(path.join(version_dir, 'v1.0.0.info'), 'wb') as f:
+            f.write(json.dumps({'Version': 'v1.0.0', 'Time': '2020-01-01T00:00:00Z'}).encode('utf-8'))
+        with open(path.join(version_dir, 'v1.0.0.mod'), 'wb') as f:
+            f.write(go_mod.encode('utf-8'))
+
+        # The files of a module zip are prefixed with module@version
+        prefix = '%s@v1.0.0/' % module
+        module_zip = zipfile.ZipFile(path.join(version_dir, 'v1.0.0.zip'), 'w')
+        try:
+            module_zip.writestr(prefix + 'go.mod', go_mod)
+            source = 'package %s\n\nfunc Hello() string {\n\treturn "hello"\n}\n' % name
+            module_zip.writestr(prefix + name + '.go', source)
+        finally:
+            module_zip.close()
+
+
 def when_file_opened(window, file_path, view_settings, callback, result_queue):
     """
     Periodic polling callback used by open_file() to find the newly-opened file
@@ -599,7 +1674,8 @@ def wait_build(result_queue, timeout=5):
     """
 
     def _send_result(package_name, event_name, payload):
-        result_queue.put(payload.result)
+        if event_name == 'build_complete':
+            result_queue.put(payload.result)
 
     try:
         package_events.listen('Golang Build', _send_result)
@@ -9,15 +9,27 @@ import time
 import re
 import textwrap
 import collections
+import tempfile
+import hashlib
+import json
+import calendar
+import zlib
+import shutil
+import heapq
+import math
 
 import signal
+import socket
+import stat
 
 if sys.version_info < (3,):
     import Queue as queue
     str_cls = unicode  # noqa
+    int_types = (int, long)  # noqa
 else:
     import queue
     str_cls = str
+    int_types = (int,)
 
 import sublime
 import sublime_plugin
@@ -42,6 +54,12 @@ GO_ENV_VARS = set([
     'GOARM',
     'GO386',
     'GORACE',
+    'GOFLAGS',
+    'GOPROXY',
+    'GOSUMDB',
+    'GOPRIVATE',
+    'GOCACHE',
+    'GOMODCACHE',
 ])
 
 # References to any existing GolangProcess() for a sublime.Window.id(). For
@@ -53,6 +71,217 @@ _PROCS = {}
 _PANELS = {}
 _PANEL_LOCK = threading.Lock()
 
+# References to any existing GolangOverlay() for a sublime.Window.id(). For
+# basic get and set operations, the dict is threadsafe.
+_OVERLAYS = {}
+
+# The number of milliseconds to wait after the last modification of a Go
+# buffer before starting an automatic overlay build
+OVERLAY_DELAY = 500
+
+# References to any existing GolangPrewarm() for a sublime.Window.id(). For
+# basic get and set operations, the dict is threadsafe.
+_PREWARMS = {}
+
+# The number of milliseconds the editor must be idle for before the build
+# cache is prewarmed
+PREWARM_IDLE = 10000
+
+# References to any existing GolangPrefetch() for the unicode string path of
+# a folder containing a go.mod file. For basic get and set operations, the
+# dict is threadsafe.
+_PREFETCHES = {}
+
+# The QoS classes a GolangProcess() may run under. Processes of the
+# "background" and "idle" classes are paused while a "foreground" process is
+# running, on posix platforms.
+QOS_CLASSES = ('foreground', 'background', 'idle')
+
+# The niceness, Linux I/O priority class and level, and Windows priority class
+# of each QoS class other than "foreground"
+_QOS_NICE = {'background': 10, 'idle': 19}
+_QOS_IOPRIO = {'background': (2, 7), 'idle': (3, 0)}
+_QOS_WINDOWS_PRIORITY = {'background': 0x00004000, 'idle': 0x00000040}
+
+# The Linux ioprio_set() syscall number for each machine architecture
+_IOPRIO_SET_SYSCALLS = {
+    'x86_64': 251,
+    'i386': 289,
+    'i686': 289,
+    'aarch64': 30,
+    'armv7l': 314,
+    'ppc64le': 273,
+}
+
+# The go commands that accept the -p flag
+_QOS_P_COMMANDS = set(['build', 'clean', 'get', 'install', 'list', 'run', 'test', 'vet'])
+
+# The GolangProcess() objects that are running, by whether their QoS class is
+# "foreground", used to pause and resume the other processes
+_QOS_PROCS = {'foreground': [], 'background': []}
+_QOS_LOCK = threading.Lock()
+
+# The number of packages to list in the report of a profiled build, and the
+# number of previous compile times to keep for each package
+BUILD_PROFILE_TOP = 10
+BUILD_PROFILE_HISTORY = 20
+
+# The number of functions to list in a pprof report, and the number of
+# profiled benchmark runs to keep on disk
+PROFILE_TOP = 15
+PROFILE_RUNS = 20
+
+# A lock used when reading, modifying and writing files from _storage_path()
+# that may be updated by more than one thread
+_STORAGE_LOCK = threading.Lock()
+
+# The number of seconds a package with no recorded test duration is assumed
+# to take when planning "test_sharded" runs
+DEFAULT_TEST_DURATION = 1.0
+
+# The number of packages to list in a binary size report, and the number of
+# previous sizes to keep for each executable
+BINARY_SIZE_TOP = 15
+BINARY_SIZE_HISTORY = 20
+
+# The number of unique data races displayed by the "test_race" and "run_race"
+# tasks, and the number of lines of a single race report that are kept
+RACE_MAX_UNIQUE = 100
+RACE_MAX_LINES = 200
+
+# The number of longest blocking events listed by the "test_trace" and
+# "benchmark_trace" tasks
+TRACE_TOP = 10
+
+# Event types of the execution trace format used since Go 1.22, from
+# internal/trace/tracev2 in the Go source
+_TRACE_EVENT_BATCH = 1
+_TRACE_STACKS = 2
+_TRACE_STACK = 3
+_TRACE_STRINGS = 4
+_TRACE_STRING = 5
+_TRACE_CPU_SAMPLES = 6
+_TRACE_FREQUENCY = 8
+_TRACE_GO_CREATE = 14
+_TRACE_GO_CREATE_SYSCALL = 15
+_TRACE_GO_START = 16
+_TRACE_GO_DESTROY = 17
+_TRACE_GO_DESTROY_SYSCALL = 18
+_TRACE_GO_STOP = 19
+_TRACE_GO_BLOCK = 20
+_TRACE_GO_UNBLOCK = 21
+_TRACE_SYSCALL_BEGIN = 22
+_TRACE_SYSCALL_END = 23
+_TRACE_SYSCALL_END_BLOCKED = 24
+_TRACE_GO_STATUS = 25
+_TRACE_STW_BEGIN = 26
+_TRACE_STW_END = 27
+_TRACE_GC_BEGIN = 29
+_TRACE_GC_END = 30
+_TRACE_GO_SWITCH = 45
+_TRACE_GO_SWITCH_DESTROY = 46
+_TRACE_GO_CREATE_BLOCKED = 47
+_TRACE_GO_STATUS_STACK = 48
+_TRACE_EXPERIMENTAL_BATCH = 49
+_TRACE_SYNC = 50
+_TRACE_CLOCK_SNAPSHOT = 51
+
+# The goroutine states of _TRACE_GO_STATUS events that mean the goroutine is
+# on an M
+_TRACE_STATUS_RUNNING = 2
+_TRACE_STATUS_SYSCALL = 3
+
+# The number of varint arguments of each event type that may appear in an
+# event batch, including the leading timestamp delta. None is used for the
+# types that only appear in other kinds of batches.
+_TRACE_ARG_COUNTS = (
+    None, None, None, None, None, None, None, None, None,
+    # Procs
+    3, 3, 1, 4, 3,
+    # Goroutines
+    4, 2, 3, 1, 1, 3, 3, 4, 3, 1, 1, 4,
+    # Stop-the-world
+    3, 1,
+    # GC
+    2, 3, 2, 2, 2, 3, 2, 2, 1, 2, 2,
+    # Annotations
+    2, 5, 3, 4, 4, 5,
+    # Coroutines and goroutine status with a stack, added in Go 1.23
+    3, 3, 4, 5,
+)
+
+# The number of bytes of compressed output kept in the build history
+HISTORY_MAX_SIZE = 20 * 1024 * 1024
+
+# The number of runs kept in the build history, which bounds the size of the
+# index that is rewritten after every build
+HISTORY_MAX_RUNS = 500
+
+# The longest number of seconds records are queued before being written to
+# the "log:jsonl" file, and the most records written at once
+JSONL_FLUSH_INTERVAL = 0.5
+JSONL_BATCH_SIZE = 1000
+
+# A dict with unicode string keys of file paths and values of the
+# GolangJsonlWriter() writing to the file
+_JSONL_WRITERS = {}
+_JSONL_WRITERS_LOCK = threading.Lock()
+
+# The upper bounds, in seconds, of the buckets of the build duration and time
+# to first output histograms of GolangMetrics()
+METRICS_DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+METRICS_FIRST_OUTPUT_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# The number of recent garbage collection pauses the "run:telemetry" summary
+# percentiles are calculated from
+TELEMETRY_PAUSES = 1000
+
+# The number of previous runtimes of a task in a folder that the estimated
+# time remaining is based on, and the milliseconds between status bar updates
+PROGRESS_RUNTIMES = 5
+PROGRESS_INTERVAL = 1000
+
+# The number of threads that scan the build and module caches, the number of
+# module versions listed in the disk usage report, and the upper bound in days
+# and label of each age bucket of the report
+CACHE_SCAN_THREADS = 8
+CACHE_TOP = 20
+CACHE_AGE_BUCKETS = [(1, '< 1 day'), (7, '1-7 days'), (30, '7-30 days'), (None, '> 30 days')]
+
+# The default number of times the "flaky" task runs each test
+FLAKY_RUNS = 20
+
+# The default number of times each side is run by the
+# "golang_build_benchmark_compare" command
+BENCHMARK_COMPARE_ROUNDS = 5
+
+# The default value of the -fuzztime flag for the "fuzz" task, so fuzzing
+# stops without needing to be cancelled
+FUZZ_TIME = '60s'
+
+# An index of the Test, Benchmark, Fuzz and Example functions in the _test.go
+# files of each package. Keys are unicode string package directories and
+# values are a dict with unicode string keys of file paths and values of a
+# two-element tuple of the float mtime of the file and a list of dicts from
+# _find_test_functions(). For basic get and set operations, the dict is
+# threadsafe.
+_TEST_INDEX = {}
+
+# The uncovered line intervals from the most recent "coverage" run. Keys are
+# unicode strings of the paths of the files, using "/" as the separator, or
+# the import path based file names of the coverage profile if the directory of
+# the package could not be found. Values are tuples of (start line, end line)
+# tuples. The dict is replaced, never mutated, so it may be read from any
+# thread.
+_COVERAGE = {}
+
+# The kinds of profiles written by the "benchmark_profile" task, with the name
+# of each file and the sample type to report on, in order of preference
+PROFILE_KINDS = [
+    ('CPU', 'cpu.pprof', ['cpu']),
+    ('Memory', 'mem.pprof', ['alloc_space', 'inuse_space']),
+]
+
 
 class GolangBuildCommand(sublime_plugin.WindowCommand):
 
@@ -60,14 +289,16 @@ class GolangBuildCommand(sublime_plugin.WindowCommand):
     Command to run "go build", "go install", "go test" and "go clean"
     """
 
-    def run(self, task='build', flags=None):
+    def run(self, task='build', flags=None, qos=None):
         """
         Runs the "golang_build" command - invoked by Sublime Text via the
         command palette or sublime.Window.run_command()
 
         :param task:
-            A unicode string of "build", "test", "benchmark", "install", "clean"
-            or "cross_compile"
+            A unicode string of "build", "test", "benchmark", "install", "clean",
+            "cross_compile", "build_profile", "benchmark_profile", "coverage",
+            "test_sharded", "fuzz", "flaky", "benchmark_scaling", "test_race",
+            "run_race", "test_trace" or "benchmark_trace"
 
         :param flags:
             A list of unicode strings of flags to send to the command-line go
@@ -75,6 +306,11 @@ class GolangBuildCommand(sublime_plugin.WindowCommand):
             the GOOS and GOARCH environment variables set, meaning that
             flags for "build" should be used with it. Execute "go help" on the
             command line to learn about available flags.
+
+        :param qos:
+            None or a unicode string of the QoS class of the process -
+            "foreground", "background" or "idle". Tasks that run more than one
+            process, or prompt the user, always run in the foreground.
         """
 
         if _yield_to_running_build(self.window):
@@ -104,6 +340,36 @@ class GolangBuildCommand(sublime_plugin.WindowCommand):
         if flags is None:
             flags = ['-v']
 
+        if qos not in QOS_CLASSES:
+            qos = _qos_setting(self.window, task, 'foreground')
+
+        # The task is changed to the go command-line arg below, so the task
+        # the user ran is kept for the progress and events of the build
+        build_task = task
+
+        race_handler = None
+        if task in ('test_race', 'run_race'):
+            # Switch back to the real Go command-line arg
+            task = task[:-len('_race')]
+
+            # The reports are written to files so duplicates do not flood the
+            # output panel
+            log_dir = _race_log_dir(self.window)
+            if log_dir is None:
+                race_handler = GolangReportHandler(_format_message("""
+                    > Data races: reports were written to the output as-is,
+                    since the temporary directory %s contains whitespace,
+                    which can not be used in the log_path option of GORACE
+                """) % tempfile.gettempdir())
+            else:
+                for entry in os.listdir(log_dir):
+                    _remove_file(os.path.join(log_dir, entry))
+                options = _get_env(env, 'GORACE')
+                options = re.sub('(^|\\s)log_path=\\S*', '', options or '').strip()
+                _set_env(env, 'GORACE', ('%s log_path=%s' % (options, os.path.join(log_dir, 'race'))).strip())
+                race_handler = GolangRaceHandler(_get_panel(self.window), log_dir)
+            flags.insert(0, '-race')
+
         if task == 'run':
             # Allow the user to set a file path into the flags settings,
             # thus requiring that the flags be checked to ensure a second
@@ -151,6 +417,144 @@ class GolangBuildCommand(sublime_plugin.WindowCommand):
             )
             return
 
+        if task == 'test_sharded':
+            _task_test_sharded(
+                self,
+                go_bin,
+                flags,
+                working_dir,
+                env
+            )
+            return
+
+        if task == 'flaky':
+            _task_flaky(
+                self,
+                go_bin,
+                flags,
+                working_dir,
+                env
+            )
+            return
+
+        if task == 'fuzz':
+            _task_fuzz(
+                self,
+                go_bin,
+                flags,
+                working_dir,
+                env
+            )
+            return
+
+        handlers = []
+
+        # Budgets are not checked when benchmarks are run with a list of
+        # GOMAXPROCS values, since the results are not comparable
+        check_budgets = task in ('benchmark', 'benchmark_profile')
+
+        if task == 'build_profile':
+            # Switch back to the real Go command-line arg
+            task = 'build'
+
+            graph_path = os.path.join(
+                _temp_path('build_profile'),
+                '%s.json' % self.window.id()
+            )
+            _remove_file(graph_path)
+            flags.extend(['-debug-actiongraph', graph_path])
+            handlers.append(GolangBuildProfileHandler(graph_path, working_dir))
+
+        if task == 'benchmark_profile':
+            task = 'benchmark'
+
+            run_name = '%s-%s' % (time.strftime('%Y%m%d-%H%M%S'), self.window.id())
+            run_dir = _storage_path('profiles', run_name)
+            # Runs started within the same second get a suffix that keeps the
+            # directories sorted by age
+            suffix = 1
+            while os.path.exists(run_dir):
+                suffix += 1
+                run_dir = _storage_path('profiles', '%s-%02d' % (run_name, suffix))
+            os.makedirs(run_dir)
+            flags.extend([
+                '-cpuprofile',
+                os.path.join(run_dir, 'cpu.pprof'),
+                '-memprofile',
+                os.path.join(run_dir, 'mem.pprof'),
+                # Profiling causes the test binary to be kept, so it is written
+                # outside of the user's source folder
+                '-o',
+                os.path.join(_temp_path('profiles'), '%s.test' % self.window.id()),
+            ])
+            handlers.append(GolangProfileHandler(run_dir, working_dir))
+
+        if task == 'benchmark_scaling':
+            task = 'benchmark'
+
+            max_cpu, _ = golangconfig.setting_value(
+                'benchmark_scaling:max_cpu',
+                view=self.window.active_view(),
+                window=self.window
+            )
+            if not isinstance(max_cpu, int) or max_cpu < 1:
+                max_cpu = _cpu_count()
+            cpu_counts = _scaling_cpu_counts(max_cpu)
+            flags.extend(['-cpu', ','.join('%d' % count for count in cpu_counts)])
+            handlers.append(GolangBenchmarkScalingHandler(cpu_counts))
+
+        if task in ('test_trace', 'benchmark_trace'):
+            task = task[:-len('_trace')]
+
+            trace_path = os.path.join(_temp_path('trace'), '%s.out' % self.window.id())
+            _remove_file(trace_path)
+            flags.extend(['-trace', trace_path])
+            handlers.append(GolangTraceHandler(trace_path, working_dir))
+
+        if task == 'coverage':
+            task = 'test'
+
+            profile_path = os.path.join(_temp_path('coverage'), '%s.out' % self.window.id())
+            _remove_file(profile_path)
+            flags.extend(['-coverprofile', profile_path])
+            handlers.append(GolangCoverageHandler(profile_path, go_bin, working_dir, env))
+
+        if task == 'test':
+            handlers.append(GolangTestFailureHandler(self.window, working_dir))
+            handlers.append(GolangTestTimingHandler())
+
+        if race_handler:
+            handlers.append(race_handler)
+
+        if task == 'run':
+            telemetry, _ = golangconfig.setting_value(
+                'run:telemetry',
+                view=self.window.active_view(),
+                window=self.window
+            )
+            if telemetry:
+                godebug = ['gctrace=1']
+                schedtrace, _ = golangconfig.setting_value(
+                    'run:schedtrace',
+                    view=self.window.active_view(),
+                    window=self.window
+                )
+                if isinstance(schedtrace, int) and schedtrace > 0:
+                    godebug.append('schedtrace=%d' % schedtrace)
+                existing = _get_env(env, 'GODEBUG')
+                if existing:
+                    godebug.insert(0, existing)
+                flags = _telemetry_exec_flags(flags, ','.join(godebug))
+                # Must be last since it writes the output itself
+                handlers.append(GolangTelemetryHandler(
+                    _get_panel(self.window),
+                    [go_bin, task] + flags,
+                    working_dir
+                ))
+
+        if task in ('build', 'install') and _binary_size_enabled(self.window):
+            handlers.append(GolangBinarySizeHandler(go_bin, flags, working_dir, env, task == 'install'))
+
         if task == 'benchmark':
             # Switch back to the real Go command-line arg
             task = 'test'
@@ -169,19 +573,73 @@ class GolangBuildCommand(sublime_plugin.WindowCommand):
             if not found_bench_flag:
                 flags.append('-bench=.')
 
+            budgets = None
+            if check_budgets:
+                budgets, _ = golangconfig.setting_value(
+                    'benchmark:budgets',
+                    view=self.window.active_view(),
+                    window=self.window
+                )
+            if budgets and isinstance(budgets, dict):
+                units = set()
+                for budget in budgets.values():
+                    if isinstance(budget, dict):
+                        units.update(budget.keys())
+                if ('B/op' in units or 'allocs/op' in units) and '-benchmem' not in flags:
+                    flags.append('-benchmem')
+                handlers.append(GolangBenchmarkBudgetHandler(budgets, _results_key(self.window, working_dir)))
+
         args = [go_bin, task]
         if flags and isinstance(flags, list):
             args.extend(flags)
         proc = _run_process(
-            task,
+            build_task,
             self.window,
             args,
             working_dir,
-            env
+            env,
+            handlers=handlers,
+            qos=qos
         )
         _set_proc(self.window, proc)
 
 
+def _telemetry_exec_flags(flags, godebug):
+    """
+    Adds an -exec wrapper to the flags of "go run" that sets GODEBUG for only
+    the program. Setting it in the environment of "go run" would make the go
+    command, compiler and linker print their own garbage collection traces.
+
+    :param flags:
+        A list of unicode strings of the flags of "go run"
+
+    :param godebug:
+        A unicode string of the GODEBUG value for the program
+
+    :return:
+        A new list of unicode strings of flags
+    """
+
+    if sys.platform == 'win32':
+        wrapper = 'cmd /c set GODEBUG=%s&&' % godebug
+    else:
+        wrapper = 'env GODEBUG=%s' % godebug
+
+    flags = list(flags)
+    for i, flag in enumerate(flags):
+        # Anything after the files is an argument of the program
+        if flag.endswith('.go'):
+            break
+        # An -exec wrapper from the user is run by this one
+        if flag == '-exec' and i + 1 < len(flags):
+            flags[i + 1] = '%s %s' % (wrapper, flags[i + 1])
+            return flags
+        if flag.startswith('-exec='):
+            flags[i] = '-exec=%s %s' % (wrapper, flag[len('-exec='):])
+            return flags
+    return ['-exec', wrapper] + flags
+
+
 def _task_cross_compile(command, go_bin, flags, working_dir, env):
     """
     Prompts the user to select the OS and ARCH to use for a cross-compile
@@ -246,12 +704,17 @@ def _task_cross_compile(command, go_bin, flags, working_dir, env):
         args = [go_bin, 'build']
         if flags and isinstance(flags, list):
             args.extend(flags)
+        handlers = []
+        if _binary_size_enabled(command.window):
+            handlers.append(GolangBinarySizeHandler(go_bin, flags, working_dir, env, False))
+
         proc = _run_process(
             'cross_compile',
             command.window,
             args,
             working_dir,
-            env
+            env,
+            handlers=handlers
         )
         _set_proc(command.window, proc)
 
@@ -265,780 +728,9829 @@ def _task_cross_compile(command, go_bin, flags, working_dir, env):
     )
 
 
-class GolangBuildCancelCommand(sublime_plugin.WindowCommand):
-
-    """
-    Terminates any existing "go" process that is running for the current window
+def _task_test_sharded(command, go_bin, flags, working_dir, env):
     """
+    Splits the packages below the working directory into shards with balanced
+    predicted durations, and runs "go test" for each shard concurrently
 
-    def run(self):
-        proc = _get_proc(self.window)
-        if proc and not proc.finished:
-            proc.terminate()
-        if proc is not None:
-            _set_proc(self.window, None)
+    :param command:
+        A sublime_plugin.WindowCommand object
 
-    def is_enabled(self):
-        proc = _get_proc(self.window)
-        if not proc:
-            return False
-        return not proc.finished
+    :param go_bin:
+        A unicode string with the path to the "go" executable
 
+    :param flags:
+        A list of unicode string of flags to pass to the "go" executable
 
-class GolangBuildReopenCommand(sublime_plugin.WindowCommand):
+    :param working_dir:
+        A unicode string with the working directory for the "go" executable
 
+    :param env:
+        A dict of environment variables to use with the "go" executable
     """
-    Reopens the output from the last build command
-    """
-
-    def run(self):
-        self.window.run_command('show_panel', {'panel': 'output.golang_build'})
 
+    shard_count, _ = golangconfig.setting_value(
+        'test_sharded:shards',
+        view=command.window.active_view(),
+        window=command.window
+    )
+    if not isinstance(shard_count, int) or shard_count < 1:
+        shard_count = _cpu_count()
 
-class GolangBuildGetCommand(sublime_plugin.WindowCommand):
-
-    """
-    Prompts the use to enter the URL of a Go package to get
-    """
+    def _list_packages():
+        """
+        Lists the packages to test and starts the shards
 
-    def run(self, url=None, flags=None):
+        RUNS IN A THREAD
         """
-        Runs the "golang_build_get" command - invoked by Sublime Text via the
-        command palette or sublime.Window.run_command()
 
-        :param url:
-            A unicode string of the URL to download, instead of prompting the
-            user
+        returncode, stdout, stderr = _run_capture([go_bin, 'list', './...'], working_dir, env)
+        if returncode != 0:
+            sublime.set_timeout(lambda: sublime.error_message(_format_message("""
+                Golang Build
 
-        :param flags:
-            A list of unicode strings of flags to send to the command-line go
-            tool. Execute "go help" on the command line to learn about available
-            flags.
-        """
+                The packages to test could not be listed:
 
-        if _yield_to_running_build(self.window):
+                %s
+            """) % stderr.strip()), 1)
             return
+        packages = [line.strip() for line in stdout.splitlines() if line.strip()]
+        sublime.set_timeout(lambda: _start_shards(packages), 1)
 
-        working_dir = _determine_working_dir(self.window)
-        if working_dir is None:
-            return
+    def _start_shards(packages):
+        """
+        Plans the shards and starts the GolangProcessPool() that runs them
 
-        go_bin, env = _get_config(
-            'go',
-            set(['GOPATH']),
-            GO_ENV_VARS - set(['GOPATH']),
-            view=self.window.active_view(),
-            window=self.window,
-        )
-        if (go_bin, env) == (None, None):
-            return
+        :param packages:
+            A list of unicode strings of package import paths
+        """
 
-        if flags is None:
-            flags, _ = golangconfig.setting_value(
-                'get:flags',
-                view=self.window.active_view(),
-                window=self.window
-            )
+        timings = _load_json(_storage_path('test_timings.json'), {})
+        shards = _plan_shards(packages, timings, shard_count)
 
-        if flags is None:
-            flags = ['-v']
+        jobs = []
+        for predicted, shard_packages in shards:
+            args = [go_bin, 'test']
+            if flags and isinstance(flags, list):
+                args.extend(flags)
+            args.extend(shard_packages)
+            jobs.append((args, working_dir, env, [GolangTestTimingHandler()]))
 
-        def on_done(get_url):
+        def _summarize(pool):
             """
-            Processes the user's input and launches the "go get" command
+            Formats the predicted and actual durations of the shards
+
+            RUNS IN A THREAD
 
-            :param get_url:
-                A unicode string of the URL to get
+            :param pool:
+                The GolangProcessPool() that finished
+
+            :return:
+                A unicode string of the summary
             """
 
-            args = [go_bin, 'get']
-            if flags and isinstance(flags, list):
-                args.extend(flags)
-            args.append(get_url)
-            proc = _run_process(
-                'get',
-                self.window,
-                args,
-                working_dir,
-                env
+            output = '> Shards:\n'
+            for index, proc in enumerate(pool.procs):
+                predicted, shard_packages = shards[index]
+                output += '>   %d: predicted %0.3fs, actual %0.3fs (%d packages)\n' % (
+                    index + 1,
+                    predicted,
+                    proc.finished - proc.started,
+                    len(shard_packages)
+                )
+            output += '> Predicted wall time: %0.3fs, actual: %0.3fs' % (
+                max([predicted for predicted, _ in shards] + [0.0]),
+                pool.finished - pool.started
             )
-            _set_proc(self.window, proc)
+            return output
 
-        if url is not None:
-            on_done(url)
-            return
-
-        self.window.show_input_panel(
-            'go get',
-            '',
-            on_done,
-            None,
-            None
-        )
+        pool = GolangProcessPool('test_sharded', command.window, jobs, len(jobs), on_complete=_summarize)
+        _set_proc(command.window, pool)
 
+    threading.Thread(target=_list_packages).start()
 
-class GolangBuildTerminalCommand(sublime_plugin.WindowCommand):
 
+def _task_flaky(command, go_bin, flags, working_dir, env):
     """
-    Opens a terminal for the user to the directory containing the open file,
-    setting any necessary environment variables
+    Runs the tests of the package in the working directory many times, split
+    across concurrent processes that each use a different shuffle seed, and
+    reports the tests that only fail some of the time
+
+    :param command:
+        A sublime_plugin.WindowCommand object
+
+    :param go_bin:
+        A unicode string with the path to the "go" executable
+
+    :param flags:
+        A list of unicode string of flags to pass to the "go" executable
+
+    :param working_dir:
+        A unicode string with the working directory for the "go" executable
+
+    :param env:
+        A dict of environment variables to use with the "go" executable
     """
 
-    def run(self):
-        """
-        Runs the "golang_build_terminal" command - invoked by Sublime Text via
-        the command palette or sublime.Window.run_command()
+    runs, _ = golangconfig.setting_value(
+        'flaky:runs',
+        view=command.window.active_view(),
+        window=command.window
+    )
+    if not isinstance(runs, int) or runs < 1:
+        runs = FLAKY_RUNS
+
+    shard_count, _ = golangconfig.setting_value(
+        'flaky:shards',
+        view=command.window.active_view(),
+        window=command.window
+    )
+    if not isinstance(shard_count, int) or shard_count < 1:
+        shard_count = _cpu_count()
+    shard_count = min(shard_count, runs)
+
+    # The outcome of each test is read from the verbose output
+    base_args = [go_bin, 'test']
+    if flags and isinstance(flags, list):
+        base_args.extend(flags)
+    if '-v' not in base_args and '-json' not in base_args:
+        base_args.append('-v')
+
+    first_seed = int(time.time() * 1000)
+    jobs = []
+    handlers = []
+    for index in range(shard_count):
+        count = runs // shard_count
+        if index < runs % shard_count:
+            count += 1
+        seed = first_seed + index
+        handler = GolangFlakyHandler(seed)
+        handlers.append(handler)
+        args = base_args + ['-count', '%d' % count, '-shuffle', '%d' % seed]
+        jobs.append((args, working_dir, env, [handler]))
+
+    def _summarize(pool):
         """
+        Combines the outcomes of every process and reports intermittent
+        failures
 
-        working_dir = _determine_working_dir(self.window)
-        if working_dir is None:
-            return
+        RUNS IN A THREAD
 
-        relevant_sources = set([
-            'project file',
-            'project file (os-specific)',
-            'golang.sublime-settings',
-            'golang.sublime-settings (os-specific)'
-        ])
+        :param pool:
+            The GolangProcessPool() that finished
 
-        env_overrides = {}
-        for var_name in GO_ENV_VARS:
-            value, source = golangconfig.setting_value(var_name, window=self.window)
-            # Only set overrides that are not coming from the user's shell
-            if source in relevant_sources:
-                env_overrides[var_name] = value
+        :return:
+            A unicode string of the report
+        """
 
-        # Get the PATH from the shell environment and then prepend any custom
-        # value so the user's terminal searches all locations
-        value, source = golangconfig.setting_value('PATH', window=self.window)
-        if source in relevant_sources:
-            shell, env = shellenv.get_env()
-            env_overrides['PATH'] = value + os.pathsep + env.get('PATH', '')
+        return _format_flaky_report(handlers, runs, len(jobs), pool.finished - pool.started)
 
-        newterm.launch_terminal(working_dir, env=env_overrides)
+    pool = GolangProcessPool('flaky', command.window, jobs, len(jobs), on_complete=_summarize)
+    _set_proc(command.window, pool)
 
 
-def _yield_to_running_build(window):
+def _format_flaky_report(handlers, runs, process_count, elapsed):
     """
-    Check if a build is already running, and if so, allow the user to stop it,
-    or cancel the new build
+    Formats the combined outcomes of a "flaky" run
 
-    :param window:
-        A sublime.Window of the window the build is being run in
+    :param handlers:
+        A list of the GolangFlakyHandler() objects of each process
+
+    :param runs:
+        An integer of the number of times the tests were requested to run
+
+    :param process_count:
+        An integer of the number of processes the runs were split across
+
+    :param elapsed:
+        A float of the number of seconds the run took
 
     :return:
-        A boolean - if the new build should be abandoned
+        A unicode string of the report
     """
 
-    proc = _get_proc(window)
-    if proc and not proc.finished:
-        message = _format_message("""
-            Golang Build
+    outcomes = {}
+    for handler in handlers:
+        for name, (passed, failed) in handler.outcomes.items():
+            combined = outcomes.setdefault(name, [0, 0, []])
+            combined[0] += passed
+            combined[1] += failed
+            if failed:
+                combined[2].append(handler.seed)
+
+    intermittent = []
+    consistent = []
+    for name in sorted(outcomes):
+        passed, failed, seeds = outcomes[name]
+        if failed and passed:
+            intermittent.append((failed / (passed + failed), name))
+        elif failed:
+            consistent.append(name)
+
+    output = '> Runs: %d of each test across %d processes\n' % (runs, process_count)
+    if intermittent:
+        output += '> Intermittent failures:\n'
+        for rate, name in sorted(intermittent, key=lambda item: (-item[0], item[1])):
+            passed, failed, seeds = outcomes[name]
+            output += '>   %s: failed %d of %d runs (%0.1f%%), -shuffle %s\n' % (
+                name,
+                failed,
+                passed + failed,
+                rate * 100,
+                ', '.join('%d' % seed for seed in seeds)
+            )
+    else:
+        output += '> Intermittent failures: none in %d tests\n' % len(outcomes)
+    if consistent:
+        output += '> Failed every run: %s\n' % ', '.join(consistent)
+
+    executions = sum(passed + failed for passed, failed, _ in outcomes.values())
+    output += '> Executions: %d in %0.3fs (%0.1f/sec)' % (
+        executions,
+        elapsed,
+        executions / elapsed if elapsed > 0 else 0.0
+    )
+    return output
 
-            There is already a build running. Would you like to stop it?
-        """)
-        if not sublime.ok_cancel_dialog(message, 'Stop Running Build'):
-            return True
-        proc.terminate()
-        _set_proc(window, None)
 
-    return False
+def _task_fuzz(command, go_bin, flags, working_dir, env):
+    """
+    Runs "go test -fuzz" for the Fuzz function containing the cursor, or for a
+    Fuzz function of the package in the working directory chosen by the user
 
+    :param command:
+        A sublime_plugin.WindowCommand object
 
-def _determine_working_dir(window):
-    """
-    Determine the working directory for a command based on the user's open file
-    or open folders
+    :param go_bin:
+        A unicode string with the path to the "go" executable
 
-    :param window:
-        The sublime.Window object of the window the command was run on
+    :param flags:
+        A list of unicode string of flags to pass to the "go" executable
 
-    :return:
+    :param working_dir:
+        A unicode string with the working directory for the "go" executable
+
+    :param env:
+        A dict of environment variables to use with the "go" executable
+    """
+
+    window = command.window
+    view = window.active_view()
+
+    targets = []
+    for file_name, functions in sorted(_package_test_functions(working_dir).items()):
+        for function in functions:
+            if function['kind'] == 'Fuzz':
+                targets.append((file_name, function))
+
+    if not targets:
+        sublime.error_message(_format_message("""
+            Golang Build
+
+            No Fuzz functions were found in the package in %s
+        """) % working_dir)
+        return
+
+    fuzztime, _ = golangconfig.setting_value(
+        'fuzz:fuzztime',
+        view=view,
+        window=window
+    )
+    if not fuzztime:
+        fuzztime = FUZZ_TIME
+
+    workers, _ = golangconfig.setting_value(
+        'fuzz:workers',
+        view=view,
+        window=window
+    )
+
+    def on_done(index):
+        """
+        Starts fuzzing the selected function
+
+        :param index:
+            The index of the function the user selected, or -1 if cancelled
+        """
+
+        if index == -1:
+            return
+
+        name = targets[index][1]['name']
+
+        args = [go_bin, 'test']
+        if flags and isinstance(flags, list):
+            args.extend(flags)
+        # The seed corpus of only the chosen function is run before fuzzing
+        args.extend(['-run', '^%s$' % name, '-fuzz', '^%s$' % name])
+        if not [flag for flag in args if flag.startswith('-fuzztime')]:
+            args.extend(['-fuzztime', fuzztime])
+        if isinstance(workers, int) and workers > 0:
+            args.extend(['-parallel', '%d' % workers])
+
+        proc = _run_process(
+            'fuzz',
+            window,
+            args,
+            working_dir,
+            env,
+            handlers=[
+                GolangTestFailureHandler(window, working_dir),
+                GolangFuzzHandler(window, _get_panel(window), working_dir, name),
+            ]
+        )
+        _set_proc(window, proc)
+
+    if view is not None and view.file_name() and len(view.sel()) > 0:
+        row = view.rowcol(view.sel()[0].begin())[0] + 1
+        for index, (file_name, function) in enumerate(targets):
+            if os.path.normcase(file_name) != os.path.normcase(view.file_name()):
+                continue
+            if function['start'] <= row <= function['end']:
+                on_done(index)
+                return
+
+    if len(targets) == 1:
+        on_done(0)
+        return
+
+    quick_panel_options = []
+    for file_name, function in targets:
+        quick_panel_options.append([function['name'], '%s:%d' % (os.path.basename(file_name), function['start'])])
+
+    window.show_quick_panel(
+        quick_panel_options,
+        on_done
+    )
+
+
+def _plan_shards(packages, timings, shard_count):
+    """
+    Assigns packages to shards using longest-processing-time-first scheduling,
+    so the predicted durations of the shards are as even as possible
+
+    :param packages:
+        A list of unicode strings of package import paths
+
+    :param timings:
+        A dict of recorded test durations, as written by
+        GolangTestTimingHandler()
+
+    :param shard_count:
+        An integer of the maximum number of shards
+
+    :return:
+        A list of (float predicted seconds, list of unicode string packages)
+        tuples, one per shard
+    """
+
+    known = sorted(timings[package]['duration'] for package in packages if package in timings)
+    default = known[len(known) // 2] if known else DEFAULT_TEST_DURATION
+
+    def _predicted(package):
+        if package in timings:
+            return timings[package]['duration']
+        return default
+
+    shard_count = max(min(shard_count, len(packages)), 1)
+    heap = [(0.0, index) for index in range(shard_count)]
+    shards = [[] for index in range(shard_count)]
+    for package in sorted(packages, key=_predicted, reverse=True):
+        load, index = heapq.heappop(heap)
+        shards[index].append(package)
+        heapq.heappush(heap, (load + _predicted(package), index))
+
+    loads = dict((index, load) for load, index in heap)
+    return [(loads[index], shards[index]) for index in range(shard_count) if shards[index]]
+
+
+class GolangBuildCancelCommand(sublime_plugin.WindowCommand):
+
+    """
+    Terminates any existing "go" process that is running for the current window
+    """
+
+    def run(self):
+        proc = _get_proc(self.window)
+        if proc and not proc.finished:
+            proc.terminate()
+        if proc is not None:
+            _set_proc(self.window, None)
+
+    def is_enabled(self):
+        proc = _get_proc(self.window)
+        if not proc:
+            return False
+        return not proc.finished
+
+
+class GolangBuildReopenCommand(sublime_plugin.WindowCommand):
+
+    """
+    Reopens the output from the last build command
+    """
+
+    def run(self):
+        self.window.run_command('show_panel', {'panel': 'output.golang_build'})
+
+
+class GolangBuildHistoryCommand(sublime_plugin.WindowCommand):
+
+    """
+    Lists the runs stored in the build history, and reopens the output of the
+    selected run in a read-only view
+    """
+
+    def run(self, query=None, search=False):
+        """
+        Runs the "golang_build_history" command - invoked by Sublime Text via
+        the command palette or sublime.Window.run_command()
+
+        :param query:
+            None or a unicode string - only runs with an error line mentioning
+            a package, test or file containing the string are listed
+
+        :param search:
+            If the user should be prompted for the query
+        """
+
+        if search and query is None:
+            def on_done(text):
+                """
+                Lists the runs matching the text
+
+                :param text:
+                    A unicode string the user entered
+                """
+
+                self.run(query=text.strip())
+
+            self.window.show_input_panel('Package, test or file', '', on_done, None, None)
+            return
+
+        runs = _history_runs(query)
+        if not runs:
+            sublime.status_message('Golang Build: no runs in the build history%s' % (
+                ' mention "%s"' % query if query else ''
+            ))
+            return
+
+        options = []
+        for run in runs:
+            options.append([
+                '%s: %s' % (run['result'].title(), run['command']),
+                '%s, %0.1fs, %d error lines - %s' % (
+                    time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started'])),
+                    run['runtime'],
+                    run['errors'],
+                    run['working_dir']
+                )
+            ])
+
+        def on_select(index):
+            """
+            Opens the output of the selected run
+
+            :param index:
+                The index of the option the user selected, or -1 if cancelled
+            """
+
+            if index == -1:
+                return
+            run = runs[index]
+            try:
+                with open(_storage_path('history', '%d.zlib' % run['id']), 'rb') as f:
+                    output = zlib.decompress(f.read()).decode('utf-8')
+            except (IOError, OSError, zlib.error):
+                sublime.status_message('Golang Build: the output of the run is no longer available')
+                return
+
+            view = self.window.new_file()
+            view.set_name('Go Build %s' % options[index][1].split(',')[0])
+            view.set_scratch(True)
+            _configure_output_view(view)
+            view.settings().set('result_base_dir', run['working_dir'])
+            if sys.version_info < (3,):
+                edit = view.begin_edit('golang_build_history', [])
+                view.insert(edit, 0, output)
+                view.end_edit(edit)
+            else:
+                view.run_command('append', {'characters': output, 'force': True})
+            view.set_read_only(True)
+
+        self.window.show_quick_panel(options, on_select)
+
+
+class GolangBuildGetCommand(sublime_plugin.WindowCommand):
+
+    """
+    Prompts the use to enter the URLs of Go packages to get
+    """
+
+    def run(self, url=None, flags=None, urls=None):
+        """
+        Runs the "golang_build_get" command - invoked by Sublime Text via the
+        command palette or sublime.Window.run_command()
+
+        :param url:
+            A unicode string of the URL to download, instead of prompting the
+            user
+
+        :param flags:
+            A list of unicode strings of flags to send to the command-line go
+            tool. Execute "go help" on the command line to learn about available
+            flags.
+
+        :param urls:
+            A list of unicode strings of URLs to download, instead of prompting
+            the user
+        """
+
+        if _yield_to_running_build(self.window):
+            return
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        go_bin, env = _get_config(
+            'go',
+            set(['GOPATH']),
+            GO_ENV_VARS - set(['GOPATH']),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if (go_bin, env) == (None, None):
+            return
+
+        if flags is None:
+            flags, _ = golangconfig.setting_value(
+                'get:flags',
+                view=self.window.active_view(),
+                window=self.window
+            )
+
+        if flags is None:
+            flags = ['-v']
+
+        def on_done(get_urls):
+            """
+            Processes the user's input and launches the "go get" command
+
+            :param get_urls:
+                A unicode string of the URLs to get, separated by whitespace
+                or commas
+            """
+
+            get_urls = [get_url for get_url in re.split('[\\s,]+', get_urls) if get_url]
+            if not get_urls:
+                return
+
+            if len(get_urls) > 1:
+                _task_get_batch(self.window, go_bin, flags, get_urls, working_dir, env)
+                return
+
+            args = [go_bin, 'get']
+            if flags and isinstance(flags, list):
+                args.extend(flags)
+            args.append(get_urls[0])
+            proc = _run_process(
+                'get',
+                self.window,
+                args,
+                working_dir,
+                env
+            )
+            _set_proc(self.window, proc)
+
+        if urls:
+            on_done(' '.join(urls))
+            return
+
+        if url is not None:
+            on_done(url)
+            return
+
+        # Projects may list the packages they need, so they can all be
+        # fetched at once
+        initial, _ = golangconfig.setting_value(
+            'get:urls',
+            view=self.window.active_view(),
+            window=self.window
+        )
+        if not isinstance(initial, list):
+            initial = []
+
+        self.window.show_input_panel(
+            'go get',
+            ' '.join(initial),
+            on_done,
+            None,
+            None
+        )
+
+
+def _task_get_batch(window, go_bin, flags, urls, working_dir, env):
+    """
+    Runs "go get" for each of a list of URLs, several at a time, and
+    summarizes which succeeded
+
+    :param window:
+        The sublime.Window object to display the output in
+
+    :param go_bin:
+        A unicode string with the path to the "go" executable
+
+    :param flags:
+        A list of unicode string of flags to pass to the "go" executable
+
+    :param urls:
+        A list of unicode strings of the URLs to get
+
+    :param working_dir:
+        A unicode string with the working directory for the "go" executable
+
+    :param env:
+        A dict of environment variables to use with the "go" executable
+    """
+
+    concurrency, _ = golangconfig.setting_value(
+        'get:concurrency',
+        view=window.active_view(),
+        window=window
+    )
+    if not isinstance(concurrency, int) or concurrency < 1:
+        concurrency = _cpu_count()
+
+    # Each "go get" in a module edits its go.mod, so they can not overlap
+    if _get_env(env, 'GO111MODULE') != 'off' and _module_root(working_dir):
+        concurrency = 1
+
+    jobs = []
+    for url in urls:
+        args = [go_bin, 'get']
+        if flags and isinstance(flags, list):
+            args.extend(flags)
+        args.append(url)
+        jobs.append((args, working_dir, env, None))
+
+    def _summarize(pool):
+        """
+        Lists the URLs that failed, or were never started
+
+        RUNS IN A THREAD
+
+        :param pool:
+            The GolangProcessPool() that finished
+
+        :return:
+            A unicode string of the summary
+        """
+
+        failed = []
+        succeeded = 0
+        for index, url in enumerate(urls):
+            if index >= len(pool.procs):
+                failed.append((url, 'not started'))
+            elif pool.procs[index].result == 'success':
+                succeeded += 1
+            else:
+                failed.append((url, pool.procs[index].result))
+
+        output = '> Get: %d of %d succeeded in %0.3fs' % (
+            succeeded,
+            len(urls),
+            pool.finished - pool.started
+        )
+        if failed:
+            output += '\n> Failed:'
+            for url, result in failed:
+                output += '\n>   %s (%s)' % (url, result)
+        return output
+
+    pool = GolangProcessPool('get', window, jobs, min(concurrency, len(jobs)), on_complete=_summarize)
+    _set_proc(window, pool)
+
+
+class GolangBuildCacheUsageCommand(sublime_plugin.WindowCommand):
+
+    """
+    Reports the disk space used by the build cache and module cache, and
+    optionally removes the least recently used entries
+    """
+
+    def run(self, trim=False, rescan=False):
+        """
+        Runs the "golang_build_cache_usage" command - invoked by Sublime Text
+        via the command palette or sublime.Window.run_command()
+
+        :param trim:
+            If the user should be prompted for a size to trim the caches to
+
+        :param rescan:
+            If every directory should be listed, instead of only those that
+            changed since the previous scan
+        """
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        go_bin, env = _get_config(
+            'go',
+            set(['GOPATH']),
+            GO_ENV_VARS - set(['GOPATH']),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if (go_bin, env) == (None, None):
+            return
+
+        trim_size, _ = golangconfig.setting_value(
+            'cache:trim_size',
+            view=self.window.active_view(),
+            window=self.window
+        )
+
+        def _scan():
+            """
+            Finds the cache directories and scans them
+
+            RUNS IN A THREAD
+            """
+
+            args = [go_bin, 'env', 'GOCACHE', 'GOMODCACHE', 'GOPATH']
+            returncode, stdout, stderr = _run_capture(args, working_dir, env)
+            if returncode != 0:
+                output = '> The cache directories could not be found:\n\n%s' % stderr.strip()
+                sublime.set_timeout(lambda: _show_report(self.window, None, output), 1)
+                return
+
+            lines = stdout.splitlines() + ['', '', '']
+            caches = []
+            if lines[0].strip() and lines[0].strip() != 'off':
+                caches.append(('build', lines[0].strip()))
+            # Go 1.14 and older do not have GOMODCACHE
+            mod_cache = lines[1].strip()
+            if not mod_cache and lines[2].strip():
+                mod_cache = os.path.join(lines[2].strip().split(os.pathsep)[0], 'pkg', 'mod')
+            if mod_cache:
+                caches.append(('module', mod_cache))
+
+            results = _scan_caches(caches, rescan)
+            output = _format_cache_usage(results)
+            sublime.set_timeout(lambda: self._report(results, output, trim, trim_size), 1)
+
+        threading.Thread(target=_scan).start()
+
+    def _report(self, results, output, trim, trim_size):
+        """
+        Displays the disk usage and prompts for the size to trim to
+
+        :param results:
+            A list of the results from _scan_caches()
+
+        :param output:
+            A unicode string of the disk usage report
+
+        :param trim:
+            If the user should be prompted for a size to trim the caches to
+
+        :param trim_size:
+            None or an integer of the number of megabytes from the
+            "cache:trim_size" setting
+        """
+
+        _show_report(self.window, None, output)
+        if not trim:
+            return
+
+        total = sum(_cache_total(entries) for _, _, entries, _ in results)
+        if not isinstance(trim_size, int) or trim_size < 0:
+            trim_size = total // 2 // (1 << 20)
+
+        def on_done(text):
+            """
+            Lists the entries to remove, and removes them once confirmed
+
+            :param text:
+                A unicode string of the target size in megabytes
+            """
+
+            try:
+                target = int(text.strip()) * (1 << 20)
+            except (ValueError):
+                sublime.error_message(_format_message("""
+                    Golang Build
+
+                    The size must be a whole number of megabytes
+                """))
+                return
+
+            candidates = _cache_trim_candidates(results, target)
+            if not candidates:
+                sublime.status_message('Golang Build: the caches are already smaller than %s' % text.strip())
+                return
+
+            size = sum(entry['size'] for _, _, entry in candidates)
+            message = _format_message("""
+                Golang Build
+
+                Remove the %d least recently used cache entries, freeing %s?
+                Builds running at the same time may fail.
+            """) % (len(candidates), _format_sample_value(size, 'bytes'))
+            if not sublime.ok_cancel_dialog(message, 'Remove'):
+                return
+
+            def _trim():
+                removed, freed = _trim_caches(candidates)
+                trimmed = output + '\n> Trimmed: removed %d entries, freeing %s' % (
+                    removed,
+                    _format_sample_value(freed, 'bytes')
+                )
+                if removed < len(candidates):
+                    trimmed += ', %d were used since the scan and kept' % (len(candidates) - removed)
+                sublime.set_timeout(lambda: _show_report(self.window, None, trimmed), 1)
+
+            threading.Thread(target=_trim).start()
+
+        self.window.show_input_panel(
+            'Trim caches to (MB)',
+            '%d' % trim_size,
+            on_done,
+            None,
+            None
+        )
+
+
+class GolangBuildProfileDiffCommand(sublime_plugin.WindowCommand):
+
+    """
+    Compares the profiles from two runs of the "benchmark_profile" task
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_profile_diff" command - invoked by Sublime Text
+        via the command palette or sublime.Window.run_command()
+        """
+
+        runs = _profile_runs()
+        if len(runs) < 2:
+            sublime.error_message(_format_message("""
+                Golang Build
+
+                At least two profiled benchmark runs are required to compare
+                profiles
+            """))
+            return
+
+        options = []
+        for run_dir, meta in runs:
+            options.append([
+                os.path.basename(run_dir),
+                meta.get('working_dir', '')
+            ])
+
+        def on_base(base_index):
+            """
+            Prompts for the run to compare with the base run
+
+            :param base_index:
+                The index of the option the user selected, or -1 if cancelled
+            """
+
+            if base_index == -1:
+                return
+
+            def on_new(new_index):
+                """
+                Displays the comparison of the two runs
+
+                :param new_index:
+                    The index of the option the user selected, or -1 if
+                    cancelled
+                """
+
+                if new_index == -1:
+                    return
+
+                output = '> Base: %s\n> New: %s\n' % (options[base_index][0], options[new_index][0])
+                for kind, filename, sample_types in PROFILE_KINDS:
+                    base_path = os.path.join(runs[base_index][0], filename)
+                    new_path = os.path.join(runs[new_index][0], filename)
+                    if not os.path.exists(base_path) or not os.path.exists(new_path):
+                        continue
+                    try:
+                        base_profile = _read_pprof(base_path)
+                        new_profile = _read_pprof(new_path)
+                    except (ValueError) as e:
+                        output += '> %s Profile: %s\n' % (kind, str_cls(e))
+                        continue
+                    output += _format_pprof_diff(
+                        kind,
+                        base_profile,
+                        new_profile,
+                        sample_types,
+                        runs[new_index][1].get('working_dir')
+                    )
+                _show_report(self.window, runs[new_index][1].get('working_dir'), output)
+
+            sublime.set_timeout(lambda: self.window.show_quick_panel(options, on_new), 10)
+
+        self.window.show_quick_panel(options, on_base)
+
+
+class GolangBuildCoverageClearCommand(sublime_plugin.WindowCommand):
+
+    """
+    Removes the coverage annotations from all views
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_coverage_clear" command - invoked by Sublime
+        Text via the command palette or sublime.Window.run_command()
+        """
+
+        global _COVERAGE
+
+        previous = _COVERAGE
+        _COVERAGE = {}
+        _annotate_coverage(set(previous.keys()))
+
+    def is_enabled(self):
+        return len(_COVERAGE) > 0
+
+
+class GolangBuildCoverageListener(sublime_plugin.EventListener):
+
+    """
+    Annotates files with the results of the last "coverage" run as they are
+    opened
+    """
+
+    def on_load(self, view):
+        """
+        Adds coverage regions to the view, if there is coverage information
+        for the file
+
+        :param view:
+            The sublime.View object that was loaded
+        """
+
+        if _COVERAGE and view.file_name():
+            _annotate_coverage_view(view, _COVERAGE, _coverage_basenames(_COVERAGE))
+
+
+class GolangBuildRerunFailuresCommand(sublime_plugin.WindowCommand):
+
+    """
+    Runs "go test" for only the tests that failed during the previous test run
+    in the same window and working directory
+    """
+
+    def run(self, flags=None):
+        """
+        Runs the "golang_build_rerun_failures" command - invoked by Sublime
+        Text via the command palette or sublime.Window.run_command()
+
+        :param flags:
+            A list of unicode strings of flags to send to the command-line go
+            tool. Execute "go help test" on the command line to learn about
+            available flags.
+        """
+
+        if _yield_to_running_build(self.window):
+            return
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        failures = _load_json(_storage_path('failures.json'), {}).get(_results_key(self.window, working_dir))
+        if not failures:
+            sublime.error_message(_format_message("""
+                Golang Build
+
+                No test failures were recorded for the previous test run
+            """))
+            return
+
+        go_bin, env = _get_config(
+            'go',
+            set(['GOPATH']),
+            GO_ENV_VARS - set(['GOPATH']),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if (go_bin, env) == (None, None):
+            return
+
+        if flags is None:
+            flags, _ = golangconfig.setting_value(
+                'test:flags',
+                view=self.window.active_view(),
+                window=self.window
+            )
+
+        if flags is None:
+            flags = ['-v']
+
+        test_names = set()
+        for package in failures:
+            test_names.update(failures[package])
+
+        args = [go_bin, 'test']
+        if flags and isinstance(flags, list):
+            args.extend(flags)
+        if test_names:
+            args.extend(['-run', '^(%s)$' % '|'.join(sorted(test_names))])
+        args.extend(sorted(failures.keys()))
+
+        proc = _run_process(
+            'test',
+            self.window,
+            args,
+            working_dir,
+            env,
+            handlers=[GolangTestFailureHandler(self.window, working_dir), GolangTestTimingHandler()]
+        )
+        _set_proc(self.window, proc)
+
+
+class GolangBuildBenchmarkCompareCommand(sublime_plugin.WindowCommand):
+
+    """
+    Compares the benchmarks of the working tree against those of a git
+    revision, running the two test binaries interleaved
+    """
+
+    def run(self, revision=None):
+        """
+        Runs the "golang_build_benchmark_compare" command - invoked by Sublime
+        Text via the command palette or sublime.Window.run_command()
+
+        :param revision:
+            A unicode string of the git revision to compare against. If None,
+            the user will be prompted for one.
+        """
+
+        if revision:
+            self._start(revision)
+            return
+
+        self.window.show_input_panel(
+            'Base revision:',
+            'HEAD',
+            self._start,
+            None,
+            None
+        )
+
+    def _start(self, revision):
+        """
+        Checks out the base revision into a temporary git worktree and then
+        builds and runs the benchmarks
+
+        :param revision:
+            A unicode string of the git revision to compare against
+        """
+
+        revision = revision.strip()
+        if not revision:
+            return
+
+        if _yield_to_running_build(self.window):
+            return
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        go_bin, env = _get_config(
+            'go',
+            set(['GOPATH']),
+            GO_ENV_VARS - set(['GOPATH']),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if (go_bin, env) == (None, None):
+            return
+
+        git_bin, _ = _get_config(
+            'git',
+            set(),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if git_bin is None:
+            return
+
+        view = self.window.active_view()
+        flags, _ = golangconfig.setting_value('benchmark_compare:flags', view=view, window=self.window)
+        rounds, _ = golangconfig.setting_value('benchmark_compare:rounds', view=view, window=self.window)
+        if not isinstance(rounds, int) or rounds < 1:
+            rounds = BENCHMARK_COMPARE_ROUNDS
+        bench, _ = golangconfig.setting_value('benchmark_compare:bench', view=view, window=self.window)
+        if not bench:
+            bench = '.'
+
+        def _create_worktree():
+            """
+            Creates the worktree of the base revision and then starts the
+            benchmarks
+
+            RUNS IN A THREAD
+            """
+
+            returncode, stdout, stderr = _run_capture([git_bin, 'rev-parse', '--show-toplevel'], working_dir, env)
+            if returncode == 0:
+                relative_dir = os.path.relpath(working_dir, stdout.strip())
+                temp_dir = tempfile.mkdtemp(dir=_temp_path('benchmark_compare'))
+                worktree = os.path.join(temp_dir, 'base')
+                returncode, stdout, stderr = _run_capture(
+                    [git_bin, 'worktree', 'add', '--detach', worktree, revision],
+                    working_dir,
+                    env
+                )
+                if returncode != 0:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+            if returncode != 0:
+                sublime.set_timeout(lambda: sublime.error_message(_format_message("""
+                    Golang Build
+
+                    A git worktree for %s could not be created:
+
+                    %s
+                """) % (revision, stderr.strip())), 1)
+                return
+
+            sides = [
+                ('new', working_dir),
+                ('base', os.path.normpath(os.path.join(worktree, relative_dir))),
+            ]
+            sublime.set_timeout(lambda: _start_pool(sides, temp_dir, worktree), 1)
+
+        def _start_pool(sides, temp_dir, worktree):
+            """
+            Starts a GolangProcessPool() that builds the test binary of each
+            side and then runs them one at a time, alternating sides
+
+            :param sides:
+                A list of two-element tuples of a unicode string side name and
+                the package directory for that side
+
+            :param temp_dir:
+                A unicode string of the temporary directory holding the
+                worktree and test binaries
+
+            :param worktree:
+                A unicode string of the path to the worktree
+            """
+
+            suffix = '.exe' if sys.platform == 'win32' else ''
+            jobs = []
+            for side, package_dir in sides:
+                args = [go_bin, 'test', '-c', '-o', os.path.join(temp_dir, side + '.test' + suffix)]
+                if flags and isinstance(flags, list):
+                    args.extend(flags)
+                jobs.append((args, package_dir, env, None))
+
+            handlers = {'new': [], 'base': []}
+            for round_ in range(rounds):
+                # Alternate which side runs first so drift affects both equally
+                order = sides if round_ % 2 == 0 else list(reversed(sides))
+                for side, package_dir in order:
+                    handler = GolangBenchmarkResultHandler()
+                    handlers[side].append(handler)
+                    args = [
+                        os.path.join(temp_dir, side + '.test' + suffix),
+                        '-test.run', '^$',
+                        '-test.bench', bench,
+                        '-test.benchmem',
+                    ]
+                    jobs.append((args, package_dir, env, [handler]))
+
+            def _compare(pool):
+                """
+                Removes the worktree and compares the results of each side
+
+                RUNS IN A THREAD
+
+                :param pool:
+                    The GolangProcessPool() that finished
+
+                :return:
+                    None, or a unicode string of the comparison
+                """
+
+                _run_capture([git_bin, 'worktree', 'remove', '--force', worktree], working_dir, env)
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+                if pool.result != 'success':
+                    return None
+
+                samples = {}
+                for side in handlers:
+                    for handler in handlers[side]:
+                        for name, _, metrics in handler.results:
+                            for unit in metrics:
+                                samples.setdefault((name, unit), {'new': [], 'base': []})[side].append(metrics[unit])
+                return _format_benchmark_comparison(revision, rounds, samples)
+
+            pool = GolangProcessPool(
+                'benchmark_compare',
+                self.window,
+                jobs,
+                1,
+                on_complete=_compare,
+                stop_on_error=True
+            )
+            _set_proc(self.window, pool)
+
+        threading.Thread(target=_create_worktree).start()
+
+
+class GolangBuildBenchmarkBaselineCommand(sublime_plugin.WindowCommand):
+
+    """
+    Saves the results of the most recent benchmark run as the baseline that
+    the "max_change" benchmark budgets are checked against
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_benchmark_baseline" command - invoked by Sublime
+        Text via the command palette or sublime.Window.run_command()
+        """
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        key = _results_key(self.window, working_dir)
+        results_path = _storage_path('benchmark_results.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            stored = _load_json(results_path, {})
+            entry = stored.get(key)
+            if entry and entry.get('last'):
+                entry['baseline'] = entry['last']
+                _save_json(results_path, stored)
+        finally:
+            _STORAGE_LOCK.release()
+
+        if not entry or not entry.get('last'):
+            sublime.error_message(_format_message("""
+                Golang Build
+
+                No benchmark results were recorded for %s. Benchmark results
+                are only recorded when the "benchmark:budgets" setting is set.
+            """) % working_dir)
+            return
+
+        sublime.status_message('Golang Build: saved %d benchmark results as the baseline' % len(entry['last']))
+
+
+class GolangBuildTestAtCursorCommand(sublime_plugin.WindowCommand):
+
+    """
+    Runs only the Test, Benchmark, Fuzz or Example function that contains the
+    cursor
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_test_at_cursor" command - invoked by Sublime
+        Text via the command palette or sublime.Window.run_command()
+        """
+
+        view = self.window.active_view()
+        # Only the functions of the file the cursor is in can contain it
+        functions = _view_test_functions(view)
+        if functions is None:
+            return
+
+        enclosing = None
+        if len(view.sel()) > 0:
+            row = view.rowcol(view.sel()[0].begin())[0] + 1
+            for function in functions:
+                if function['start'] <= row <= function['end']:
+                    enclosing = function
+                    break
+
+        if enclosing is None:
+            sublime.error_message(_format_message("""
+                Golang Build
+
+                The cursor is not inside of a Test, Benchmark, Fuzz or
+                Example function
+            """))
+            return
+
+        if enclosing['kind'] == 'Benchmark':
+            selection = ['-run', '^$', '-bench', '^%s$' % enclosing['name']]
+        else:
+            selection = ['-run', '^%s$' % enclosing['name']]
+        _run_selected_tests(self.window, selection)
+
+
+class GolangBuildTestFileCommand(sublime_plugin.WindowCommand):
+
+    """
+    Runs all of the Test, Fuzz and Example functions in the current _test.go
+    file, or the _test.go file for the current file
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_test_file" command - invoked by Sublime Text via
+        the command palette or sublime.Window.run_command()
+        """
+
+        view = self.window.active_view()
+        functions = _view_test_functions(view)
+        if functions is None:
+            return
+        if not view.file_name().endswith('_test.go'):
+            file_name = view.file_name()[:-3] + '_test.go'
+            functions = _package_test_functions(os.path.dirname(file_name)).get(file_name, [])
+
+        names = [function['name'] for function in functions if function['kind'] != 'Benchmark']
+        if not names:
+            sublime.error_message(_format_message("""
+                Golang Build
+
+                No Test, Fuzz or Example functions were found in the file
+            """))
+            return
+
+        _run_selected_tests(self.window, ['-run', '^(%s)$' % '|'.join(names)])
+
+
+def _view_test_functions(view):
+    """
+    Finds the test functions of the file open in a view
+
+    :param view:
+        A sublime.View object
+
+    :return:
+        None if the view is not a saved Go file, otherwise a list of dicts
+        from _find_test_functions(), which is empty if the file is not a
+        _test.go file
+    """
+
+    if view is None or not view.file_name() or not view.file_name().endswith('.go'):
+        sublime.error_message(_format_message("""
+            Golang Build
+
+            The current file is not a saved Go file
+        """))
+        return None
+
+    file_name = view.file_name()
+    if not file_name.endswith('_test.go'):
+        return []
+
+    # Unsaved changes move functions around, so the buffer is used instead of
+    # the cached index of the file on disk
+    if view.is_dirty():
+        return _find_test_functions(view.substr(sublime.Region(0, view.size())))
+    return _package_test_functions(os.path.dirname(file_name)).get(file_name, [])
+
+
+def _run_selected_tests(window, selection):
+    """
+    Runs "go test" in the working directory with flags that select tests
+
+    :param window:
+        The sublime.Window object to run the tests in
+
+    :param selection:
+        A list of unicode strings of flags, such as -run, that select the
+        tests to run
+    """
+
+    if _yield_to_running_build(window):
+        return
+
+    working_dir = _determine_working_dir(window)
+    if working_dir is None:
+        return
+
+    go_bin, env = _get_config(
+        'go',
+        set(['GOPATH']),
+        GO_ENV_VARS - set(['GOPATH']),
+        view=window.active_view(),
+        window=window,
+    )
+    if (go_bin, env) == (None, None):
+        return
+
+    flags, _ = golangconfig.setting_value(
+        'test:flags',
+        view=window.active_view(),
+        window=window
+    )
+
+    if flags is None:
+        flags = ['-v']
+
+    args = [go_bin, 'test']
+    if flags and isinstance(flags, list):
+        args.extend(flags)
+    args.extend(selection)
+
+    proc = _run_process(
+        'test',
+        window,
+        args,
+        working_dir,
+        env,
+        handlers=[GolangTestFailureHandler(window, working_dir), GolangTestTimingHandler()]
+    )
+    _set_proc(window, proc)
+
+
+class GolangBuildTerminalCommand(sublime_plugin.WindowCommand):
+
+    """
+    Opens a terminal for the user to the directory containing the open file,
+    setting any necessary environment variables
+    """
+
+    def run(self):
+        """
+        Runs the "golang_build_terminal" command - invoked by Sublime Text via
+        the command palette or sublime.Window.run_command()
+        """
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        relevant_sources = set([
+            'project file',
+            'project file (os-specific)',
+            'golang.sublime-settings',
+            'golang.sublime-settings (os-specific)'
+        ])
+
+        env_overrides = {}
+        for var_name in GO_ENV_VARS:
+            value, source = golangconfig.setting_value(var_name, window=self.window)
+            # Only set overrides that are not coming from the user's shell
+            if source in relevant_sources:
+                env_overrides[var_name] = value
+
+        # Get the PATH from the shell environment and then prepend any custom
+        # value so the user's terminal searches all locations
+        value, source = golangconfig.setting_value('PATH', window=self.window)
+        if source in relevant_sources:
+            shell, env = shellenv.get_env()
+            env_overrides['PATH'] = value + os.pathsep + env.get('PATH', '')
+
+        newterm.launch_terminal(working_dir, env=env_overrides)
+
+
+class GolangBuildOverlayCommand(sublime_plugin.WindowCommand):
+
+    """
+    Command to run "go build" or "go vet" using the contents of unsaved
+    buffers, via the -overlay flag of the go tool
+    """
+
+    def run(self, task='build', flags=None, show_panel=True):
+        """
+        Runs the "golang_build_overlay" command - invoked by Sublime Text via
+        the command palette, sublime.Window.run_command() or automatically
+        when a Go buffer is modified
+
+        :param task:
+            A unicode string of "build" or "vet"
+
+        :param flags:
+            A list of unicode strings of flags to send to the command-line go
+            tool. Execute "go help build" on the command line to learn about
+            available flags.
+
+        :param show_panel:
+            If the "golang_build_overlay" output panel should be shown
+        """
+
+        overlay = _get_overlay(self.window)
+        if overlay.running():
+            overlay.pending = {'task': task, 'flags': flags, 'show_panel': show_panel}
+            return
+
+        # Overlay builds happen while the user is typing, so they never
+        # interrupt a build the user explicitly started
+        proc = _get_proc(self.window)
+        if proc and not proc.finished:
+            return
+
+        working_dir = _determine_working_dir(self.window)
+        if working_dir is None:
+            return
+
+        go_bin, env = _get_config(
+            'go',
+            set(['GOPATH']),
+            GO_ENV_VARS - set(['GOPATH']),
+            view=self.window.active_view(),
+            window=self.window,
+        )
+        if (go_bin, env) == (None, None):
+            return
+
+        if flags is None:
+            flags, _ = golangconfig.setting_value(
+                'overlay:flags',
+                view=self.window.active_view(),
+                window=self.window
+            )
+
+        if flags is None:
+            flags = ['-v']
+
+        args = [go_bin, task]
+        overlay_path = overlay.update(self.window)
+        if overlay_path is not None:
+            args.extend(['-overlay', overlay_path])
+        # The goal is to find errors, so there is no reason to write an
+        # executable into the user's source folder
+        if task == 'build':
+            args.extend(['-o', os.devnull])
+        if flags and isinstance(flags, list):
+            args.extend(flags)
+
+        if overlay.panel is None:
+            overlay.panel = GolangPanel(self.window, 'golang_build_overlay')
+
+        overlay.proc = _run_process(
+            'overlay',
+            self.window,
+            args,
+            working_dir,
+            env,
+            handlers=[GolangOverlayHandler(self.window, overlay)],
+            qos=_qos_setting(self.window, 'overlay', 'background'),
+            panel=overlay.panel,
+            show=show_panel
+        )
+        _set_proc(self.window, overlay.proc)
+
+
+class GolangBuildOverlayListener(sublime_plugin.EventListener):
+
+    """
+    Starts an overlay build once the user stops modifying a Go buffer, if the
+    "overlay:on_modified" setting is enabled
+    """
+
+    def on_modified(self, view):
+        """
+        Schedules an overlay build for the window containing the view
+
+        :param view:
+            The sublime.View object that was modified
+        """
+
+        window = view.window()
+        if window is None or not view.file_name():
+            return
+        if not view.match_selector(0, 'source.go'):
+            return
+
+        overlay = _get_overlay(window)
+        overlay.generation += 1
+        generation = overlay.generation
+
+        def _start_build():
+            if generation != overlay.generation:
+                return
+            enabled, _ = golangconfig.setting_value(
+                'overlay:on_modified',
+                view=view,
+                window=window
+            )
+            if not enabled:
+                return
+            window.run_command('golang_build_overlay', {'show_panel': False})
+
+        sublime.set_timeout(_start_build, OVERLAY_DELAY)
+
+
+class GolangBuildPrewarmListener(sublime_plugin.EventListener):
+
+    """
+    Prewarms the build cache of the first folder of a window when the window
+    is first used, or the git HEAD of the folder changed, if the
+    "prewarm:enabled" setting is enabled. Also tracks when the user was last
+    active, so prewarming only happens while the editor is idle.
+    """
+
+    def on_activated(self, view):
+        """
+        Schedules a prewarm if the window is new or the git HEAD moved
+
+        :param view:
+            The sublime.View object that was activated
+        """
+
+        window = view.window()
+        if window is None or not window.folders():
+            return
+        self._touch(view)
+
+        enabled, _ = golangconfig.setting_value(
+            'prewarm:enabled',
+            view=view,
+            window=window
+        )
+        if not enabled:
+            return
+
+        prewarm = _get_prewarm(window)
+        folder = window.folders()[0]
+        head = _git_head(folder)
+        if folder in prewarm.heads and prewarm.heads[folder] == head:
+            return
+        prewarm.heads[folder] = head
+        prewarm.schedule(window)
+
+    def on_modified(self, view):
+        """
+        Records that the user is typing, which postpones any pending prewarm
+
+        :param view:
+            The sublime.View object that was modified
+        """
+
+        self._touch(view)
+
+    def on_selection_modified(self, view):
+        """
+        Records that the user moved the cursor, which postpones any pending
+        prewarm
+
+        :param view:
+            The sublime.View object the selection changed in
+        """
+
+        self._touch(view)
+
+    def _touch(self, view):
+        """
+        Records user activity in the window containing the view
+
+        :param view:
+            The sublime.View object the user interacted with
+        """
+
+        window = view.window()
+        if window is None:
+            return
+        prewarm = _PREWARMS.get(window.id())
+        if prewarm:
+            prewarm.activity = time.time()
+
+
+class GolangBuildPrefetchListener(sublime_plugin.EventListener):
+
+    """
+    Downloads the modules required by the go.mod files in the top level of the
+    open folders when they change, if the "prefetch:enabled" setting is
+    enabled
+    """
+
+    def on_activated(self, view):
+        """
+        Checks the go.mod and go.sum files of the open folders, since they may
+        have been changed outside of Sublime Text, such as by git
+
+        :param view:
+            The sublime.View object that was activated
+        """
+
+        window = view.window()
+        if window is None or not self._enabled(view, window):
+            return
+        for folder in window.folders():
+            if os.path.exists(os.path.join(folder, 'go.mod')):
+                _get_prefetch(folder).update(window)
+
+    def on_post_save(self, view):
+        """
+        Starts a prefetch when a go.mod or go.sum file in an open folder is
+        saved
+
+        :param view:
+            The sublime.View object that was saved
+        """
+
+        window = view.window()
+        file_name = view.file_name()
+        if window is None or not file_name:
+            return
+        if os.path.basename(file_name) not in ('go.mod', 'go.sum'):
+            return
+        folder = os.path.dirname(file_name)
+        if folder not in window.folders() or not self._enabled(view, window):
+            return
+        _get_prefetch(folder).update(window)
+
+    def _enabled(self, view, window):
+        """
+        :return:
+            A boolean - if the "prefetch:enabled" setting is enabled
+        """
+
+        enabled, _ = golangconfig.setting_value(
+            'prefetch:enabled',
+            view=view,
+            window=window
+        )
+        return bool(enabled)
+
+
+def _yield_to_running_build(window):
+    """
+    Check if a build is already running, and if so, allow the user to stop it,
+    or cancel the new build
+
+    :param window:
+        A sublime.Window of the window the build is being run in
+
+    :return:
+        A boolean - if the new build should be abandoned
+    """
+
+    # An overlay build is stored via _set_proc() so it can be cancelled,
+    # but is not something the user needs to be asked about
+    overlay = _OVERLAYS.get(window.id())
+    proc = _get_proc(window)
+    if overlay and proc is overlay.proc:
+        proc = None
+    if proc and not proc.finished:
+        message = _format_message("""
+            Golang Build
+
+            There is already a build running. Would you like to stop it?
+        """)
+        if not sublime.ok_cancel_dialog(message, 'Stop Running Build'):
+            return True
+        proc.terminate()
+        _set_proc(window, None)
+
+    # Builds of unsaved buffers are only informational, so they are always
+    # stopped in favor of a build the user explicitly requested
+    if overlay:
+        overlay.terminate()
+
+    # Prewarming only saves time for builds the user has not started yet
+    prewarm = _PREWARMS.get(window.id())
+    if prewarm:
+        prewarm.terminate()
+
+    return False
+
+
+def _determine_working_dir(window):
+    """
+    Determine the working directory for a command based on the user's open file
+    or open folders
+
+    :param window:
+        The sublime.Window object of the window the command was run on
+
+    :return:
         A unicode string of the working directory, or None if no working
         directory was found
     """
 
-    view = window.active_view()
-    working_dir = None
+    view = window.active_view()
+    working_dir = None
+
+    # If a file is open, get the folder from the file, and error if the file
+    # has not been saved yet
+    if view:
+        if view.file_name():
+            working_dir = os.path.dirname(view.file_name())
+
+    # If no file is open, then get the list of folders and grab the first one
+    else:
+        folders = window.folders()
+        if len(folders) > 0:
+            working_dir = folders[0]
+
+    if working_dir is None or not os.path.exists(working_dir):
+        message = _format_message("""
+            Golang Build
+
+            No files or folders are open, or the open file or folder does not exist on disk
+        """)
+        sublime.error_message(message)
+        return None
+
+    return working_dir
+
+
+def _get_config(executable_name, required_vars, optional_vars=None, view=None, window=None):
+    """
+    :param executable_name:
+        A unicode string of the executable to locate, e.g. "go" or "gofmt"
+
+    :param required_vars:
+        A list of unicode strings of the environment variables that are
+        required, e.g. "GOPATH". Obtains values from setting_value().
+
+    :param optional_vars:
+        A list of unicode strings of the environment variables that are
+        optional, but should be pulled from setting_value() if available - e.g.
+        "GOOS", "GOARCH". Obtains values from setting_value().
+
+    :param view:
+        A sublime.View object to use in finding project-specific settings. This
+        should be passed whenever available.
+
+    :param window:
+        A sublime.Window object to use in finding project-specific settings.
+        This will only work for Sublime Text 3, and should only be passed if
+        no sublime.View object is available to pass via the view parameter.
+
+    :return:
+        A two-element tuple.
+
+        If there was an error finding the executable or required vars:
+
+         - [0] None
+         - [1] None
+
+        Otherwise:
+
+         - [0] A string of the path to the executable
+         - [1] A dict of environment variables for the executable
+    """
+
+    try:
+        executable_path, env = golangconfig.subprocess_info(
+            executable_name,
+            required_vars,
+            optional_vars,
+            view=view,
+            window=window
+        )
+        _normalize_goproxy(env)
+        return (executable_path, env)
+
+    except (golangconfig.ExecutableError) as e:
+        error_message = '''
+            Golang Build
+
+            The %s executable could not be found. Please ensure it is
+            installed and available via your PATH.
+
+            Would you like to view documentation for setting a custom PATH?
+        '''
+
+        prompt = error_message % e.name
+
+        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
+            window.run_command(
+                'open_url',
+                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
+            )
+
+    except (golangconfig.EnvVarError) as e:
+        error_message = '''
+            Golang Build
+
+            The setting%s %s could not be found in your Sublime Text
+            settings or your shell environment.
+
+            Would you like to view the configuration documentation?
+        '''
+
+        plural = 's' if len(e.missing) > 1 else ''
+        setting_names = ', '.join(e.missing)
+        prompt = error_message % (plural, setting_names)
+
+        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
+            window.run_command(
+                'open_url',
+                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
+            )
+
+    except (golangconfig.GoRootNotFoundError, golangconfig.GoPathNotFoundError) as e:
+        error_message = '''
+            Golang Build
+
+            %s.
+
+            Would you like to view the configuration documentation?
+        '''
+
+        prompt = error_message % str_cls(e)
+
+        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
+            window.run_command(
+                'open_url',
+                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
+            )
+
+    return (None, None)
+
+
+class GolangProcess():
+
+    """
+    A wrapper around subprocess.Popen() that provides information about how
+    the process was started and finished, plus a queue.Queue of output
+    """
+
+    # A float of the unix timestamp of when the process was started
+    started = None
+
+    # A list of strings (unicode for Python 3, byte string for Python 2) of
+    # the process path and any arguments passed to it
+    args = None
+
+    # A unicode string of the process working directory
+    cwd = None
+
+    # A dict of the env passed to the process
+    env = None
+
+    # A subprocess.Popen() object of the running process
+    proc = None
+
+    # A queue.Queue object of output from the process
+    output = None
+
+    # The result of the process, a unicode string of "cancelled", "success" or "error"
+    result = None
+
+    # A float of the unix timestamp of when the process ended
+    finished = None
+
+    # None or a float of the unix timestamp of when the process first wrote
+    # output
+    first_output = None
+
+    # A unicode string of the QoS class - "foreground", "background" or "idle"
+    qos = 'foreground'
+
+    # A boolean - if the process has been stopped by pause()
+    paused = False
+
+    # A boolean - if the process may be paused while a "foreground" process
+    # is running
+    pausable = True
+
+    # A threading.Lock() used to prevent the stdout and stderr handlers from
+    # both trying to perform process cleanup at the same time
+    _cleanup_lock = None
+
+    def __init__(self, args, cwd, env, qos='foreground', pausable=True):
+        """
+        :param args:
+            A list of strings (unicode for Python 3, byte string for Python 2)
+            of the process path and any arguments passed to it
+
+        :param cwd:
+            A unicode string of the working directory for the process
+
+        :param env:
+            A dict of strings (unicode for Python 3, byte string for Python 2)
+            to pass to the process as the environment variables
+
+        :param qos:
+            A unicode string of the QoS class - "foreground", "background" or
+            "idle". Processes other than "foreground" run with a lower CPU and
+            I/O priority, GOMAXPROCS and -p limit.
+
+        :param pausable:
+            If a process that is not "foreground" should be paused while a
+            "foreground" process is running. Processes that may download
+            modules are never paused.
+        """
+
+        self.qos = qos if qos in QOS_CLASSES else 'foreground'
+        # The go tool holds locks in the module cache while downloading, so
+        # pausing the process could block a foreground build indefinitely
+        self.pausable = pausable and not _may_download(env)
+
+        limit = _qos_limit(self.qos)
+        if limit:
+            args = _qos_args(args, limit)
+            if not _get_env(env, 'GOMAXPROCS'):
+                env = env.copy()
+                _set_env(env, 'GOMAXPROCS', '%d' % limit)
+
+        self.args = args
+        self.cwd = cwd
+        self.env = env
+
+        startupinfo = None
+        creationflags = 0
+        if sys.platform == 'win32':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            creationflags = _QOS_WINDOWS_PRIORITY.get(self.qos, 0)
+            preexec_fn = None
+        else:
+            nice = _QOS_NICE.get(self.qos)
+            ioprio = _QOS_IOPRIO.get(self.qos)
+            # The syscall is looked up before forking, since loading a library
+            # in the child is not safe
+            set_ioprio = _ioprio_setter() if ioprio else None
+
+            # On posix platforms we create a new process group by executing
+            # os.setsid() after the fork before the go binary is executed. This
+            # allows us to use os.killpg() to kill the whole process group.
+            def preexec_fn():
+                os.setsid()
+                if nice:
+                    os.nice(nice)
+                if set_ioprio:
+                    set_ioprio(ioprio[0], ioprio[1])
+
+        self._cleanup_lock = threading.Lock()
+        self.started = time.time()
+        self.proc = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            startupinfo=startupinfo,
+            preexec_fn=preexec_fn,
+            creationflags=creationflags
+        )
+        self.finished = False
+        _qos_started(self)
+
+        self.output = queue.Queue()
+
+        self._stdout_thread = threading.Thread(
+            target=self._read_output,
+            args=(
+                self.output,
+                self.proc.stdout.fileno(),
+                'stdout'
+            )
+        )
+        self._stdout_thread.start()
+
+        self._stderr_thread = threading.Thread(
+            target=self._read_output,
+            args=(
+                self.output,
+                self.proc.stderr.fileno(),
+                'stderr'
+            )
+        )
+        self._stderr_thread.start()
+
+        self._cleanup_thread = threading.Thread(target=self._cleanup)
+        self._cleanup_thread.start()
+
+    def wait(self):
+        """
+        Blocks waiting for the subprocess to complete
+        """
+
+        self._cleanup_thread.join()
+
+    def pause(self):
+        """
+        Stops the process group with SIGSTOP, on posix platforms
+        """
+
+        self._signal(signal.SIGSTOP if sys.platform != 'win32' else None, True)
+
+    def resume(self):
+        """
+        Continues the process group after pause()
+        """
+
+        self._signal(signal.SIGCONT if sys.platform != 'win32' else None, False)
+
+    def _signal(self, signal_number, paused):
+        """
+        Sends a signal to the process group and records if it is paused
+
+        :param signal_number:
+            None, or the integer signal to send
+
+        :param paused:
+            A boolean - if the process is paused once the signal is sent
+        """
+
+        self._cleanup_lock.acquire()
+        try:
+            if not self.proc or signal_number is None or self.paused == paused:
+                return
+            try:
+                os.killpg(os.getpgid(self.proc.pid), signal_number)
+                self.paused = paused
+            except (OSError):
+                pass
+        finally:
+            self._cleanup_lock.release()
+
+    def terminate(self):
+        """
+        Terminates the subprocess
+        """
+
+        self._cleanup_lock.acquire()
+        try:
+            if not self.proc:
+                return
+
+            if sys.platform != 'win32':
+                # On posix platforms we send SIGTERM to the whole process
+                # group to ensure both go and the compiled temporary binary
+                # are killed.
+                os.killpg(os.getpgid(self.proc.pid), signal.SIGTERM)
+                # A stopped process only handles the signal once continued
+                if self.paused:
+                    os.killpg(os.getpgid(self.proc.pid), signal.SIGCONT)
+                    self.paused = False
+            else:
+                # On Windows, there is no API to get the child processes
+                # of a process and send signals to them all. Attempted to use
+                # startupinfo.dwFlags with CREATE_NEW_PROCESS_GROUP and then
+                # calling self.proc.send_signal(signal.CTRL_BREAK_EVENT),
+                # however that did not kill the temporary binary. taskkill is
+                # part of Windows XP and newer, so we use that.
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                kill_proc = subprocess.Popen(
+                    ['taskkill', '/F', '/T', '/PID', str_cls(self.proc.pid)],
+                    startupinfo=startupinfo
+                )
+                kill_proc.wait()
+
+            self.result = 'cancelled'
+            self.finished = time.time()
+            self.proc = None
+        finally:
+            self._cleanup_lock.release()
+
+    def _read_output(self, output_queue, fileno, output_type):
+        """
+        Handler to process output from stdout/stderr
+
+        RUNS IN A THREAD
+
+        :param output_queue:
+            The queue.Queue object to add the output to
+
+        :param fileno:
+            The fileno to read output from
+
+        :param output_type:
+            A unicode string of "stdout" or "stderr"
+        """
+
+        while self.proc and self.proc.poll() is None:
+            chunk = os.read(fileno, 32768)
+            if len(chunk) == 0:
+                break
+            if self.first_output is None:
+                self.first_output = time.time()
+            output_queue.put((output_type, chunk.decode('utf-8')))
+
+    def _cleanup(self):
+        """
+        Cleans up the subprocess and marks the state of self appropriately
+
+        RUNS IN A THREAD
+        """
+
+        self._stdout_thread.join()
+        self._stderr_thread.join()
+
+        self._cleanup_lock.acquire()
+        try:
+            if not self.proc:
+                return
+            # Get the returncode to prevent a zombie/defunct child process
+            self.proc.wait()
+            self.result = 'success' if self.proc.returncode == 0 else 'error'
+            self.finished = time.time()
+            self.proc = None
+        finally:
+            self._cleanup_lock.release()
+            _qos_finished(self)
+            self.output.put(('eof', None))
+
+
+class GolangProcessPool():
+
+    """
+    Runs a list of GolangProcess() objects, at most a fixed number at a time,
+    printing the output of each to the same output panel. Provides the same
+    started, finished, result and terminate() interface as GolangProcess() so
+    it may be stored via _set_proc().
+    """
+
+    # A unicode string of the build task name
+    task = None
+
+    # The GolangPanel() object the output is written to
+    panel = None
+
+    # A float of the unix timestamp of when the pool was started
+    started = None
+
+    # The result of the pool, a unicode string of "cancelled", "success" or
+    # "error". Only "success" if every process succeeded.
+    result = None
+
+    # A float of the unix timestamp of when the last process ended and its
+    # output was printed, or False while running
+    finished = None
+
+    # A list of the GolangProcess() objects that have been started, in the
+    # order of the jobs
+    procs = None
+
+    # A list of (args, cwd, env, handlers) tuples of the jobs to run
+    _jobs = None
+
+    # A list of the GolangProcessPrinter() objects of the started processes
+    _printers = None
+
+    # An integer of the maximum number of processes to run at once
+    _concurrency = None
+
+    # None, or the callback to run once every process is finished
+    _on_complete = None
+
+    # A threading.Lock() used to prevent processes from being started while
+    # the pool is being terminated
+    _lock = None
+
+    # A boolean - if terminate() has been called
+    _terminated = False
+
+    # A boolean - if no more jobs should be started once a process fails
+    _stop_on_error = False
+
+    # None or a unicode string of the path of the "log:jsonl" file
+    _jsonl_path = None
+
+    # The GolangProgress() of the jobs
+    _progress = None
+
+    # None, or the GolangHistoryRecorder() the output of every process and
+    # the summary are recorded into, as a single run
+    _recorder = None
+
+    def __init__(self, task, window, jobs, concurrency, on_complete=None, stop_on_error=False):
+        """
+        Resets the output panel and starts running the jobs. Must be run in
+        the UI thread.
+
+        :param task:
+            A unicode string of the build task name
+
+        :param window:
+            A sublime.Window object of the window to display the output in
+
+        :param jobs:
+            A list of (args, cwd, env, handlers) tuples. handlers may be None
+            or a list of GolangOutputHandler() objects.
+
+        :param concurrency:
+            An integer of the maximum number of processes to run at once
+
+        :param on_complete:
+            None, or a callback that accepts the GolangProcessPool() once every
+            process is finished, and returns None or a unicode string to
+            display at the end of the output. Runs in a thread.
+
+        :param stop_on_error:
+            If no more jobs should be started once a process fails, for jobs
+            that depend on the ones before them
+        """
+
+        self.task = task
+        self.panel = _get_panel(window)
+        self._jobs = list(jobs)
+        self._concurrency = max(concurrency, 1)
+        self._on_complete = on_complete
+        self._stop_on_error = stop_on_error
+        self._jsonl_path = _jsonl_path(window)
+        _configure_metrics(window)
+        self._progress = GolangProgress(window, task, self._jobs[0][1] if self._jobs else '')
+        self.procs = []
+        self._printers = []
+        self._lock = threading.Lock()
+        try:
+            self._recorder = GolangHistoryRecorder()
+        except (IOError, OSError):
+            self._recorder = False
+
+        if self.panel.printer_lock.acquire(False):
+            self.panel.reset(window)
+            self.panel.printer_lock.release()
+        window.run_command('show_panel', {'panel': 'output.golang_build'})
+
+        self.started = time.time()
+        self.finished = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def terminate(self):
+        """
+        Terminates all running processes and prevents any more from starting
+        """
+
+        self._lock.acquire()
+        try:
+            self._terminated = True
+            procs = list(self.procs)
+        finally:
+            self._lock.release()
+
+        for proc in procs:
+            if not proc.finished:
+                proc.terminate()
+
+    def _run(self):
+        """
+        Starts the jobs as slots become available, then waits for all output
+        to be printed
+
+        RUNS IN A THREAD
+        """
+
+        pending = list(self._jobs)
+        while True:
+            self._lock.acquire()
+            try:
+                running = len([proc for proc in self.procs if not proc.finished])
+                if self._stop_on_error and [proc for proc in self.procs if proc.finished and proc.result != 'success']:
+                    pending = []
+                while pending and running < self._concurrency and not self._terminated:
+                    args, cwd, env, handlers = pending.pop(0)
+                    proc = GolangProcess(args, cwd, env)
+                    self.procs.append(proc)
+                    self._printers.append(GolangProcessPrinter(
+                        proc,
+                        self.panel,
+                        [_progress_handler(self._progress, self.task, False)] + (handlers or []),
+                        _output_sinks(self._jsonl_path),
+                        self.task,
+                        self._recorder
+                    ))
+                    running += 1
+                if running == 0 and (not pending or self._terminated):
+                    break
+            finally:
+                self._lock.release()
+            time.sleep(0.05)
+
+        for printer in self._printers:
+            printer.thread.join()
+
+        if self._terminated:
+            self.result = 'cancelled'
+        elif all(proc.result == 'success' for proc in self.procs):
+            self.result = 'success'
+        else:
+            self.result = 'error'
+        self.finished = time.time()
+        self._progress.finish(self.result)
+
+        output = None
+        try:
+            if self._on_complete:
+                output = self._on_complete(self)
+            self.panel.printer_lock.acquire()
+            try:
+                self.panel.recorder = self._recorder or None
+                if output:
+                    self.panel.write(output, content_separator='\n\n')
+            finally:
+                self.panel.recorder = None
+                self.panel.printer_lock.release()
+        finally:
+            if self._recorder:
+                self._recorder.close(self._event())
+
+    def _event(self):
+        """
+        Describes the whole pool for the build history
+
+        :return:
+            None if no process was started, otherwise a BuildCompleteEvent()
+            with the args, working directory and env of the first process
+        """
+
+        if not self.procs:
+            return None
+        first = self.procs[0]
+        return BuildCompleteEvent(
+            task=self.task,
+            args=list(first.args),
+            working_dir=first.cwd,
+            env=first.env.copy(),
+            runtime=self.finished - self.started,
+            result=self.result
+        )
+
+
+class GolangOutputHandler():
+
+    """
+    Base class for objects that observe, and optionally rewrite, the output of
+    a GolangProcess() as it is displayed by a GolangProcessPrinter()
+    """
+
+    def start(self, proc):
+        """
+        Called once the process has started, after the header is displayed
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that started
+        """
+
+        pass
+
+    def output(self, message_type, message):
+        """
+        Processes a chunk of output from the process
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param message:
+            A unicode string of the output
+
+        :return:
+            A unicode string of the output to display, or None to hide it
+        """
+
+        return message
+
+    def complete(self, proc):
+        """
+        Called once the process has finished, before the result is displayed.
+        The proc.result attribute may be changed to alter the reported result.
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of information to display before the
+            result of the process
+        """
+
+        return None
+
+
+class GolangReportHandler(GolangOutputHandler):
+
+    """
+    Displays a fixed report once the process has finished
+    """
+
+    # A unicode string of the report
+    report = None
+
+    def __init__(self, report):
+        """
+        :param report:
+            A unicode string of the report to display
+        """
+
+        self.report = report
+
+    def complete(self, proc):
+        """
+        Returns the report
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            A unicode string of the report
+        """
+
+        return self.report
+
+
+class GolangOutputSink():
+
+    """
+    Base class for objects that receive a copy of the unmodified output of a
+    GolangProcess() from a GolangProcessPrinter(), in addition to the output
+    panel
+    """
+
+    def header(self, proc):
+        """
+        Called once the process has started, after the header is displayed
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object
+        """
+
+        pass
+
+    def output(self, message_type, message):
+        """
+        Receives a chunk of output from the process, before it is passed to
+        any GolangOutputHandler() objects
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param message:
+            A unicode string of the output
+        """
+
+        pass
+
+    def footer(self, proc, event):
+        """
+        Called once the result of the process has been displayed
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :param event:
+            The BuildCompleteEvent() sent via package_events
+        """
+
+        pass
+
+
+class GolangJsonlSink(GolangOutputSink):
+
+    """
+    Writes the output of a process to a JSON Lines file as a "header" record,
+    "stdout" and "stderr" records and a "footer" record. Every record has a
+    "run" key identifying the process, and a "time" key with the unix
+    timestamp. Records are queued and written by a GolangJsonlWriter() thread,
+    so writing never delays the output panel.
+    """
+
+    # The GolangJsonlWriter() for the file
+    writer = None
+
+    # None or a unicode string identifying the process in the records
+    run_id = None
+
+    def __init__(self, path):
+        """
+        :param path:
+            A unicode string of the path of the file to append records to
+        """
+
+        self.writer = _jsonl_writer(path)
+
+    def header(self, proc):
+        """
+        Queues the "header" record with the environment, directory and args
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object
+        """
+
+        self.run_id = hashlib.sha1(('%r %r %r' % (proc.started, proc.args, id(self))).encode('utf-8')).hexdigest()[:16]
+        args = []
+        for arg in proc.args:
+            if not isinstance(arg, str_cls):
+                arg = arg.decode('utf-8', 'replace')
+            args.append(arg)
+        self.writer.put({
+            'run': self.run_id,
+            'time': proc.started,
+            'type': 'header',
+            'env': dict(_header_env(proc)),
+            'cwd': proc.cwd,
+            'args': args,
+        })
+
+    def output(self, message_type, message):
+        """
+        Queues a "stdout" or "stderr" record
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param message:
+            A unicode string of the output
+        """
+
+        self.writer.put({
+            'run': self.run_id,
+            'time': time.time(),
+            'type': message_type,
+            'text': message,
+        })
+
+    def footer(self, proc, event):
+        """
+        Queues the "footer" record with the result and runtime
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :param event:
+            The BuildCompleteEvent() sent via package_events
+        """
+
+        self.writer.put({
+            'run': self.run_id,
+            'time': time.time(),
+            'type': 'footer',
+            'result': event.result,
+            'runtime': event.runtime,
+        })
+
+
+class GolangJsonlWriter():
+
+    """
+    Appends records to a JSON Lines file from a background thread, writing
+    all of the records queued within JSONL_FLUSH_INTERVAL at once
+    """
+
+    # A unicode string of the path of the file
+    path = None
+
+    # A queue.Queue() of the dict records to write
+    queue = None
+
+    def __init__(self, path):
+        """
+        :param path:
+            A unicode string of the path of the file to append records to
+        """
+
+        self.path = path
+        self.queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, record):
+        """
+        Queues a record to be written
+
+        :param record:
+            A dict that can be encoded as JSON
+        """
+
+        self.queue.put(record)
+
+    def _run(self):
+        """
+        Waits for records and writes them in batches
+
+        RUNS IN A THREAD
+        """
+
+        while True:
+            records = [self.queue.get()]
+            deadline = time.time() + JSONL_FLUSH_INTERVAL
+            while len(records) < JSONL_BATCH_SIZE:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    records.append(self.queue.get(True, remaining))
+                except (queue.Empty):
+                    break
+
+            data = ''.join(json.dumps(record) + '\n' for record in records)
+            try:
+                dirname = os.path.dirname(self.path)
+                if dirname and not os.path.exists(dirname):
+                    os.makedirs(dirname)
+                with open(self.path, 'ab') as f:
+                    f.write(data.encode('utf-8'))
+            except (IOError, OSError) as e:
+                print('Golang Build: unable to write to %s - %s' % (self.path, str_cls(e)))
+
+
+class GolangLineHandler(GolangOutputHandler):
+
+    """
+    Base class for handlers that inspect the output of a process one line at a
+    time, without altering it
+    """
+
+    # A dict with unicode string keys of "stdout" and "stderr" and values of
+    # a unicode string of any incomplete line of output
+    _partial = None
+
+    def output(self, message_type, message):
+        """
+        Splits the output into lines and passes each complete line to line()
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param message:
+            A unicode string of the output
+
+        :return:
+            The message, unaltered
+        """
+
+        if self._partial is None:
+            self._partial = {}
+        lines = (self._partial.get(message_type, '') + message).split('\n')
+        self._partial[message_type] = lines.pop()
+        for line in lines:
+            self.line(message_type, line.rstrip('\r'))
+        return message
+
+    def line(self, message_type, line):
+        """
+        Processes a single line of output
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line, without the trailing newline
+        """
+
+        pass
+
+
+class GolangProcessPrinter():
+
+    """
+    Describes a Go process, the environment it was started in and its result
+    """
+
+    # The GolangProcess() object the printer is displaying output from
+    proc = None
+
+    # The GolangPanel() object the information is written to
+    panel = None
+
+    # A list of GolangOutputHandler() objects to pass the output through
+    handlers = None
+
+    # A list of GolangOutputSink() objects that receive a copy of the output
+    sinks = None
+
+    # An integer of the number of bytes of output from the process
+    output_bytes = 0
+
+    # A unicode string of the build task name
+    task = None
+
+    # None to record the output into a new GolangHistoryRecorder(), False to
+    # not record it, or the GolangHistoryRecorder() of the GolangProcessPool()
+    # the process is part of, which is closed by the pool
+    recorder = None
+
+    def __init__(self, proc, panel, handlers=None, sinks=None, task='', recorder=None):
+        """
+        :param proc:
+            A GolangProcess() object
+
+        :param panel:
+            A GolangPanel() object to write information to
+
+        :param handlers:
+            None or a list of GolangOutputHandler() objects to pass the output
+            through before it is written to the panel
+
+        :param sinks:
+            None or a list of GolangOutputSink() objects to write a copy of the
+            output to
+
+        :param task:
+            A unicode string of the build task name, as passed to the
+            "golang_build" command, or the name of another command's task
+
+        :param recorder:
+            None to record the output in the build history as its own run,
+            False to not record it, or the GolangHistoryRecorder() of the
+            GolangProcessPool() the process is part of
+        """
+
+        self.proc = proc
+        self.panel = panel
+        self.handlers = handlers or []
+        self.sinks = sinks or []
+        self.task = task
+        self.recorder = recorder
+
+        self.thread = threading.Thread(
+            target=self._run
+        )
+        self.thread.start()
+
+    def _run(self):
+        """
+        GolangProcess() output queue processor
+
+        RUNS IN A THREAD
+        """
+
+        self.panel.printer_lock.acquire()
+        self.panel.set_base_dir(self.proc.cwd)
+
+        event = None
+        recorder = self.recorder
+        if recorder is None:
+            try:
+                recorder = GolangHistoryRecorder()
+            except (IOError, OSError):
+                recorder = None
+        self.panel.recorder = recorder or None
+
+        try:
+            self._write_header()
+            for sink in self.sinks:
+                sink.header(self.proc)
+            for handler in self.handlers:
+                handler.start(self.proc)
+
+            while True:
+                message_type, message = self.proc.output.get()
+
+                if message_type == 'eof':
+                    break
+
+                self.output_bytes += len(message.encode('utf-8'))
+                for sink in self.sinks:
+                    sink.output(message_type, message)
+
+                if message_type == 'stdout':
+                    output = message
+
+                if message_type == 'stderr':
+                    output = message
+
+                for handler in self.handlers:
+                    output = handler.output(message_type, output)
+                    if output is None:
+                        break
+
+                if output:
+                    self.panel.write(output)
+
+            for handler in self.handlers:
+                report = handler.complete(self.proc)
+                if report:
+                    self.panel.write(report, content_separator='\n')
+
+            event = self._write_footer()
+            for sink in self.sinks:
+                sink.footer(self.proc, event)
+
+        finally:
+            self.panel.recorder = None
+            self.panel.printer_lock.release()
+            if recorder and self.recorder is None:
+                recorder.close(event)
+
+    def _write_header(self):
+        """
+        Displays startup information about the process
+        """
+
+        title = ''
+
+        env_vars = _header_env(self.proc)
+        if env_vars:
+            title += '> Environment:\n'
+            for var_name, value in env_vars:
+                title += '>   %s=%s\n' % (var_name, value)
+
+        title += '> Directory: %s\n' % self.proc.cwd
+        title += '> Command: %s\n' % subprocess.list2cmdline(self.proc.args)
+        title += '> Output:\n'
+
+        self.panel.write(title, content_separator='\n\n')
+
+    def _write_footer(self):
+        """
+        Displays result information about the process, blocking until the
+        write is completed
+
+        :return:
+            The BuildCompleteEvent() sent via package_events
+        """
+
+        formatted_result = self.proc.result.title()
+        runtime = self.proc.finished - self.proc.started
+
+        output = '> Elapsed: %0.3fs\n> QoS: %s\n> Result: %s' % (runtime, self.proc.qos, formatted_result)
+
+        event = threading.Event()
+        self.panel.write(output, content_separator='\n', event=event)
+        event.wait()
+
+        build_event = BuildCompleteEvent(
+            task=self.task,
+            args=list(self.proc.args),
+            working_dir=self.proc.cwd,
+            env=self.proc.env.copy(),
+            runtime=runtime,
+            result=self.proc.result
+        )
+        package_events.notify('Golang Build', 'build_complete', build_event)
+
+        first_output = None
+        if self.proc.first_output is not None:
+            first_output = self.proc.first_output - self.proc.started
+        _METRICS.record(self.task, self.proc.result, runtime, first_output, self.output_bytes)
+
+        return build_event
+
+
+def _header_env(proc):
+    """
+    Lists the Go environment variables set for a process
+
+    :param proc:
+        A GolangProcess() object
+
+    :return:
+        A list of two-element tuples of unicode strings of the variable name
+        and value
+    """
+
+    env_vars = []
+    for var_name in GO_ENV_VARS:
+        var_key = var_name if sys.version_info >= (3,) else var_name.encode('ascii')
+        if var_key in proc.env:
+            value = proc.env.get(var_key)
+            if sys.version_info < (3,):
+                value = value.decode('utf-8')
+            env_vars.append((var_name, value))
+    return env_vars
+
+
+BuildCompleteEvent = collections.namedtuple(
+    'BuildCompleteEvent',
+    [
+        'task',
+        'args',
+        'working_dir',
+        'env',
+        'runtime',
+        'result',
+    ]
+)
+
+
+RuntimeTelemetryEvent = collections.namedtuple(
+    'RuntimeTelemetryEvent',
+    [
+        'args',
+        'working_dir',
+        'gc_count',
+        'pause_p50',
+        'pause_p99',
+        'heap_goal',
+        'threads',
+        'runnable_goroutines',
+    ]
+)
+
+
+BuildProgressEvent = collections.namedtuple(
+    'BuildProgressEvent',
+    [
+        'task',
+        'working_dir',
+        'package',
+        'action',
+        'result',
+        'elapsed',
+    ]
+)
+
+
+class GolangProgress():
+
+    """
+    Tracks the packages a build has started and finished, sending each as a
+    "build_progress" event via package_events, and displays the progress in
+    the status bar with an estimate of the time remaining, based on how long
+    the same task took in the same folder before
+    """
+
+    # A unicode string of the build task name
+    task = None
+
+    # A unicode string of the working directory of the build
+    working_dir = None
+
+    # A float of the unix timestamp of when the build was started
+    started = None
+
+    # A set of unicode strings of the import paths of packages started
+    started_packages = None
+
+    # A set of unicode strings of the import paths of packages finished
+    finished_packages = None
+
+    # None or a float of the median runtime of previous builds
+    expected_runtime = None
+
+    # None or an integer of the number of packages of the previous build
+    expected_packages = None
+
+    # None or a unicode string of the result once the build is finished
+    result = None
+
+    # A unicode string of the key the runtimes are stored under
+    _key = None
+
+    # None, or the sublime.View object the status is displayed in. When the
+    # window has no views, the progress is shown via sublime.status_message().
+    _view = None
+
+    def __init__(self, window, task, working_dir):
+        """
+        Loads the previous runtimes and starts updating the status bar. Must
+        be run in the UI thread.
+
+        :param window:
+            A sublime.Window object of the window running the build
+
+        :param task:
+            A unicode string of the build task name
+
+        :param working_dir:
+            A unicode string of the working directory of the build
+        """
+
+        self.task = task
+        self.working_dir = working_dir
+        self.started = time.time()
+        self.started_packages = set()
+        self.finished_packages = set()
+        self._key = '%s\n%s' % (task, _results_key(window, working_dir))
+        # A window with only a folder open has no active view
+        self._view = window.active_view()
+        if self._view is None and window.views():
+            self._view = window.views()[0]
+
+        _STORAGE_LOCK.acquire()
+        try:
+            previous = _load_json(_storage_path('progress.json'), {}).get(self._key)
+        finally:
+            _STORAGE_LOCK.release()
+        if previous and previous.get('runtimes'):
+            runtimes = sorted(previous['runtimes'])
+            self.expected_runtime = runtimes[len(runtimes) // 2]
+            self.expected_packages = previous.get('packages') or None
+
+        self._update_status()
+
+    def package(self, action, package, result=None):
+        """
+        Records that a package was started or finished
+
+        RUNS IN A THREAD
+
+        :param action:
+            A unicode string of "started" or "finished"
+
+        :param package:
+            A unicode string of the import path of the package
+
+        :param result:
+            None when started, otherwise a unicode string of "success",
+            "error" or "skipped"
+        """
+
+        if action == 'started':
+            self.started_packages.add(package)
+        else:
+            self.finished_packages.add(package)
+        package_events.notify(
+            'Golang Build',
+            'build_progress',
+            BuildProgressEvent(
+                task=self.task,
+                working_dir=self.working_dir,
+                package=package,
+                action=action,
+                result=result,
+                elapsed=time.time() - self.started,
+            )
+        )
+
+    def count(self):
+        """
+        :return:
+            An integer of the number of packages the build has got to
+        """
+
+        return max(len(self.started_packages), len(self.finished_packages))
+
+    def status(self):
+        """
+        Formats the progress for the status bar
+
+        :return:
+            A unicode string
+        """
+
+        parts = []
+        count = self.count()
+        if self.expected_packages:
+            parts.append('%d/%d packages' % (min(count, self.expected_packages), self.expected_packages))
+        elif count:
+            parts.append('%d packages' % count)
+
+        elapsed = time.time() - self.started
+        if self.expected_runtime is None:
+            parts.append('%ds' % elapsed)
+        elif elapsed < self.expected_runtime:
+            parts.append('~%ds left' % math.ceil(self.expected_runtime - elapsed))
+        else:
+            parts.append('%ds, longer than usual' % elapsed)
+
+        return 'Go %s: %s' % (self.task, ', '.join(parts))
+
+    def finish(self, result):
+        """
+        Stores the runtime and number of packages of the build, for the
+        estimates of the next build of the same task in the same folder
+
+        RUNS IN A THREAD
+
+        :param result:
+            A unicode string of "success", "error" or "cancelled"
+        """
+
+        self.result = result
+        if result == 'cancelled':
+            return
+
+        progress_path = _storage_path('progress.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            progress = _load_json(progress_path, {})
+            entry = progress.get(self._key) or {}
+            runtimes = entry.get('runtimes', []) + [time.time() - self.started]
+            progress[self._key] = {
+                'runtimes': runtimes[-PROGRESS_RUNTIMES:],
+                'packages': self.count(),
+            }
+            _save_json(progress_path, progress)
+        finally:
+            _STORAGE_LOCK.release()
+
+    def _update_status(self):
+        """
+        Displays the progress in the status bar until the build is finished
+        """
+
+        if self.result is not None:
+            if self._view is not None:
+                self._view.erase_status('golang_build_progress')
+            return
+        if self._view is not None:
+            self._view.set_status('golang_build_progress', self.status())
+        else:
+            sublime.status_message(self.status())
+        sublime.set_timeout(self._update_status, PROGRESS_INTERVAL)
+
+
+class GolangProgressHandler(GolangLineHandler):
+
+    """
+    Passes the packages printed by "go build -v", and the package result lines
+    of "go test", to a GolangProgress()
+    """
+
+    # The GolangProgress() of the build
+    progress = None
+
+    # A boolean - if lines of just an import path on stderr are packages being
+    # built. Not the case once a program is running.
+    build_lines = True
+
+    # A boolean - if the handler should finish the GolangProgress() when the
+    # process completes, instead of the GolangProcessPool() running it
+    finishes = False
+
+    def __init__(self, progress, build_lines=True, finishes=False):
+        """
+        :param progress:
+            The GolangProgress() of the build
+
+        :param build_lines:
+            If lines of just an import path on stderr should be treated as the
+            package being built
+
+        :param finishes:
+            If the GolangProgress() should be finished with the result of the
+            process
+        """
+
+        self.progress = progress
+        self.build_lines = build_lines
+        self.finishes = finishes
+
+    def line(self, message_type, line):
+        """
+        Looks for import path lines and "ok", "FAIL" and "?" lines
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        match = re.match('^(ok|FAIL|\\?)\\s+(\\S+)(?:\\s|$)', line)
+        if match:
+            result = {'ok': 'success', 'FAIL': 'error', '?': 'skipped'}[match.group(1)]
+            self.progress.package('finished', match.group(2), result)
+            return
+
+        if not self.build_lines or message_type != 'stderr' or line in ('ok', 'PASS', 'FAIL'):
+            return
+        if re.match('^[\\w.~+-]+(?:/[\\w.~+-]+)*$', line):
+            self.progress.package('started', line)
+
+    def complete(self, proc):
+        """
+        Finishes the GolangProgress() if the process was the whole build
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None
+        """
+
+        if self.finishes:
+            self.progress.finish(proc.result)
+        return None
+
+
+class GolangMetrics():
+
+    """
+    Counters and histograms of the builds run in this Sublime Text session,
+    rendered in the Prometheus text exposition format. Exported to the file
+    from the "metrics:file" setting after each build, and served via HTTP on
+    127.0.0.1 when the "metrics:port" setting is set.
+    """
+
+    # A dict with keys of two-element tuples of unicode strings of the task
+    # and result, and values of the integer number of builds
+    builds = None
+
+    # A dict with unicode string keys of the task and integer values of the
+    # number of bytes of output
+    output_bytes = None
+
+    # Dicts with unicode string keys of the task, and values of a
+    # three-element list of a list of integer counts per bucket, the float
+    # sum and the integer number of observations
+    durations = None
+    first_output = None
+
+    # None or a unicode string of the path the metrics are written to
+    file_path = None
+
+    # None or an integer of the port the metrics are served on
+    port = None
+
+    def __init__(self):
+        self.builds = {}
+        self.output_bytes = {}
+        self.durations = {}
+        self.first_output = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def configure(self, file_path, port):
+        """
+        Changes where the metrics are exported to
+
+        :param file_path:
+            None or a unicode string of the path to write the metrics to
+
+        :param port:
+            None or an integer of the localhost port to serve the metrics on
+        """
+
+        self.file_path = file_path
+        if port == self.port:
+            return
+        if self._server:
+            server = self._server
+            self._server = None
+            # shutdown() waits for the serving thread, so is not run here in
+            # the UI thread
+            threading.Thread(target=_stop_metrics_server, args=(server,)).start()
+        self.port = port
+        if port:
+            try:
+                self._server = _start_metrics_server(self, port)
+            except (socket.error) as e:
+                print('Golang Build: unable to serve metrics on port %d - %s' % (port, str_cls(e)))
+
+    def close(self):
+        """
+        Stops serving the metrics via HTTP and releases the port
+        """
+
+        server = self._server
+        self._server = None
+        self.port = None
+        if server:
+            _stop_metrics_server(server)
+
+    def record(self, task, result, runtime, first_output, output_bytes):
+        """
+        Records a finished build, and writes the metrics file
+
+        RUNS IN A THREAD
+
+        :param task:
+            A unicode string of the build task
+
+        :param result:
+            A unicode string of "success", "error" or "cancelled"
+
+        :param runtime:
+            A float of the number of seconds the process ran for
+
+        :param first_output:
+            None if there was no output, otherwise a float of the number of
+            seconds until the process first wrote output
+
+        :param output_bytes:
+            An integer of the number of bytes of output
+        """
+
+        self._lock.acquire()
+        try:
+            key = (task, result)
+            self.builds[key] = self.builds.get(key, 0) + 1
+            self.output_bytes[task] = self.output_bytes.get(task, 0) + output_bytes
+            _observe(self.durations, task, METRICS_DURATION_BUCKETS, runtime)
+            if first_output is not None:
+                _observe(self.first_output, task, METRICS_FIRST_OUTPUT_BUCKETS, first_output)
+            text = self._render()
+        finally:
+            self._lock.release()
+
+        if self.file_path:
+            try:
+                dirname = os.path.dirname(self.file_path)
+                if dirname and not os.path.exists(dirname):
+                    os.makedirs(dirname)
+                temp_path = '%s.%s.tmp' % (self.file_path, threading.current_thread().ident)
+                with open(temp_path, 'wb') as f:
+                    f.write(text.encode('utf-8'))
+                if sys.platform == 'win32':
+                    _remove_file(self.file_path)
+                os.rename(temp_path, self.file_path)
+            except (IOError, OSError) as e:
+                print('Golang Build: unable to write metrics to %s - %s' % (self.file_path, str_cls(e)))
+
+    def render(self):
+        """
+        Formats the metrics in the Prometheus text exposition format
+
+        RUNS IN A THREAD
+
+        :return:
+            A unicode string
+        """
+
+        self._lock.acquire()
+        try:
+            return self._render()
+        finally:
+            self._lock.release()
+
+    def _render(self):
+        """
+        Formats the metrics, while the lock is held
+
+        :return:
+            A unicode string
+        """
+
+        output = '# HELP golang_build_builds_total Builds run, by task and result.\n'
+        output += '# TYPE golang_build_builds_total counter\n'
+        for task, result in sorted(self.builds):
+            output += 'golang_build_builds_total{task="%s",result="%s"} %d\n' % (
+                _metrics_label(task),
+                _metrics_label(result),
+                self.builds[(task, result)]
+            )
+
+        output += '# HELP golang_build_output_bytes_total Bytes of output written by builds.\n'
+        output += '# TYPE golang_build_output_bytes_total counter\n'
+        for task in sorted(self.output_bytes):
+            output += 'golang_build_output_bytes_total{task="%s"} %d\n' % (
+                _metrics_label(task),
+                self.output_bytes[task]
+            )
+
+        for name, description, histograms, buckets in (
+                ('golang_build_duration_seconds', 'Seconds builds ran for.', self.durations,
+                    METRICS_DURATION_BUCKETS),
+                ('golang_build_first_output_seconds', 'Seconds until builds first wrote output.', self.first_output,
+                    METRICS_FIRST_OUTPUT_BUCKETS)):
+            output += '# HELP %s %s\n' % (name, description)
+            output += '# TYPE %s histogram\n' % name
+            for task in sorted(histograms):
+                counts, total, count = histograms[task]
+                label = _metrics_label(task)
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    output += '%s_bucket{task="%s",le="%s"} %d\n' % (name, label, repr(float(bound)), cumulative)
+                output += '%s_bucket{task="%s",le="+Inf"} %d\n' % (name, label, count)
+                output += '%s_sum{task="%s"} %s\n' % (name, label, repr(float(total)))
+                output += '%s_count{task="%s"} %d\n' % (name, label, count)
+        return output
+
+
+# The GolangMetrics() object of the builds run in this session
+_METRICS = GolangMetrics()
+
+
+class GolangPrewarm():
+
+    """
+    Compiles the packages and tests of the first folder of a sublime.Window at
+    a low priority, with output discarded, so the first real build finds the
+    build cache warm
+    """
+
+    # A dict with unicode string keys of folder paths and values of None or a
+    # unicode string of the git HEAD the folder was last prewarmed for
+    heads = None
+
+    # A float of the unix timestamp of the last user activity in the window
+    activity = 0.0
+
+    # A unicode string of the QoS class the processes run under
+    qos = 'idle'
+
+    # A boolean - if a prewarm should run once the editor is idle
+    pending = False
+
+    # An integer that is incremented every time a prewarm is scheduled, so
+    # only the most recent scheduled check runs
+    generation = 0
+
+    # The GolangProcess() object currently running
+    proc = None
+
+    # A threading.Lock() used to prevent a process from being started while
+    # the prewarm is being terminated
+    _lock = None
+
+    # A boolean - if terminate() has been called since the prewarm started
+    _terminated = False
+
+    def __init__(self):
+        self.heads = {}
+        self.activity = time.time()
+        self._lock = threading.Lock()
+
+    def running(self):
+        """
+        :return:
+            A boolean - if a prewarm is in progress
+        """
+
+        return self.proc is not None and not self.proc.finished
+
+    def schedule(self, window):
+        """
+        Starts a prewarm once the editor has been idle for PREWARM_IDLE
+        milliseconds. Must be run in the UI thread.
+
+        :param window:
+            The sublime.Window object to prewarm the first folder of
+        """
+
+        self.pending = True
+        self.generation += 1
+        generation = self.generation
+        sublime.set_timeout(lambda: self._check(window, generation), PREWARM_IDLE)
+
+    def _check(self, window, generation):
+        """
+        Starts the prewarm if the editor is idle and no build is running,
+        otherwise checks again later
+
+        :param window:
+            The sublime.Window object to prewarm the first folder of
+
+        :param generation:
+            The generation the check was scheduled for
+        """
+
+        if generation != self.generation or not self.pending:
+            return
+
+        delay = PREWARM_IDLE - int((time.time() - self.activity) * 1000)
+        proc = _get_proc(window)
+        overlay = _OVERLAYS.get(window.id())
+        if delay <= 0 and ((proc and not proc.finished) or (overlay and overlay.running()) or self.running()):
+            delay = PREWARM_IDLE
+        if delay > 0:
+            sublime.set_timeout(lambda: self._check(window, generation), delay)
+            return
+
+        self.pending = False
+        self.start(window)
+
+    def start(self, window):
+        """
+        Starts compiling the packages and tests of the first folder of the
+        window. Must be run in the UI thread.
+
+        :param window:
+            The sublime.Window object to prewarm the first folder of
+        """
+
+        folders = window.folders()
+        if not folders:
+            return
+
+        # Errors are not displayed since the user did not ask for a build
+        try:
+            go_bin, env = golangconfig.subprocess_info(
+                'go',
+                set(['GOPATH']),
+                GO_ENV_VARS - set(['GOPATH']),
+                view=window.active_view(),
+                window=window
+            )
+        except (golangconfig.ExecutableError, golangconfig.EnvVarError,
+                golangconfig.GoRootNotFoundError, golangconfig.GoPathNotFoundError):
+            return
+        # Modules are downloaded by prefetching instead, so the prewarm
+        # never holds locks in the module cache and may be paused
+        _set_env(env, 'GOPROXY', 'off')
+
+        self.qos = _qos_setting(window, 'prewarm', 'idle')
+
+        jobs = [
+            # With a single main package, "go build" would otherwise write an
+            # executable into the user's source folder
+            [go_bin, 'build', '-o', os.devnull, './...'],
+            # Test binaries are compiled, but -run matches no tests
+            [go_bin, 'test', '-run=^$', './...'],
+        ]
+        self._terminated = False
+        thread = threading.Thread(target=self._run, args=(jobs, folders[0], env))
+        thread.start()
+
+    def terminate(self):
+        """
+        Terminates the running prewarm, if any, and drops any pending one
+        """
+
+        self.pending = False
+        self._lock.acquire()
+        try:
+            self._terminated = True
+            if self.running():
+                self.proc.terminate()
+        finally:
+            self._lock.release()
+
+    def _run(self, jobs, cwd, env):
+        """
+        Runs the jobs one at a time, discarding their output
+
+        RUNS IN A THREAD
+
+        :param jobs:
+            A list of lists of strings of the args of each process
+
+        :param cwd:
+            A unicode string of the working directory
+
+        :param env:
+            A dict of the env of the processes
+        """
+
+        started = time.time()
+        for args in jobs:
+            self._lock.acquire()
+            try:
+                if self._terminated:
+                    return
+                proc = GolangProcess(args, cwd, env, qos=self.qos)
+                self.proc = proc
+            finally:
+                self._lock.release()
+            while proc.output.get()[0] != 'eof':
+                pass
+
+        if self._terminated:
+            return
+        message = 'Go: build cache prewarmed in %0.1fs' % (time.time() - started)
+        sublime.set_timeout(lambda: sublime.status_message(message), 10)
+
+
+class GolangPrefetch():
+
+    """
+    Runs "go mod download" in a folder with a go.mod file at a low priority,
+    whenever the go.mod or go.sum file changes, so the next build does not
+    have to wait for modules to be downloaded
+    """
+
+    # A unicode string of the folder containing the go.mod file
+    folder = None
+
+    # None or a unicode string of the SHA-1 of the go.mod and go.sum files the
+    # most recent prefetch was started for
+    digest = None
+
+    # A two-element tuple of the modification times of go.mod and go.sum when
+    # they were last checked
+    mtimes = None
+
+    # The GolangProcess() object of the most recent prefetch
+    proc = None
+
+    # A boolean - if the files changed while a prefetch was running, so
+    # another is needed once it finishes
+    pending = False
+
+    # None or a float of the seconds the most recent prefetch took, if it
+    # succeeded and has not yet been reported by a build
+    saved = None
+
+    # A boolean - if a build has already reported the running prefetch
+    _claimed = False
+
+    def __init__(self, folder):
+        """
+        :param folder:
+            A unicode string of the folder containing the go.mod file
+        """
+
+        self.folder = folder
+
+    def running(self):
+        """
+        :return:
+            A boolean - if a prefetch is in progress
+        """
+
+        return self.proc is not None and not self.proc.finished
+
+    def update(self, window):
+        """
+        Starts a prefetch if the go.mod or go.sum file changed since the last
+        one. Must be run in the UI thread.
+
+        :param window:
+            The sublime.Window object the folder is open in
+        """
+
+        mtimes = (
+            _mtime(os.path.join(self.folder, 'go.mod')),
+            _mtime(os.path.join(self.folder, 'go.sum'))
+        )
+        if mtimes == self.mtimes:
+            return
+        self.mtimes = mtimes
+
+        digest = _go_mod_digest(self.folder)
+        if digest is None or digest == self.digest:
+            return
+        if self.running():
+            self.pending = True
+            return
+        self.digest = digest
+        self.start(window)
+
+    def start(self, window):
+        """
+        Starts "go mod download". Must be run in the UI thread.
+
+        :param window:
+            The sublime.Window object the folder is open in
+        """
+
+        # Errors are not displayed since the user did not ask for a download
+        try:
+            go_bin, env = golangconfig.subprocess_info(
+                'go',
+                set(['GOPATH']),
+                GO_ENV_VARS - set(['GOPATH']),
+                view=window.active_view(),
+                window=window
+            )
+        except (golangconfig.ExecutableError, golangconfig.EnvVarError,
+                golangconfig.GoRootNotFoundError, golangconfig.GoPathNotFoundError):
+            return
+        _normalize_goproxy(env)
+
+        self.saved = None
+        self._claimed = False
+        # The go tool holds locks in the module cache while downloading, so
+        # pausing the process could block a foreground build indefinitely
+        self.proc = GolangProcess(
+            [go_bin, 'mod', 'download'],
+            self.folder,
+            env,
+            qos=_qos_setting(window, 'prefetch', 'background'),
+            pausable=False
+        )
+        sublime.status_message('Go: downloading modules for %s' % self.folder)
+        thread = threading.Thread(target=self._wait, args=(window, self.proc))
+        thread.start()
+
+    def claim(self):
+        """
+        Describes the work the prefetch did before a build started, so it is
+        only reported by the first build afterwards
+
+        :return:
+            None or a unicode string to display after the build output
+        """
+
+        if self.running():
+            if self._claimed:
+                return None
+            self._claimed = True
+            return '> Module prefetch: running for %0.1fs before the build started' % (
+                time.time() - self.proc.started
+            )
+        saved = self.saved
+        self.saved = None
+        if saved is None:
+            return None
+        return '> Module prefetch: saved %0.1fs of module downloads' % saved
+
+    def _wait(self, window, proc):
+        """
+        Waits for the prefetch to finish and displays the result
+
+        RUNS IN A THREAD
+
+        :param window:
+            The sublime.Window object the folder is open in
+
+        :param proc:
+            The GolangProcess() of the prefetch
+        """
+
+        errors = []
+        while True:
+            message_type, message = proc.output.get()
+            if message_type == 'eof':
+                break
+            if message_type == 'stderr':
+                errors.append(message)
+
+        runtime = proc.finished - proc.started
+        if proc.result == 'success':
+            if not self._claimed:
+                self.saved = runtime
+            message = 'Go: modules for %s downloaded in %0.1fs' % (self.folder, runtime)
+        else:
+            message = 'Go: downloading modules for %s failed' % self.folder
+            if proc.result == 'error':
+                print('Golang Build: "go mod download" failed in %s\n%s' % (self.folder, ''.join(errors)))
+
+        def _finish():
+            sublime.status_message(message)
+            if self.pending:
+                self.pending = False
+                self.mtimes = None
+                self.update(window)
+        sublime.set_timeout(_finish, 10)
+
+
+class GolangCacheScanner():
+
+    """
+    Scans a cache directory tree using a pool of threads. Only directories
+    whose modification time changed since the previous scan are listed, the
+    entries of the rest are copied from the previous index.
+    """
+
+    # A unicode string of the directory to scan
+    root = None
+
+    # A dict with unicode string keys of "/" separated paths of directories
+    # relative to root, with "" for root, and values of a dict with the keys:
+    #  - "mtime": a float of the modification time of the directory
+    #  - "files": a list of [name, size, last used unix timestamp] lists
+    #  - "dirs": a list of unicode strings of subdirectory names
+    index = None
+
+    # The index from the previous scan
+    previous = None
+
+    # An integer of the number of directories that were listed
+    listed = 0
+
+    # An integer of the number of directories copied from the previous index
+    reused = 0
+
+    # Floats of the unix timestamps of when scan() was called and returned
+    started = None
+    finished = None
+
+    # A queue.Queue() of the relative paths of directories to scan
+    _queue = None
+
+    # A threading.Lock() protecting the counters
+    _lock = None
+
+    def __init__(self, root, previous):
+        """
+        :param root:
+            A unicode string of the directory to scan
+
+        :param previous:
+            A dict of the index from the previous scan
+        """
+
+        self.root = root
+        self.previous = previous
+        self._lock = threading.Lock()
+
+    def scan(self):
+        """
+        Scans the directory tree, blocking until finished
+
+        RUNS IN A THREAD
+
+        :return:
+            A dict of the new index
+        """
+
+        self.started = time.time()
+        self.index = {}
+        self._queue = queue.Queue()
+        self._queue.put('')
+
+        threads = []
+        for _ in range(CACHE_SCAN_THREADS):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        self._queue.join()
+        for thread in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+        self.finished = time.time()
+        return self.index
+
+    def _work(self):
+        """
+        Scans directories from the queue until told to stop
+
+        RUNS IN A THREAD
+        """
+
+        while True:
+            relative = self._queue.get()
+            try:
+                if relative is None:
+                    return
+                self._scan(relative)
+            finally:
+                self._queue.task_done()
+
+    def _scan(self, relative):
+        """
+        Indexes a single directory and queues its subdirectories
+
+        RUNS IN A THREAD
+
+        :param relative:
+            A unicode string of the "/" separated path relative to root
+        """
+
+        path = os.path.join(self.root, *relative.split('/')) if relative else self.root
+        try:
+            mtime = os.stat(path).st_mtime
+        except (OSError):
+            return
+
+        entry = self.previous.get(relative)
+        reused = entry is not None and entry['mtime'] == mtime
+        if not reused:
+            try:
+                files, dirs = _list_dir(path)
+            except (OSError):
+                return
+            entry = {'mtime': mtime, 'files': files, 'dirs': dirs}
+
+        self._lock.acquire()
+        try:
+            if reused:
+                self.reused += 1
+            else:
+                self.listed += 1
+        finally:
+            self._lock.release()
+
+        self.index[relative] = entry
+        for name in entry['dirs']:
+            self._queue.put(relative + '/' + name if relative else name)
+
+
+class GolangPanel():
+
+    """
+    Holds a reference to an output panel used by the Golang Build package,
+    and provides synchronization features to ensure output is printed in proper
+    order
+    """
+
+    # A sublime.View object of the output panel being printed to
+    panel = None
+
+    # A unicode string of the name of the output panel, without "output."
+    name = None
+
+    # A queue.Queue() that holds all of the info to be written to the panel
+    queue = None
+
+    # A lock used to ensure only on GolangProcessPrinter() is using the panel
+    # at any given time
+    printer_lock = None
+
+    # None or the GolangHistoryRecorder() of the GolangProcessPrinter() that
+    # is using the panel
+    recorder = None
+
+    # None or a two-element tuple of the integer begin and end points of the
+    # status line written by write_status(), which is replaced in-place by the
+    # next status line as long as no other output has been written after it
+    status_region = None
+
+    def __init__(self, window, name='golang_build'):
+        """
+        :param window:
+            The sublime.Window object the output panel is contained within
+
+        :param name:
+            A unicode string of the name of the output panel
+        """
+
+        self.name = name
+        self.printer_lock = threading.Lock()
+        self.reset(window)
+
+    def reset(self, window):
+        """
+        Creates a new, fresh output panel and output Queue object
+
+        :param window:
+            The sublime.Window object the output panel is contained within
+        """
+
+        if not isinstance(threading.current_thread(), threading._MainThread):
+            raise RuntimeError('GolangPanel.reset() must be run in the UI thread')
+
+        self.queue = queue.Queue()
+        self.status_region = None
+        self.panel = window.get_output_panel(self.name)
+
+        _configure_output_view(self.panel)
+        panel_settings = self.panel.settings()
+        panel_settings.set('line_numbers', False)
+        panel_settings.set('gutter', False)
+        panel_settings.set('scroll_past_end', False)
+
+    def set_base_dir(self, cwd):
+        """
+        Set the directory the process is being run in, for the sake of result
+        navigation
+
+        :param cwd:
+            A unicode string of the working directory
+        """
+
+        def _update_settings():
+            self.panel.settings().set('result_base_dir', cwd)
+        sublime.set_timeout(_update_settings, 1)
+
+    def write(self, string, content_separator=None, event=None):
+        """
+        Queues data to be written to the output panel. Normally this will be
+        called from a thread other than the UI thread.
+
+        :param string:
+            A unicode string to write to the output panel
+
+        :param content_separator:
+            A unicode string to prefix to the string param if there is already
+            output in the output panel. Is only prefixed if the previous number
+            of characters are not equal to this string.
+
+        :param event:
+            An optional threading.Event() object to set once the data has been
+            written to the output panel
+        """
+
+        recorder = self.recorder
+        if recorder:
+            recorder.write(string, content_separator)
+        self.queue.put((string, content_separator, event, False))
+        sublime.set_timeout(self._process_queue, 1)
+
+    def write_status(self, string):
+        """
+        Queues a single line of status information to be written to the
+        output panel. If the previous status line is still the last line of
+        the panel, it is replaced instead of a new line being added.
+
+        :param string:
+            A unicode string, without a newline, to display as the status
+        """
+
+        recorder = self.recorder
+        if recorder:
+            recorder.write_status(string)
+        self.queue.put((string, None, None, True))
+        sublime.set_timeout(self._process_queue, 1)
+
+    def _process_queue(self):
+        """
+        A callback that is run in the UI thread to actually perform writes to
+        the output panel. Reads from the queue until it is empty.
+        """
+
+        try:
+            while True:
+                chars, content_separator, event, status = self.queue.get(False)
+
+                at_status = self.status_region is not None and self.status_region[1] == self.panel.size()
+
+                if status and at_status:
+                    begin, end = self.status_region
+                    self._replace(begin, end, chars)
+                    self.status_region = (begin, begin + len(chars))
+                    continue
+
+                # Other output ends the status line, leaving it in place
+                if at_status:
+                    self._insert('\n')
+                self.status_region = None
+
+                if status:
+                    content_separator = '\n'
+
+                if content_separator is not None and self.panel.size() > 0:
+                    end = self.panel.size()
+                    start = end - len(content_separator)
+                    if self.panel.substr(sublime.Region(start, end)) != content_separator:
+                        chars = content_separator + chars
+
+                self._insert(chars)
+
+                if status:
+                    self.status_region = (self.panel.size() - len(chars.lstrip('\n')), self.panel.size())
+
+                if event:
+                    event.set()
+
+        except (queue.Empty):
+            pass
+
+    def _insert(self, chars):
+        """
+        Appends text to the output panel
+
+        :param chars:
+            A unicode string to append
+        """
+
+        # In Sublime Text 2, the "insert" command does not handle newlines
+        if sys.version_info < (3,):
+            edit = self.panel.begin_edit('golang_panel_print', [])
+            self.panel.insert(edit, self.panel.size(), chars)
+            self.panel.end_edit(edit)
+
+        else:
+            self.panel.run_command('insert', {'characters': chars})
+
+    def _replace(self, begin, end, chars):
+        """
+        Replaces a region of the output panel
+
+        :param begin:
+            An integer of the start of the region
+
+        :param end:
+            An integer of the end of the region
+
+        :param chars:
+            A unicode string to replace the region with
+        """
+
+        if sys.version_info < (3,):
+            edit = self.panel.begin_edit('golang_panel_replace', [])
+            self.panel.replace(edit, sublime.Region(begin, end), chars)
+            self.panel.end_edit(edit)
+
+        else:
+            self.panel.run_command(
+                'golang_build_panel_replace',
+                {'begin': begin, 'end': end, 'characters': chars}
+            )
+
+
+class GolangBuildPanelReplaceCommand(sublime_plugin.TextCommand):
+
+    """
+    Replaces a region of the output panel - used by GolangPanel() on Sublime
+    Text 3, where a sublime.Edit object is only available inside of a command
+    """
+
+    def run(self, edit, begin, end, characters):
+        """
+        Runs the "golang_build_panel_replace" command
+
+        :param edit:
+            The sublime.Edit object for the change
+
+        :param begin:
+            An integer of the start of the region to replace
+
+        :param end:
+            An integer of the end of the region to replace
+
+        :param characters:
+            A unicode string to replace the region with
+        """
+
+        self.view.replace(edit, sublime.Region(begin, end), characters)
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(self.view.size()))
+
+
+class GolangHistoryRecorder():
+
+    """
+    Records everything a GolangProcessPrinter() writes to the output panel,
+    compressing it to a file as it is written, so the output can be reopened
+    via the "golang_build_history" command after the panel is reset
+    """
+
+    # A unicode string of the path of the file the output is compressed into
+    temp_path = None
+
+    # A set of unicode strings of the packages, tests and files mentioned by
+    # error lines in the output
+    terms = None
+
+    # An integer of the number of error lines in the output
+    errors = 0
+
+    def __init__(self):
+        self.temp_path = _storage_path('history', '%s-%s.tmp' % (time.time(), threading.current_thread().ident))
+        self.terms = set()
+        self._file = open(self.temp_path, 'wb')
+        self._compressor = zlib.compressobj()
+        self._lock = threading.Lock()
+        self._tail = ''
+        self._partial = ''
+        self._status = None
+
+    def write(self, string, content_separator=None):
+        """
+        Records output, in the same way GolangPanel.write() displays it
+
+        RUNS IN A THREAD
+
+        :param string:
+            A unicode string of the output
+
+        :param content_separator:
+            None or a unicode string to prefix to the output if the previous
+            output does not already end with it
+        """
+
+        self._lock.acquire()
+        try:
+            if self._status is not None:
+                self._append(self._status + '\n')
+                self._status = None
+            if content_separator is not None and self._tail and not self._tail.endswith(content_separator):
+                string = content_separator + string
+            self._append(string)
+        finally:
+            self._lock.release()
+
+    def write_status(self, string):
+        """
+        Records a status line. Only the last of a series of status lines is
+        kept, since each replaces the previous one in the output panel.
+
+        RUNS IN A THREAD
+
+        :param string:
+            A unicode string of the status line
+        """
+
+        self._lock.acquire()
+        try:
+            if self._status is None and self._tail and not self._tail.endswith('\n'):
+                self._append('\n')
+            self._status = string
+        finally:
+            self._lock.release()
+
+    def _append(self, string):
+        """
+        Compresses output to the file, indexing any complete error lines
+
+        RUNS IN A THREAD
+
+        :param string:
+            A unicode string of the output
+        """
+
+        if not string:
+            return
+        self._tail = (self._tail + string)[-2:]
+        self._file.write(self._compressor.compress(string.encode('utf-8')))
+
+        lines = (self._partial + string).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            terms = _history_terms(line)
+            if terms is not None:
+                self.errors += 1
+                self.terms.update(terms)
+
+    def close(self, event):
+        """
+        Finishes the compressed file and adds the run to the history index,
+        removing the oldest runs once the history is larger than
+        HISTORY_MAX_SIZE or has more than HISTORY_MAX_RUNS runs
+
+        RUNS IN A THREAD
+
+        :param event:
+            None if the output was not completed, otherwise the
+            BuildCompleteEvent() of the process
+        """
+
+        self._lock.acquire()
+        try:
+            if self._status is not None:
+                self._append(self._status)
+                self._status = None
+            self._append('\n')
+            self._file.write(self._compressor.flush())
+            self._file.close()
+        finally:
+            self._lock.release()
+
+        if event is None:
+            _remove_file(self.temp_path)
+            return
+
+        command = subprocess.list2cmdline(event.args)
+        if not isinstance(command, str_cls):
+            command = command.decode('utf-8', 'replace')
+
+        index_path = _storage_path('history', 'index.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            index = _load_json(index_path, {})
+            runs = index.setdefault('runs', [])
+            terms = index.setdefault('terms', {})
+            run_id = index.get('next_id', 1)
+            index['next_id'] = run_id + 1
+
+            os.rename(self.temp_path, _storage_path('history', '%d.zlib' % run_id))
+            runs.append({
+                'id': run_id,
+                'task': event.task,
+                'command': command,
+                'working_dir': event.working_dir,
+                'started': time.time() - event.runtime,
+                'runtime': event.runtime,
+                'result': event.result,
+                'errors': self.errors,
+                'size': os.path.getsize(_storage_path('history', '%d.zlib' % run_id)),
+            })
+            for term in self.terms:
+                terms.setdefault(term, []).append(run_id)
+
+            while len(runs) > HISTORY_MAX_RUNS or \
+                    (len(runs) > 1 and sum(run['size'] for run in runs) > HISTORY_MAX_SIZE):
+                removed = runs.pop(0)
+                _remove_file(_storage_path('history', '%d.zlib' % removed['id']))
+                for term in list(terms.keys()):
+                    if removed['id'] in terms[term]:
+                        terms[term].remove(removed['id'])
+                        if not terms[term]:
+                            del terms[term]
+
+            _save_json(index_path, index)
+        finally:
+            _STORAGE_LOCK.release()
+
+
+class GolangOverlay():
+
+    """
+    Tracks snapshots of the unsaved Go buffers of a sublime.Window, plus the
+    overlay build that is currently running for the window
+    """
+
+    # A unicode string of the directory the buffer snapshots are written to
+    temp_dir = None
+
+    # A dict with unicode string keys of the file path of a buffer and values
+    # of a two-element tuple of the view change count and the path to the
+    # snapshot of the buffer contents
+    snapshots = None
+
+    # The GolangProcess() object of the overlay build currently running
+    proc = None
+
+    # None, or the GolangPanel() the output of overlay builds is printed to,
+    # which is separate so the output of the last real build is kept
+    panel = None
+
+    # None, or a dict of the args for the "golang_build_overlay" command to
+    # run once the current overlay build is finished
+    pending = None
+
+    # An integer that is incremented every time a buffer in the window is
+    # modified, used to debounce automatic builds
+    generation = 0
+
+    def __init__(self, window):
+        """
+        :param window:
+            The sublime.Window object the overlay is for
+        """
+
+        self.temp_dir = _temp_path('overlay', str_cls(window.id()))
+        self.snapshots = {}
+
+    def running(self):
+        """
+        :return:
+            A boolean - if an overlay build is in progress
+        """
+
+        return self.proc is not None and not self.proc.finished
+
+    def terminate(self):
+        """
+        Terminates the running overlay build, if any, and drops any pending
+        build
+        """
+
+        self.pending = None
+        if self.running():
+            self.proc.terminate()
+
+    def update(self, window):
+        """
+        Writes the contents of every dirty Go buffer in the window whose change
+        count has moved since the last snapshot, and then writes the JSON file
+        to pass to the -overlay flag. Must be run in the UI thread.
+
+        :param window:
+            The sublime.Window object to snapshot the views of
+
+        :return:
+            None if there are no unsaved Go buffers, otherwise a unicode string
+            of the path to the overlay JSON file
+        """
+
+        snapshots = {}
+        for view in window.views():
+            file_name = view.file_name()
+            if not file_name or not file_name.endswith('.go') or not view.is_dirty():
+                continue
+
+            change_count = _change_count(view)
+            existing = self.snapshots.get(file_name)
+            if existing and existing[0] == change_count:
+                snapshots[file_name] = existing
+                continue
+
+            file_hash = hashlib.sha1(file_name.encode('utf-8')).hexdigest()
+            snapshot_path = os.path.join(self.temp_dir, file_hash + '.go')
+            contents = view.substr(sublime.Region(0, view.size()))
+            with open(snapshot_path, 'wb') as f:
+                f.write(contents.encode('utf-8'))
+            snapshots[file_name] = (change_count, snapshot_path)
+
+        for file_name in self.snapshots:
+            if file_name not in snapshots:
+                _remove_file(self.snapshots[file_name][1])
+        self.snapshots = snapshots
+
+        if not snapshots:
+            return None
+
+        replace = {}
+        for file_name in snapshots:
+            replace[file_name] = snapshots[file_name][1]
+        overlay_path = os.path.join(self.temp_dir, 'overlay.json')
+        with open(overlay_path, 'wb') as f:
+            f.write(json.dumps({'Replace': replace}).encode('utf-8'))
+        return overlay_path
+
+
+class GolangOverlayHandler(GolangOutputHandler):
+
+    """
+    Starts any overlay build that was requested while the previous overlay
+    build was running
+    """
+
+    # The sublime.Window object the overlay build is running in
+    window = None
+
+    # The GolangOverlay() object for the window
+    overlay = None
+
+    def __init__(self, window, overlay):
+        """
+        :param window:
+            The sublime.Window object the overlay build is running in
+
+        :param overlay:
+            The GolangOverlay() object for the window
+        """
+
+        self.window = window
+        self.overlay = overlay
+
+    def complete(self, proc):
+        """
+        Schedules the pending overlay build, if there is one
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None
+        """
+
+        pending = self.overlay.pending
+        self.overlay.pending = None
+        if pending is not None and proc.result != 'cancelled':
+            def _run_pending():
+                self.window.run_command('golang_build_overlay', pending)
+            sublime.set_timeout(_run_pending, 1)
+        return None
+
+
+class GolangBuildProfileHandler(GolangOutputHandler):
+
+    """
+    Reads the action graph written by "go build -debug-actiongraph" once the
+    build is finished and reports where the time was spent
+    """
+
+    # A unicode string of the path the action graph JSON is written to
+    graph_path = None
+
+    # A unicode string of the working directory of the build, used to group
+    # the stored package timings
+    working_dir = None
+
+    def __init__(self, graph_path, working_dir):
+        """
+        :param graph_path:
+            A unicode string of the path passed to -debug-actiongraph
+
+        :param working_dir:
+            A unicode string of the working directory of the build
+        """
+
+        self.graph_path = graph_path
+        self.working_dir = working_dir
+
+    def complete(self, proc):
+        """
+        Parses the action graph and formats a report of the slowest packages
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the report
+        """
+
+        if proc.result == 'cancelled':
+            return None
+
+        try:
+            with open(self.graph_path, 'rb') as f:
+                actions = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return '> Build Profile: no action graph was written by the go tool'
+
+        profile = _summarize_action_graph(actions)
+
+        history_path = _storage_path('build_profile.json')
+        history = _load_json(history_path, {})
+        dir_history = history.get(self.working_dir, {})
+
+        output = '> Build Profile:\n'
+        output += '>   Compile: %0.3fs across %d packages (%d cached)\n' % (
+            profile['compile'],
+            profile['compiled'],
+            profile['cached']
+        )
+        output += '>   Link: %0.3fs\n' % profile['link']
+        output += '>   Critical path: %0.3fs (wall time %0.3fs)\n' % (profile['critical'], profile['wall'])
+        for package in profile['critical_path']:
+            output += '>     %s\n' % package
+
+        if profile['packages']:
+            output += '>   Slowest packages:\n'
+        for package, duration in profile['packages'][:BUILD_PROFILE_TOP]:
+            timings = dir_history.get(package, [])
+            note = ''
+            if timings:
+                change = duration - timings[-1]
+                note = ' (%+0.3fs)' % change
+                median = sorted(timings)[len(timings) // 2]
+                if duration > median * 1.25 and duration - median > 0.1:
+                    note += ' REGRESSED from %0.3fs' % median
+            output += '>     %8.3fs  %s%s\n' % (duration, package, note)
+
+        for package, duration in profile['packages']:
+            timings = dir_history.get(package, []) + [round(duration, 4)]
+            dir_history[package] = timings[-BUILD_PROFILE_HISTORY:]
+        history[self.working_dir] = dir_history
+        _save_json(history_path, history)
+
+        return output.rstrip('\n')
+
+
+class GolangProfileHandler(GolangOutputHandler):
+
+    """
+    Summarizes the CPU and memory profiles written by a "benchmark_profile"
+    run once it is finished
+    """
+
+    # A unicode string of the directory the profiles for the run are in
+    run_dir = None
+
+    # A unicode string of the working directory of the run
+    working_dir = None
+
+    def __init__(self, run_dir, working_dir):
+        """
+        :param run_dir:
+            A unicode string of the directory the profiles are written to
+
+        :param working_dir:
+            A unicode string of the working directory of the run
+        """
+
+        self.run_dir = run_dir
+        self.working_dir = working_dir
+
+    def complete(self, proc):
+        """
+        Decodes the profiles and formats a table of the top functions for each
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the report
+        """
+
+        _save_json(
+            os.path.join(self.run_dir, 'meta.json'),
+            {'working_dir': self.working_dir, 'result': proc.result}
+        )
+        _prune_profile_runs()
+
+        output = ''
+        for kind, filename, sample_types in PROFILE_KINDS:
+            profile_path = os.path.join(self.run_dir, filename)
+            if not os.path.exists(profile_path):
+                continue
+            try:
+                profile = _read_pprof(profile_path)
+            except (ValueError) as e:
+                output += '> %s Profile: %s\n' % (kind, str_cls(e))
+                continue
+            output += _format_pprof_top(kind, profile, sample_types, self.working_dir)
+
+        if not output:
+            return None
+        return output.rstrip('\n')
+
+
+class GolangCoverageHandler(GolangOutputHandler):
+
+    """
+    Parses the coverage profile written by "go test -coverprofile" once the
+    tests are finished, reports the coverage of each package and marks the
+    uncovered lines of open files
+    """
+
+    # A unicode string of the path of the coverage profile
+    profile_path = None
+
+    # A unicode string of the path to the "go" executable
+    go_bin = None
+
+    # A unicode string of the working directory of the tests
+    working_dir = None
+
+    # A dict of the environment variables of the tests
+    env = None
+
+    def __init__(self, profile_path, go_bin, working_dir, env):
+        """
+        :param profile_path:
+            A unicode string of the path passed to -coverprofile
+
+        :param go_bin:
+            A unicode string of the path to the "go" executable, used to find
+            the directories of the packages in the profile
+
+        :param working_dir:
+            A unicode string of the working directory of the tests
+
+        :param env:
+            A dict of strings (unicode for Python 3, byte string for Python 2)
+            of the environment variables of the tests
+        """
+
+        self.profile_path = profile_path
+        self.go_bin = go_bin
+        self.working_dir = working_dir
+        self.env = env
+
+    def complete(self, proc):
+        """
+        Updates the coverage index and formats a per-package summary
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the report
+        """
+
+        global _COVERAGE
+
+        if proc.result == 'cancelled' or not os.path.exists(self.profile_path):
+            return None
+
+        index, packages = _parse_cover_profile(self.profile_path)
+        index = _coverage_file_paths(index, self.go_bin, self.working_dir, self.env)
+
+        previous = _COVERAGE
+        changed = set()
+        for file_name in set(previous.keys()) | set(index.keys()):
+            if previous.get(file_name) != index.get(file_name):
+                changed.add(file_name)
+        _COVERAGE = index
+        if changed:
+            sublime.set_timeout(lambda: _annotate_coverage(changed), 1)
+
+        output = '> Coverage:\n'
+        total_covered = 0
+        total_statements = 0
+        for package in sorted(packages):
+            covered, statements = packages[package]
+            total_covered += covered
+            total_statements += statements
+            output += '>   %6.1f%%  %s (%d/%d statements)\n' % (
+                _percent(covered, statements),
+                package,
+                covered,
+                statements
+            )
+        output += '>   %6.1f%%  total (%d/%d statements)' % (
+            _percent(total_covered, total_statements),
+            total_covered,
+            total_statements
+        )
+        return output
+
+
+class GolangTestFailureHandler(GolangLineHandler):
+
+    """
+    Records the packages and tests that failed during a "go test" run, so they
+    may be run again via the "golang_build_rerun_failures" command
+    """
+
+    # A unicode string of the key the failures are stored under
+    key = None
+
+    # A dict with unicode string keys of package import paths and values of a
+    # set of unicode string test names that failed
+    failures = None
+
+    # A set of unicode string test names that failed in the package whose
+    # output is currently being printed
+    _pending = None
+
+    def __init__(self, window, working_dir):
+        """
+        :param window:
+            The sublime.Window object the tests are being run in
+
+        :param working_dir:
+            A unicode string of the working directory of the tests
+        """
+
+        self.key = _results_key(window, working_dir)
+        self.failures = {}
+        self._pending = set()
+
+    def line(self, message_type, line):
+        """
+        Looks for "--- FAIL:" lines, package result lines and -json events
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        if line.startswith('{'):
+            try:
+                event = json.loads(line)
+            except (ValueError):
+                event = None
+            if isinstance(event, dict) and event.get('Action') == 'fail' and event.get('Package'):
+                names = self.failures.setdefault(event['Package'], set())
+                if event.get('Test'):
+                    names.add(event['Test'].split('/')[0])
+            return
+
+        match = re.match('^\\s*--- FAIL: (\\S+)', line)
+        if match:
+            self._pending.add(match.group(1).split('/')[0])
+            return
+
+        match = re.match('^(ok|FAIL|\\?)\\s+(\\S+)(\\s|$)', line)
+        if match:
+            if match.group(1) == 'FAIL':
+                self.failures.setdefault(match.group(2), set()).update(self._pending)
+            self._pending = set()
+
+    def complete(self, proc):
+        """
+        Stores the failures from the run, replacing those of the previous run
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string noting how many tests failed
+        """
+
+        if proc.result == 'cancelled':
+            return None
+
+        failures_path = _storage_path('failures.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            stored = _load_json(failures_path, {})
+            if self.failures:
+                stored[self.key] = dict((package, sorted(self.failures[package])) for package in self.failures)
+            elif self.key in stored:
+                del stored[self.key]
+            else:
+                return None
+            _save_json(failures_path, stored)
+        finally:
+            _STORAGE_LOCK.release()
+
+        if not self.failures:
+            return None
+        test_count = sum(len(names) for names in self.failures.values())
+        return '> Failures: %d tests in %d packages, use "Go: Rerun Failed Tests" to run them again' % (
+            test_count,
+            len(self.failures)
+        )
+
+
+class GolangRaceHandler(GolangOutputHandler):
+
+    """
+    Reads the data race reports written to the GORACE log_path while a
+    process runs, and displays each unique race once, with clickable frames.
+    Duplicates are only counted, so memory use is bounded no matter how many
+    times a race is reported.
+    """
+
+    # The GolangPanel() object the races are written to
+    panel = None
+
+    # A unicode string of the directory the race detector writes logs to
+    log_dir = None
+
+    # A dict with unicode string keys of race signatures and values of a
+    # two-element list of the integer race number and number of reports
+    races = None
+
+    # An integer of the number of reports of races beyond RACE_MAX_UNIQUE
+    other_reports = 0
+
+    # A dict with unicode string keys of log file names and values of a
+    # two-element list of the integer offset read to and the unicode string
+    # of any incomplete line
+    _files = None
+
+    # None, or a list of the unicode string lines of the report being read
+    _block = None
+
+    # A threading.Event() set once the process has finished
+    _stop = None
+
+    # None, or the threading.Thread() reading the log files, which is only
+    # started once the process exists, so it is never left running when the
+    # process could not be started
+    _thread = None
+
+    def __init__(self, panel, log_dir):
+        """
+        :param panel:
+            The GolangPanel() object the races are written to
+
+        :param log_dir:
+            A unicode string of the directory the race detector writes logs to
+        """
+
+        self.panel = panel
+        self.log_dir = log_dir
+        self.races = {}
+        self._files = {}
+        self._stop = threading.Event()
+
+    def start(self, proc):
+        """
+        Starts reading the log files
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that started
+        """
+
+        self._thread = threading.Thread(target=self._poll)
+        self._thread.start()
+
+    def _poll(self):
+        """
+        Reads the log files until the process has finished
+
+        RUNS IN A THREAD
+        """
+
+        while not self._stop.is_set():
+            self._read_logs()
+            self._stop.wait(0.25)
+
+    def _read_logs(self):
+        """
+        Reads any new lines from the log files
+
+        RUNS IN A THREAD
+        """
+
+        try:
+            entries = sorted(os.listdir(self.log_dir))
+        except (OSError):
+            return
+        for entry in entries:
+            state = self._files.setdefault(entry, [0, ''])
+            try:
+                with open(os.path.join(self.log_dir, entry), 'rb') as f:
+                    f.seek(state[0])
+                    data = f.read()
+            except (IOError, OSError):
+                continue
+            if not data:
+                continue
+            state[0] += len(data)
+            lines = (state[1] + data.decode('utf-8', 'replace')).split('\n')
+            state[1] = lines.pop()
+            for line in lines:
+                self._line(line.rstrip('\r'))
+
+    def _line(self, line):
+        """
+        Collects the lines of a race report between the "=================="
+        separators
+
+        RUNS IN A THREAD
+
+        :param line:
+            A unicode string of a line from a log file
+        """
+
+        if line.startswith('=================='):
+            if self._block and 'WARNING: DATA RACE' in self._block:
+                self._report(self._block)
+            self._block = []
+            return
+        # Reports are bounded in length, anything else is ignored
+        if self._block is not None and len(self._block) < RACE_MAX_LINES:
+            self._block.append(line)
+
+    def _report(self, block):
+        """
+        Counts a race report, displaying it if it has not been seen before
+
+        RUNS IN A THREAD
+
+        :param block:
+            A list of unicode string lines of the report
+        """
+
+        sections = _parse_race_report(block)
+        # The stacks of the two conflicting accesses identify the race, the
+        # goroutine creation sites and addresses vary between reports
+        signature_source = []
+        for title, frames in sections[:2]:
+            signature_source.append(title)
+            signature_source.extend('%s %s:%s' % frame for frame in frames)
+        signature = hashlib.sha1('\n'.join(signature_source).encode('utf-8')).hexdigest()
+
+        if signature in self.races:
+            self.races[signature][1] += 1
+            return
+        if len(self.races) >= RACE_MAX_UNIQUE:
+            self.other_reports += 1
+            return
+
+        number = len(self.races) + 1
+        self.races[signature] = [number, 1, sections]
+        output = '> Data race #%d:\n' % number
+        for title, frames in sections:
+            output += '>   %s:\n' % title
+            for function, file_name, line in frames:
+                output += '    %s:%s: %s\n' % (file_name, line, function)
+        self.panel.write(output, content_separator='\n')
+
+    def complete(self, proc):
+        """
+        Stops reading the log files and summarizes the races
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the summary
+        """
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._read_logs()
+        self._line('==================')
+
+        if not self.races:
+            return None
+
+        total = sum(count for _, count, _ in self.races.values()) + self.other_reports
+        output = '> Data races: %d unique, %d reports\n' % (len(self.races), total)
+        for number, count, sections in sorted(self.races.values(), key=lambda race: race[0]):
+            location = ''
+            if sections and sections[0][1]:
+                function, file_name, line = sections[0][1][0]
+                location = ' - %s at %s:%s' % (function, os.path.basename(file_name), line)
+            output += '>   #%d: %d reports%s\n' % (number, count, location)
+        if self.other_reports:
+            output += '>   %d reports of other races were not displayed\n' % self.other_reports
+        return output.rstrip('\n')
+
+
+class GolangTraceHandler(GolangOutputHandler):
+
+    """
+    Summarizes the execution trace written by "go test -trace" once the
+    process has finished
+    """
+
+    # A unicode string of the path passed to -trace
+    trace_path = None
+
+    # A unicode string of the working directory of the process
+    working_dir = None
+
+    def __init__(self, trace_path, working_dir):
+        """
+        :param trace_path:
+            A unicode string of the path passed to -trace
+
+        :param working_dir:
+            A unicode string of the working directory of the process
+        """
+
+        self.trace_path = trace_path
+        self.working_dir = working_dir
+
+    def complete(self, proc):
+        """
+        Reads the trace and formats the summary
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the report
+        """
+
+        if proc.result == 'cancelled' or not os.path.exists(self.trace_path):
+            return None
+
+        reader = GolangTraceReader(self.working_dir)
+        try:
+            reader.read(self.trace_path)
+        except (ValueError) as e:
+            return '> Trace: %s' % str_cls(e)
+        return _format_trace_summary(reader, self.trace_path, self.working_dir)
+
+
+class GolangTraceReader():
+
+    """
+    Summarizes a runtime execution trace in the format used since Go 1.22.
+
+    The trace is a sequence of batches, each at most 64KB, grouped into
+    generations. The string and stack tables of a generation are written after
+    most of its events, so only the events of the current generation that are
+    needed for the summary are kept until the generation ends. The rest of the
+    trace is never held in memory.
+    """
+
+    # A unicode string of the working directory, used to prefer frames from
+    # the package being tested when choosing the location of an event
+    working_dir = None
+
+    # An integer of the minor version of the trace format, e.g. 22 for 1.22
+    version = None
+
+    # A float of the number of nanoseconds per timestamp tick
+    tick_ns = 1.0
+
+    # None or integers of the first and last timestamps seen
+    first_ts = None
+    last_ts = None
+
+    # An integer of the number of goroutines created while tracing
+    created = 0
+
+    # An integer of the largest number of goroutines alive at once
+    peak = 0
+
+    # A set of the integer IDs of the goroutines alive
+    live = None
+
+    # A dict with unicode string keys of "syscall", "network" and "sync" and
+    # values of a two-element list of the integer ticks spent blocked and the
+    # number of events
+    blocked = None
+
+    # An integer of the number of GC cycles that started, and the ticks spent
+    # in the cycles that finished
+    gc_count = 0
+    gc_ticks = 0
+
+    # A dict with unicode string keys of "gc" and "other" and values of a
+    # three-element list of the integer total ticks, number of pauses and
+    # longest pause of stop-the-world pauses
+    stw = None
+
+    # A heap of the TRACE_TOP longest blocking events, each a three-element
+    # tuple of the integer ticks, a sequence number and the event dict
+    longest = None
+
+    # An integer of the number of batches containing events this version of
+    # the reader does not know, the rest of which were skipped
+    skipped = 0
+
+    # A bool if the trace ended part way through a batch
+    truncated = False
+
+    def __init__(self, working_dir=None):
+        """
+        :param working_dir:
+            None or a unicode string of the working directory
+        """
+
+        self.working_dir = working_dir
+        self.live = set()
+        self.blocked = {}
+        self.stw = {}
+        self.longest = []
+
+        # State that persists between generations. Goroutines are tracked by
+        # the M (OS thread) they are running on, since most events do not
+        # include the goroutine ID.
+        self._running = {}
+        self._syscalls = {}
+        self._stws = {}
+        self._gcs = {}
+        self._blocks = {}
+        self._sequence = 0
+        self._goroot = None
+
+        # State for the current generation
+        self._gen = None
+        self._strings = {}
+        self._stacks = {}
+        self._frames = {}
+        self._events = []
+        self._closed = []
+        self._timeline = []
+
+    def read(self, path):
+        """
+        Reads and summarizes a trace file
+
+        RUNS IN A THREAD
+
+        :param path:
+            A unicode string of the path to the trace
+
+        :raises:
+            ValueError - when the file is not a trace in a supported format
+        """
+
+        with open(path, 'rb') as f:
+            match = re.match(b'^go 1\\.(\\d+) trace\x00*$', f.read(16))
+            if not match:
+                raise ValueError('%s is not a Go execution trace' % path)
+            self.version = int(match.group(1))
+            if self.version < 22:
+                raise ValueError(
+                    'traces from Go 1.%d are not supported, use "go tool trace %s"' % (self.version, path)
+                )
+
+            while True:
+                header = f.read(1)
+                if not header:
+                    break
+                kind = ord(header)
+                if kind == _TRACE_EXPERIMENTAL_BATCH:
+                    f.read(1)
+                elif kind != _TRACE_EVENT_BATCH:
+                    raise ValueError('%s contains invalid data at offset %d' % (path, f.tell() - 1))
+                try:
+                    gen = _read_file_uvarint(f)
+                    m = _read_file_uvarint(f)
+                    ts = _read_file_uvarint(f)
+                    size = _read_file_uvarint(f)
+                except (EOFError):
+                    self.truncated = True
+                    break
+                data = bytearray(f.read(size))
+                if len(data) != size:
+                    self.truncated = True
+                    break
+
+                if gen != self._gen:
+                    if self._gen is not None:
+                        self._end_generation()
+                    self._gen = gen
+                if kind == _TRACE_EXPERIMENTAL_BATCH or not data:
+                    continue
+
+                try:
+                    if data[0] == _TRACE_STRINGS:
+                        self._read_strings(data)
+                    elif data[0] == _TRACE_STACKS:
+                        self._read_stacks(data)
+                    elif data[0] in (_TRACE_FREQUENCY, _TRACE_SYNC):
+                        self._read_frequency(data)
+                    elif data[0] != _TRACE_CPU_SAMPLES:
+                        self._read_events(m, ts, data)
+                except (ValueError):
+                    self.skipped += 1
+
+        if self._gen is not None:
+            self._end_generation()
+
+    def _read_strings(self, data):
+        """
+        Adds the entries of a string table batch to the string table of the
+        generation
+
+        RUNS IN A THREAD
+
+        :param data:
+            A bytearray of the batch
+
+        :raises:
+            ValueError - when the batch is malformed
+        """
+
+        offset = 1
+        while offset < len(data):
+            if data[offset] != _TRACE_STRING:
+                raise ValueError('Invalid string table entry')
+            string_id, offset = _protobuf_varint(data, offset + 1)
+            length, offset = _protobuf_varint(data, offset)
+            self._strings[string_id] = bytes(data[offset:offset + length]).decode('utf-8', 'replace')
+            offset += length
+
+    def _read_stacks(self, data):
+        """
+        Adds the entries of a stack table batch to the stack table of the
+        generation
+
+        RUNS IN A THREAD
+
+        :param data:
+            A bytearray of the batch
+
+        :raises:
+            ValueError - when the batch is malformed
+        """
+
+        offset = 1
+        while offset < len(data):
+            if data[offset] != _TRACE_STACK:
+                raise ValueError('Invalid stack table entry')
+            stack_id, offset = _protobuf_varint(data, offset + 1)
+            frame_count, offset = _protobuf_varint(data, offset)
+            pcs = []
+            for _ in range(frame_count):
+                pc, offset = _protobuf_varint(data, offset)
+                function_id, offset = _protobuf_varint(data, offset)
+                file_id, offset = _protobuf_varint(data, offset)
+                line, offset = _protobuf_varint(data, offset)
+                if pc not in self._frames:
+                    self._frames[pc] = (function_id, file_id, line)
+                pcs.append(pc)
+            self._stacks[stack_id] = pcs
+
+    def _read_frequency(self, data):
+        """
+        Reads the timestamp frequency from a frequency batch, or from the sync
+        batch that replaced it in Go 1.25
+
+        RUNS IN A THREAD
+
+        :param data:
+            A bytearray of the batch
+
+        :raises:
+            ValueError - when the batch is malformed
+        """
+
+        offset = 1 if data[0] == _TRACE_SYNC else 0
+        while offset < len(data):
+            kind = data[offset]
+            if kind == _TRACE_FREQUENCY:
+                frequency, offset = _protobuf_varint(data, offset + 1)
+                if frequency:
+                    self.tick_ns = 1000000000.0 / frequency
+            elif kind == _TRACE_CLOCK_SNAPSHOT:
+                offset += 1
+                for _ in range(4):
+                    _, offset = _protobuf_varint(data, offset)
+            else:
+                break
+
+    def _read_events(self, m, ts, data):
+        """
+        Decodes the events of an event batch
+
+        RUNS IN A THREAD
+
+        :param m:
+            An integer of the ID of the M that wrote the batch
+
+        :param ts:
+            An integer of the timestamp the batch started at
+
+        :param data:
+            A bytearray of the batch
+
+        :raises:
+            ValueError - when the batch contains an unknown event
+        """
+
+        if self.first_ts is None or ts < self.first_ts:
+            self.first_ts = ts
+
+        offset = 0
+        length = len(data)
+        arg_counts = _TRACE_ARG_COUNTS
+        while offset < length:
+            kind = data[offset]
+            offset += 1
+            if kind >= len(arg_counts) or arg_counts[kind] is None:
+                # The size of an unknown event can not be determined, so the
+                # rest of the batch can not be read
+                raise ValueError('Unknown event type %d' % kind)
+            args = []
+            for _ in range(arg_counts[kind]):
+                value, offset = _protobuf_varint(data, offset)
+                args.append(value)
+            # The first argument of each event is the ticks since the
+            # previous event in the batch
+            ts += args[0]
+            self._event(m, kind, ts, args)
+
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def _event(self, m, kind, ts, args):
+        """
+        Updates the state of the reader with an event
+
+        RUNS IN A THREAD
+
+        :param m:
+            An integer of the ID of the M the event happened on
+
+        :param kind:
+            An integer of the event type
+
+        :param ts:
+            An integer of the timestamp of the event
+
+        :param args:
+            A list of the integer arguments of the event
+        """
+
+        if kind in (_TRACE_GO_START, _TRACE_GO_SWITCH):
+            self._running[m] = args[1]
+
+        elif kind == _TRACE_GO_SWITCH_DESTROY:
+            self._goroutine(ts, 'destroy', self._running.get(m))
+            self._running[m] = args[1]
+
+        elif kind in (_TRACE_GO_CREATE, _TRACE_GO_CREATE_BLOCKED, _TRACE_GO_CREATE_SYSCALL):
+            self.created += 1
+            self._goroutine(ts, 'create', args[1])
+            if kind == _TRACE_GO_CREATE_SYSCALL:
+                self._running[m] = args[1]
+
+        elif kind in (_TRACE_GO_DESTROY, _TRACE_GO_DESTROY_SYSCALL):
+            self._goroutine(ts, 'destroy', self._running.pop(m, None))
+
+        elif kind == _TRACE_GO_STOP:
+            self._running.pop(m, None)
+
+        elif kind == _TRACE_GO_BLOCK:
+            g = self._running.pop(m, None)
+            if g is not None:
+                event = self._new_event(ts, None, args[1], args[2])
+                self._goroutine(ts, 'block', g, event)
+
+        elif kind == _TRACE_GO_UNBLOCK:
+            self._goroutine(ts, 'unblock', args[1])
+
+        elif kind in (_TRACE_GO_STATUS, _TRACE_GO_STATUS_STACK):
+            if args[3] in (_TRACE_STATUS_RUNNING, _TRACE_STATUS_SYSCALL):
+                self._running[args[2]] = args[1]
+            self._goroutine(ts, 'status', args[1])
+
+        elif kind == _TRACE_SYSCALL_BEGIN:
+            self._syscalls[m] = self._new_event(ts, 'syscall', None, args[2])
+
+        elif kind in (_TRACE_SYSCALL_END, _TRACE_SYSCALL_END_BLOCKED):
+            event = self._syscalls.pop(m, None)
+            if event is not None:
+                self._close(event, ts)
+            if kind == _TRACE_SYSCALL_END_BLOCKED:
+                # The goroutine has to wait for a P before it runs again
+                self._running.pop(m, None)
+
+        elif kind == _TRACE_STW_BEGIN:
+            self._stws[m] = self._new_event(ts, 'stw', args[1], None)
+
+        elif kind == _TRACE_STW_END:
+            event = self._stws.pop(m, None)
+            if event is not None:
+                self._close(event, ts)
+
+        elif kind == _TRACE_GC_BEGIN:
+            self.gc_count += 1
+            self._gcs[args[1]] = ts
+
+        elif kind == _TRACE_GC_END:
+            start = self._gcs.pop(args[1], None)
+            if start is not None:
+                self.gc_ticks += ts - start
+
+    def _new_event(self, ts, category, reason_id, stack_id):
+        """
+        Creates a dict of an event with a duration. The reason and stack are
+        resolved once the string and stack tables of the generation are read.
+
+        RUNS IN A THREAD
+
+        :param ts:
+            An integer of the timestamp the event started at
+
+        :param category:
+            None if the category depends on the reason, otherwise a unicode
+            string of the category
+
+        :param reason_id:
+            None or an integer of the string ID of the reason
+
+        :param stack_id:
+            None or an integer of the stack ID
+
+        :return:
+            A dict
+        """
+
+        event = {
+            'start': ts,
+            'ticks': None,
+            'category': category,
+            'reason': reason_id,
+            'stack': stack_id,
+            'location': None,
+            'resolved': False,
+        }
+        self._events.append(event)
+        return event
+
+    def _goroutine(self, ts, action, g, event=None):
+        """
+        Records an event that must be processed in timestamp order, since it
+        involves a goroutine that may be running on a different M
+
+        RUNS IN A THREAD
+
+        :param ts:
+            An integer of the timestamp
+
+        :param action:
+            A unicode string of "create", "destroy", "status", "block" or
+            "unblock"
+
+        :param g:
+            None or an integer of the goroutine ID
+
+        :param event:
+            None or the dict of a blocking event
+        """
+
+        if g is None:
+            return
+        self._sequence += 1
+        self._timeline.append((ts, self._sequence, action, g, event))
+
+    def _close(self, event, ts):
+        """
+        Records the end of an event with a duration
+
+        RUNS IN A THREAD
+
+        :param event:
+            The dict of the event
+
+        :param ts:
+            An integer of the timestamp the event ended at
+        """
+
+        event['ticks'] = ts - event['start']
+        if event['resolved']:
+            self._account(event)
+        else:
+            self._closed.append(event)
+
+    def _account(self, event):
+        """
+        Adds a finished and resolved event to the totals
+
+        RUNS IN A THREAD
+
+        :param event:
+            The dict of the event
+        """
+
+        ticks = event['ticks']
+        category = event['category']
+        if category == 'stw':
+            # Starting and stopping the trace also stops the world
+            key = 'gc' if 'GC' in event['reason'] else 'other'
+            totals = self.stw.setdefault(key, [0, 0, 0])
+            totals[0] += ticks
+            totals[1] += 1
+            totals[2] = max(totals[2], ticks)
+            return
+        if category is None:
+            return
+
+        totals = self.blocked.setdefault(category, [0, 0])
+        totals[0] += ticks
+        totals[1] += 1
+
+        self._sequence += 1
+        entry = (ticks, self._sequence, event)
+        if len(self.longest) < TRACE_TOP:
+            heapq.heappush(self.longest, entry)
+        elif ticks > self.longest[0][0]:
+            heapq.heapreplace(self.longest, entry)
+
+    def _end_generation(self):
+        """
+        Resolves the events of the generation using its string and stack
+        tables, processes the goroutine events in timestamp order and then
+        discards the tables
+
+        RUNS IN A THREAD
+        """
+
+        for event in self._events:
+            if event['reason'] is not None:
+                event['reason'] = self._strings.get(event['reason'], '')
+            if event['stack']:
+                event['location'] = self._location(event['stack'])
+            if event['category'] is None:
+                event['category'] = _trace_block_category(event['reason'] or '')
+            event['resolved'] = True
+        for event in self._closed:
+            self._account(event)
+
+        self._timeline.sort(key=lambda entry: entry[:2])
+        for ts, _, action, g, event in self._timeline:
+            if action in ('create', 'status'):
+                if g not in self.live:
+                    self.live.add(g)
+                    self.peak = max(self.peak, len(self.live))
+            elif action == 'destroy':
+                self.live.discard(g)
+            elif action == 'block':
+                self._blocks[g] = event
+            elif action == 'unblock':
+                event = self._blocks.pop(g, None)
+                if event is not None:
+                    self._close(event, ts)
+
+        self._strings = {}
+        self._stacks = {}
+        self._frames = {}
+        self._events = []
+        self._closed = []
+        self._timeline = []
+
+    def _location(self, stack_id):
+        """
+        Chooses the frame of a stack to display for an event. The first frame
+        in the working directory is preferred, then the first frame outside of
+        the Go standard library.
+
+        RUNS IN A THREAD
+
+        :param stack_id:
+            An integer of the stack ID
+
+        :return:
+            None or a three-element tuple of unicode strings of the file path,
+            line number and function name
+        """
+
+        frames = []
+        for pc in self._stacks.get(stack_id, []):
+            function_id, file_id, line = self._frames[pc]
+            function = self._strings.get(function_id, '?')
+            file_name = self._strings.get(file_id, '?')
+            frames.append((file_name, '%d' % line, function))
+            if self._goroot is None and function.startswith('runtime.') and '/src/runtime/' in file_name:
+                self._goroot = file_name[:file_name.index('/src/runtime/') + 5]
+        if not frames:
+            return None
+
+        if self.working_dir:
+            prefix = self.working_dir.replace('\\', '/').rstrip('/') + '/'
+            for frame in frames:
+                if frame[0].replace('\\', '/').startswith(prefix):
+                    return frame
+        if self._goroot:
+            for frame in frames:
+                if not frame[0].startswith(self._goroot):
+                    return frame
+        return frames[0]
+
+
+class GolangBinarySizeHandler(GolangOutputHandler):
+
+    """
+    Reports which packages the size of the executable produced by a
+    successful "go build" or "go install" comes from
+    """
+
+    # A unicode string with the path to the "go" executable
+    go_bin = None
+
+    # A list of unicode string flags passed to the "go" executable
+    flags = None
+
+    # A unicode string of the working directory of the build
+    working_dir = None
+
+    # A dict of environment variables the build was run with
+    env = None
+
+    # A boolean - if the executable was installed instead of built
+    install = False
+
+    def __init__(self, go_bin, flags, working_dir, env, install):
+        """
+        :param go_bin:
+            A unicode string with the path to the "go" executable
+
+        :param flags:
+            A list of unicode string flags passed to the "go" executable
+
+        :param working_dir:
+            A unicode string of the working directory of the build
+
+        :param env:
+            A dict of environment variables the build was run with
+
+        :param install:
+            A boolean - if the build was "go install"
+        """
+
+        self.go_bin = go_bin
+        self.flags = list(flags or [])
+        self.working_dir = working_dir
+        self.env = env
+        self.install = install
+
+    def complete(self, proc):
+        """
+        Locates the executable and reports its size
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the report
+        """
+
+        if proc.result != 'success':
+            return None
+
+        returncode, stdout, _ = _run_capture(
+            [self.go_bin, 'list', '-f', '{{.Name}}\n{{.Target}}\n{{context.GOOS}}/{{context.GOARCH}}'],
+            self.working_dir,
+            self.env
+        )
+        lines = stdout.splitlines()
+        # Only main packages produce an executable
+        if returncode != 0 or len(lines) < 3 or lines[0] != 'main':
+            return None
+        target, platform = lines[1].strip(), lines[2].strip()
+        name = os.path.basename(target) or os.path.basename(self.working_dir)
+
+        if self.install:
+            path = target
+        else:
+            path = os.path.join(self.working_dir, name)
+            for index, flag in enumerate(self.flags):
+                if flag == '-o' and index + 1 < len(self.flags):
+                    path = self.flags[index + 1]
+                elif flag.startswith('-o='):
+                    path = flag[3:]
+            path = os.path.join(self.working_dir, path)
+            if os.path.isdir(path):
+                path = os.path.join(path, name)
+
+        if not path or not os.path.isfile(path):
+            return None
+        return _binary_size_report(path, '%s\n%s' % (path, platform), self.working_dir)
+
+
+class GolangBenchmarkResultHandler(GolangLineHandler):
+
+    """
+    Collects the benchmark result lines of a process
+    """
+
+    # A list of three-element tuples from _parse_benchmark_line()
+    results = None
+
+    def __init__(self):
+        self.results = []
+
+    def line(self, message_type, line):
+        """
+        Records benchmark result lines
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        parsed = _parse_benchmark_line(line)
+        if parsed is not None:
+            self.results.append(parsed)
+
+
+class GolangBenchmarkBudgetHandler(GolangBenchmarkResultHandler):
+
+    """
+    Checks benchmark results against the budgets from the "benchmark:budgets"
+    setting, changing the result of the run to "error" if any are exceeded
+    """
+
+    # A dict with unicode string keys of benchmark name regular expressions
+    # and values of a dict of unicode string units, or "max_change", to
+    # float limits
+    budgets = None
+
+    # A unicode string of the key the results and baseline are stored under
+    key = None
+
+    def __init__(self, budgets, key):
+        """
+        :param budgets:
+            A dict from the "benchmark:budgets" setting
+
+        :param key:
+            A unicode string from _results_key()
+        """
+
+        GolangBenchmarkResultHandler.__init__(self)
+        self.budgets = budgets
+        self.key = key
+
+    def complete(self, proc):
+        """
+        Stores the results, and reports any budget violations
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the violations
+        """
+
+        if proc.result == 'cancelled' or not self.results:
+            return None
+
+        cpu_counts = _benchmark_cpu_counts(proc.args, proc.env)
+        totals = {}
+        for name, _, metrics in self.results:
+            name = _split_benchmark_procs(name, cpu_counts)[0]
+            for unit in metrics:
+                totals.setdefault(name, {}).setdefault(unit, []).append(metrics[unit])
+        averages = {}
+        for name in totals:
+            averages[name] = dict((unit, sum(values) / len(values)) for unit, values in totals[name].items())
+
+        results_path = _storage_path('benchmark_results.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            stored = _load_json(results_path, {})
+            entry = stored.setdefault(self.key, {})
+            entry['last'] = averages
+            # The first run is used as the baseline until one is saved
+            if 'baseline' not in entry:
+                entry['baseline'] = averages
+            baseline = entry['baseline']
+            _save_json(results_path, stored)
+        finally:
+            _STORAGE_LOCK.release()
+
+        violations = _check_benchmark_budgets(self.budgets, averages, baseline)
+        if not violations:
+            return '> Budgets: %d benchmarks within budget' % len(
+                [name for name in averages if _benchmark_budget(self.budgets, name)]
+            )
+
+        proc.result = 'error'
+        rows = [('Benchmark', 'Unit', 'Result', 'Budget')] + violations
+        widths = [max(len(row[column]) for row in rows) for column in range(3)]
+        output = '> Budget violations:\n'
+        for row in rows:
+            output += '>   %s  %s  %s  %s\n' % (
+                row[0].ljust(widths[0]),
+                row[1].ljust(widths[1]),
+                row[2].rjust(widths[2]),
+                row[3]
+            )
+        return output.rstrip('\n')
+
+
+class GolangBenchmarkScalingHandler(GolangLineHandler):
+
+    """
+    Collects benchmark results run with a -cpu list and reports how the time
+    per operation of each benchmark scales with GOMAXPROCS
+    """
+
+    # A list of the integer GOMAXPROCS values the benchmarks are run with
+    cpu_counts = None
+
+    # A list of unicode string benchmark names, in the order first seen
+    names = None
+
+    # A dict with two-element tuple keys of a unicode string benchmark name
+    # and integer GOMAXPROCS, and values of a list of float ns/op results
+    results = None
+
+    def __init__(self, cpu_counts):
+        """
+        :param cpu_counts:
+            A list of the integer GOMAXPROCS values passed via -cpu
+        """
+
+        self.cpu_counts = cpu_counts
+        self.names = []
+        self.results = {}
+
+    def line(self, message_type, line):
+        """
+        Records the ns/op of benchmark result lines
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        parsed = _parse_benchmark_line(line)
+        if parsed is None or 'ns/op' not in parsed[2]:
+            return
+
+        name, procs = _split_benchmark_procs(parsed[0], self.cpu_counts)
+        if name not in self.names:
+            self.names.append(name)
+        self.results.setdefault((name, procs), []).append(parsed[2]['ns/op'])
+
+    def complete(self, proc):
+        """
+        Formats a table of the speedup and parallel efficiency of each
+        benchmark
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the table
+        """
+
+        if not self.names:
+            return None
+        return _format_scaling_table(self.names, self.results, self.cpu_counts)
+
+
+class GolangFlakyHandler(GolangLineHandler):
+
+    """
+    Counts the passes and failures of each test run by one process of the
+    "flaky" task
+    """
+
+    # An integer of the -shuffle seed used by the process
+    seed = None
+
+    # A dict with unicode string keys of test names and values of a
+    # two-element list of the integer number of passes and failures
+    outcomes = None
+
+    def __init__(self, seed):
+        """
+        :param seed:
+            An integer of the -shuffle seed used by the process
+        """
+
+        self.seed = seed
+        self.outcomes = {}
+
+    def line(self, message_type, line):
+        """
+        Looks for "--- PASS:" and "--- FAIL:" lines and -json events
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        if line.startswith('{'):
+            try:
+                event = json.loads(line)
+            except (ValueError):
+                event = None
+            if isinstance(event, dict) and event.get('Test') and event.get('Action') in ('pass', 'fail'):
+                self._record(event['Test'], event['Action'] == 'pass')
+            return
+
+        match = re.match('^\\s*--- (PASS|FAIL): (\\S+)', line)
+        if match:
+            self._record(match.group(2), match.group(1) == 'PASS')
+
+    def _record(self, name, passed):
+        """
+        Counts one outcome of a test
+
+        RUNS IN A THREAD
+
+        :param name:
+            A unicode string of the test name
+
+        :param passed:
+            A boolean - if the test passed
+        """
+
+        outcome = self.outcomes.setdefault(name, [0, 0])
+        outcome[0 if passed else 1] += 1
+
+
+class GolangStatusHandler(GolangOutputHandler):
+
+    """
+    Base class for handlers that replace periodic progress lines with a
+    single status line in the output panel.
+
+    The handler writes all of the output to the panel itself so status lines
+    stay in order with the rest of the output. It must therefore be the last
+    handler passed to a GolangProcessPrinter().
+    """
+
+    # The GolangPanel() object the output is written to
+    panel = None
+
+    # A dict with unicode string keys of "stdout" and "stderr" and values of
+    # a unicode string of any incomplete line of output
+    _partial = None
+
+    def output(self, message_type, message):
+        """
+        Writes complete lines of output to the panel, turning progress lines
+        into the status line
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param message:
+            A unicode string of the output
+
+        :return:
+            None, since the output has already been written
+        """
+
+        if self._partial is None:
+            self._partial = {}
+        lines = (self._partial.get(message_type, '') + message).split('\n')
+        self._partial[message_type] = lines.pop()
+
+        pending = ''
+        for line in lines:
+            status = self._status(line.rstrip('\r'))
+            if status is None:
+                pending += line + '\n'
+                continue
+            if pending:
+                self.panel.write(pending)
+                pending = ''
+            if status:
+                self.panel.write_status(status)
+        if pending:
+            self.panel.write(pending)
+        return None
+
+    def _status(self, line):
+        """
+        Processes a line of output
+
+        RUNS IN A THREAD
+
+        :param line:
+            A unicode string of a line of output
+
+        :return:
+            None if the line should be displayed, an empty string if it should
+            be hidden, or a unicode string of the status line to display
+            instead of it
+        """
+
+        return None
+
+    def _flush(self):
+        """
+        Writes any incomplete lines of output once the process has finished
+
+        RUNS IN A THREAD
+        """
+
+        if self._partial:
+            remaining = ''.join(self._partial.values())
+            if remaining:
+                self.panel.write(remaining)
+            self._partial = {}
+
+
+class GolangTelemetryHandler(GolangStatusHandler):
+
+    """
+    Removes the GODEBUG gctrace and schedtrace lines from the output of a
+    "go run" process, displaying a live summary of them as the status line
+    and sending it via package_events as a "runtime_telemetry" event
+    """
+
+    # A list of strings of the args of the process
+    args = None
+
+    # A unicode string of the working directory of the process
+    working_dir = None
+
+    # An integer of the number of garbage collections
+    gc_count = 0
+
+    # A collections.deque() of the float stop-the-world pause milliseconds of
+    # the most recent TELEMETRY_PAUSES garbage collections
+    pauses = None
+
+    # None or an integer of the heap goal in MB from the last collection
+    heap_goal = None
+
+    # None or a dict of the integer fields of the most recent SCHED line,
+    # plus "runnable", the total number of goroutines in run queues
+    sched = None
+
+    # A float of the unix timestamp the status was last updated at
+    _updated = 0.0
+
+    def __init__(self, panel, args, working_dir):
+        """
+        :param panel:
+            The GolangPanel() object the output is written to
+
+        :param args:
+            A list of strings of the args of the process
+
+        :param working_dir:
+            A unicode string of the working directory of the process
+        """
+
+        self.panel = panel
+        self.args = list(args)
+        self.working_dir = working_dir
+        self.pauses = collections.deque(maxlen=TELEMETRY_PAUSES)
+
+    def _status(self, line):
+        """
+        Parses gctrace and schedtrace lines
+
+        RUNS IN A THREAD
+
+        :param line:
+            A unicode string of a line of output
+
+        :return:
+            None if the line should be displayed, otherwise an empty string or
+            a unicode string of the summary
+        """
+
+        match = re.match('^gc \\d+ @', line)
+        if match:
+            self.gc_count += 1
+            clock = re.search('([0-9.]+)\\+([0-9.]+)\\+([0-9.]+) ms clock', line)
+            if clock:
+                # Sweep termination and mark termination stop the world
+                self.pauses.append(float(clock.group(1)) + float(clock.group(3)))
+            goal = re.search('(\\d+) MB goal', line)
+            if goal:
+                self.heap_goal = int(goal.group(1))
+        elif line.startswith('SCHED '):
+            self.sched = dict((key, int(value)) for key, value in re.findall('(\\w+)=(\\d+)', line))
+            queues = re.search('\\[([0-9 ]*)\\]', line)
+            self.sched['runnable'] = self.sched.get('runqueue', 0)
+            if queues:
+                self.sched['runnable'] += sum(int(value) for value in queues.group(1).split())
+        elif not line.startswith('scvg'):
+            return None
+
+        # The panel is updated at most a few times a second
+        if time.time() - self._updated < 0.5:
+            return ''
+        self._updated = time.time()
+        self._notify()
+        return '> Runtime: %s' % self.summary()
+
+    def summary(self):
+        """
+        Formats the telemetry collected so far
+
+        RUNS IN A THREAD
+
+        :return:
+            A unicode string
+        """
+
+        parts = ['%d GCs' % self.gc_count]
+        if self.pauses:
+            ordered = sorted(self.pauses)
+            parts.append('pause p50 %0.3fms p99 %0.3fms' % (
+                _percentile(ordered, 50),
+                _percentile(ordered, 99)
+            ))
+        if self.heap_goal is not None:
+            parts.append('heap goal %d MB' % self.heap_goal)
+        if self.sched:
+            parts.append('%d threads, %d runnable goroutines, %d of %d Ps idle' % (
+                self.sched.get('threads', 0),
+                self.sched.get('runnable', 0),
+                self.sched.get('idleprocs', 0),
+                self.sched.get('gomaxprocs', 0)
+            ))
+        return ', '.join(parts)
+
+    def _notify(self):
+        """
+        Sends the telemetry via package_events
+
+        RUNS IN A THREAD
+        """
+
+        ordered = sorted(self.pauses)
+        sched = self.sched or {}
+        package_events.notify(
+            'Golang Build',
+            'runtime_telemetry',
+            RuntimeTelemetryEvent(
+                args=self.args,
+                working_dir=self.working_dir,
+                gc_count=self.gc_count,
+                pause_p50=_percentile(ordered, 50) if ordered else None,
+                pause_p99=_percentile(ordered, 99) if ordered else None,
+                heap_goal=self.heap_goal,
+                threads=sched.get('threads'),
+                runnable_goroutines=sched.get('runnable'),
+            )
+        )
+
+    def complete(self, proc):
+        """
+        Displays the final summary
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the summary
+        """
+
+        self._flush()
+        if not self.gc_count and not self.sched:
+            return None
+        self._notify()
+        return '> Runtime: %s' % self.summary()
+
+
+class GolangFuzzHandler(GolangStatusHandler):
+
+    """
+    Replaces the periodic progress lines of "go test -fuzz" with a single
+    status line, and opens the failing input once a crasher is found
+    """
+
+    # The sublime.Window object the build is running in
+    window = None
+
+    # A unicode string of the package directory failing inputs are written
+    # relative to
+    working_dir = None
+
+    # A unicode string of the name of the Fuzz function
+    name = None
+
+    # A dict of the most recent progress with the keys "elapsed", "execs",
+    # "new" and "total", or None before the first progress line
+    progress = None
+
+    # None or a unicode string of the path to the failing input
+    failing_input = None
+
+    def __init__(self, window, panel, working_dir, name):
+        """
+        :param window:
+            The sublime.Window object the build is running in
+
+        :param panel:
+            The GolangPanel() object the output is written to
+
+        :param working_dir:
+            A unicode string of the package directory
+
+        :param name:
+            A unicode string of the name of the Fuzz function
+        """
+
+        self.window = window
+        self.panel = panel
+        self.working_dir = working_dir
+        self.name = name
+
+    def _status(self, line):
+        """
+        Parses a line of output for fuzzing progress or a failing input
+
+        RUNS IN A THREAD
+
+        :param line:
+            A unicode string of a line of output
+
+        :return:
+            None if the line should be displayed, otherwise a unicode string of
+            the status line to display instead
+        """
+
+        match = re.match('^\\s*Failing input written to (.+)$', line)
+        if match:
+            self.failing_input = os.path.join(self.working_dir, match.group(1).strip())
+            return None
+
+        match = re.match('^fuzz: elapsed: (\\S+), gathering baseline coverage: (\\d+)/(\\d+) completed', line)
+        if match:
+            return '> Fuzzing %s: %s elapsed, gathering baseline coverage %s/%s' % (
+                self.name,
+                match.group(1),
+                match.group(2),
+                match.group(3)
+            )
+
+        match = re.match(
+            '^fuzz: elapsed: (\\S+), execs: (\\d+) \\((\\d+)/sec\\), new interesting: (\\d+) \\(total: (\\d+)\\)',
+            line
+        )
+        if not match:
+            return None
+
+        self.progress = {
+            'elapsed': match.group(1),
+            'execs': int(match.group(2)),
+            'new': int(match.group(4)),
+            'total': int(match.group(5)),
+        }
+        return '> Fuzzing %s: %s elapsed, %d execs, %s/sec, %d new interesting (%d in corpus)' % (
+            self.name,
+            self.progress['elapsed'],
+            self.progress['execs'],
+            match.group(3),
+            self.progress['new'],
+            self.progress['total']
+        )
+
+    def complete(self, proc):
+        """
+        Summarizes the fuzzing run and opens the failing input, if any
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None, or a unicode string of the summary
+        """
+
+        self._flush()
+
+        output = ''
+        if self.progress:
+            seconds = _parse_go_duration(self.progress['elapsed'])
+            rate = ''
+            if seconds:
+                rate = ' (%d/sec)' % (self.progress['execs'] / seconds)
+            output += '> Fuzzing: %d execs in %s%s, %d new interesting inputs (%d in corpus)\n' % (
+                self.progress['execs'],
+                self.progress['elapsed'],
+                rate,
+                self.progress['new'],
+                self.progress['total']
+            )
+
+        if self.failing_input:
+            output += '> Failing input: %s\n' % self.failing_input
+            failing_input = self.failing_input
+            sublime.set_timeout(lambda: self.window.open_file(failing_input), 1)
+
+        return output.rstrip('\n') or None
+
+
+class GolangTestTimingHandler(GolangLineHandler):
+
+    """
+    Records the duration of each package and test from "go test" output, for
+    use when planning "test_sharded" runs
+    """
+
+    # A dict with unicode string keys of package import paths and values of a
+    # float of the seconds the package took
+    packages = None
+
+    # A dict with unicode string keys of package import paths and values of a
+    # dict of test names to the float seconds each test took
+    tests = None
+
+    # A dict with unicode string keys of test names and values of a float of
+    # the seconds the test took, for the package whose output is being printed
+    _pending = None
+
+    def __init__(self):
+        self.packages = {}
+        self.tests = {}
+        self._pending = {}
+
+    def line(self, message_type, line):
+        """
+        Looks for "--- PASS:" and "--- FAIL:" lines, and package result lines
+
+        RUNS IN A THREAD
+
+        :param message_type:
+            A unicode string of "stdout" or "stderr"
+
+        :param line:
+            A unicode string of the line of output
+        """
+
+        match = re.match('^--- (?:PASS|FAIL|SKIP): (\\S+) \\(([0-9.]+)s\\)', line)
+        if match:
+            self._pending[match.group(1)] = float(match.group(2))
+            return
+
+        match = re.match('^(?:ok|FAIL)\\s+(\\S+)\\s+([0-9.]+)s', line)
+        if match:
+            self.packages[match.group(1)] = float(match.group(2))
+            self.tests[match.group(1)] = self._pending
+            self._pending = {}
+
+    def complete(self, proc):
+        """
+        Merges the durations into the stored timings
+
+        RUNS IN A THREAD
+
+        :param proc:
+            The GolangProcess() object that finished
+
+        :return:
+            None
+        """
+
+        if not self.packages:
+            return None
+
+        timings_path = _storage_path('test_timings.json')
+        _STORAGE_LOCK.acquire()
+        try:
+            timings = _load_json(timings_path, {})
+            for package in self.packages:
+                timings[package] = {
+                    'duration': self.packages[package],
+                    'tests': self.tests.get(package, {}),
+                }
+            _save_json(timings_path, timings)
+        finally:
+            _STORAGE_LOCK.release()
+        return None
+
+
+def _summarize_action_graph(actions):
+    """
+    Computes timing information from the action graph written by the go tool
+    when passed the -debug-actiongraph flag
+
+    :param actions:
+        A list of dicts, each one an action from the action graph JSON
+
+    :return:
+        A dict with the keys:
+         - "compile": a float of the seconds spent compiling packages
+         - "link": a float of the seconds spent linking
+         - "compiled": an integer of the number of packages compiled
+         - "cached": an integer of the number of packages from the build cache
+         - "wall": a float of the seconds between the first action starting
+           and the last action finishing
+         - "critical": a float of the seconds of the longest dependency chain
+         - "critical_path": a list of unicode strings of the packages on the
+           longest chain, from the final target down
+         - "packages": a list of (unicode string package, float seconds) tuples
+           of compile time, sorted from slowest to fastest
+    """
+
+    by_id = {}
+    durations = {}
+    starts = []
+    ends = []
+    for action in actions:
+        by_id[action['ID']] = action
+        start = _parse_rfc3339(action.get('TimeStart'))
+        end = _parse_rfc3339(action.get('TimeDone'))
+        duration = 0.0
+        if start is not None and end is not None:
+            duration = max(end - start, 0.0)
+            starts.append(start)
+            ends.append(end)
+        durations[action['ID']] = duration
+
+    result = {
+        'compile': 0.0,
+        'link': 0.0,
+        'compiled': 0,
+        'cached': 0,
+        'wall': max(ends) - min(starts) if starts else 0.0,
+        'critical': 0.0,
+        'critical_path': [],
+        'packages': [],
+    }
+
+    for action in actions:
+        mode = action.get('Mode', '')
+        duration = durations[action['ID']]
+        if mode == 'build':
+            if action.get('NeedBuild'):
+                result['compiled'] += 1
+                result['compile'] += duration
+                result['packages'].append((action.get('Package', ''), duration))
+            else:
+                result['cached'] += 1
+        elif mode.startswith('link'):
+            result['link'] += duration
+
+    result['packages'].sort(key=lambda item: item[1], reverse=True)
+
+    # The longest path through the dependency graph, memoized by action ID.
+    # The graph is walked iteratively since it may be deeper than the
+    # Python recursion limit.
+    longest = {}
+    for action in actions:
+        stack = [action['ID']]
+        while stack:
+            action_id = stack[-1]
+            if action_id in longest:
+                stack.pop()
+                continue
+            deps = by_id[action_id].get('Deps') or []
+            missing = [dep for dep in deps if dep not in longest]
+            if missing:
+                stack.extend(missing)
+                continue
+            best = None
+            for dep in deps:
+                if best is None or longest[dep][0] > longest[best][0]:
+                    best = dep
+            best_length = longest[best][0] if best is not None else 0.0
+            longest[action_id] = (durations[action_id] + best_length, best)
+            stack.pop()
+
+    if longest:
+        action_id = max(longest, key=lambda key: longest[key][0])
+        result['critical'] = longest[action_id][0]
+        while action_id is not None:
+            package = by_id[action_id].get('Package')
+            if package and durations[action_id] > 0 and package not in result['critical_path']:
+                result['critical_path'].append(package)
+            action_id = longest[action_id][1]
+
+    return result
+
+
+def _read_pprof(path):
+    """
+    Reads and decodes a profile in the gzipped protocol buffer format written
+    by the runtime/pprof package
+
+    :param path:
+        A unicode string of the path to the profile
+
+    :raises:
+        ValueError - when the file is not a valid profile
+
+    :return:
+        A dict with the keys:
+         - "sample_types": a list of (unicode string type, unicode string unit)
+           tuples naming each value of a sample
+         - "default_sample_type": None or a unicode string of the sample type
+           the profile should be displayed with by default
+         - "samples": a list of (list of integer location IDs, list of integer
+           values) tuples. The first location is the leaf of the stack.
+         - "locations": a dict with integer keys of the location ID and values
+           of a list of (integer function ID, integer line) tuples. When a
+           location contains inlined calls, the innermost is first.
+         - "functions": a dict with integer keys of the function ID and values
+           of a (unicode string name, unicode string filename) tuple
+    """
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:2] == b'\x1f\x8b':
+        try:
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        except (zlib.error) as e:
+            raise ValueError('The profile %s could not be decompressed: %s' % (path, str_cls(e)))
+
+    data = bytearray(data)
+    strings = []
+    sample_types = []
+    samples = []
+    locations = {}
+    functions = {}
+    default_sample_type = None
+
+    try:
+        for field, value in _protobuf_fields(data, 0, len(data)):
+            if field == 1:
+                value_type = dict(_protobuf_fields(data, *value))
+                sample_types.append((value_type.get(1, 0), value_type.get(2, 0)))
+            elif field == 2:
+                location_ids = []
+                values = []
+                for sample_field, sample_value in _protobuf_fields(data, *value):
+                    if sample_field == 1:
+                        location_ids.extend(_protobuf_varints(data, sample_value))
+                    elif sample_field == 2:
+                        values.extend(_protobuf_int64(v) for v in _protobuf_varints(data, sample_value))
+                samples.append((location_ids, values))
+            elif field == 4:
+                location_id = 0
+                lines = []
+                for location_field, location_value in _protobuf_fields(data, *value):
+                    if location_field == 1:
+                        location_id = location_value
+                    elif location_field == 4:
+                        line = dict(_protobuf_fields(data, *location_value))
+                        lines.append((line.get(1, 0), _protobuf_int64(line.get(2, 0))))
+                locations[location_id] = lines
+            elif field == 5:
+                function = dict(_protobuf_fields(data, *value))
+                functions[function.get(1, 0)] = (function.get(2, 0), function.get(4, 0))
+            elif field == 6:
+                strings.append(bytes(data[value[0]:value[1]]).decode('utf-8', 'replace'))
+            elif field == 14:
+                default_sample_type = value
+    except (TypeError):
+        # A field has a different wire type than the profile format uses
+        raise ValueError('The profile %s is not a valid profile' % path)
+
+    def _string(index):
+        if isinstance(index, int_types) and index < len(strings):
+            return strings[index]
+        return ''
+
+    for function_id in functions:
+        name, filename = functions[function_id]
+        functions[function_id] = (_string(name), _string(filename))
+
+    return {
+        'sample_types': [(_string(type_), _string(unit)) for type_, unit in sample_types],
+        'default_sample_type': _string(default_sample_type) if default_sample_type else None,
+        'samples': samples,
+        'locations': locations,
+        'functions': functions,
+    }
+
+
+def _protobuf_fields(data, start, end):
+    """
+    Iterates over the fields of an encoded protocol buffer message
+
+    :param data:
+        A bytearray of the encoded data
+
+    :param start:
+        An integer of the offset of the start of the message
+
+    :param end:
+        An integer of the offset of the end of the message
+
+    :raises:
+        ValueError - when the data is truncated or uses an unknown wire type
+
+    :return:
+        A generator of (integer field number, value) tuples. For varint and
+        fixed-width fields, the value is an integer. For length-delimited
+        fields, the value is a (start, end) tuple of offsets into data.
+    """
+
+    offset = start
+    while offset < end:
+        key, offset = _protobuf_varint(data, offset)
+        field = key >> 3
+        wire_type = key & 0x7
+        if wire_type == 0:
+            value, offset = _protobuf_varint(data, offset)
+        elif wire_type == 2:
+            length, offset = _protobuf_varint(data, offset)
+            value = (offset, offset + length)
+            offset += length
+        elif wire_type == 1 or wire_type == 5:
+            width = 8 if wire_type == 1 else 4
+            if offset + width > end:
+                raise ValueError('Truncated protocol buffer message')
+            value = 0
+            for index in range(width - 1, -1, -1):
+                value = (value << 8) | data[offset + index]
+            offset += width
+        else:
+            raise ValueError('Unsupported protocol buffer wire type %d' % wire_type)
+        if offset > end:
+            raise ValueError('Truncated protocol buffer message')
+        yield field, value
+
+
+def _protobuf_varint(data, offset):
+    """
+    Decodes a protocol buffer varint
+
+    :param data:
+        A bytearray of the encoded data
+
+    :param offset:
+        An integer of the offset of the varint
+
+    :raises:
+        ValueError - when the data is truncated
+
+    :return:
+        A two-element tuple of the integer value and the offset after it
+    """
+
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError('Truncated protocol buffer varint')
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _protobuf_varints(data, value):
+    """
+    Returns the integers from a repeated varint field, which may or may not
+    have been packed
+
+    :param data:
+        A bytearray of the encoded data
+
+    :param value:
+        The value yielded by _protobuf_fields() for the field
+
+    :return:
+        A list of integers
+    """
+
+    if not isinstance(value, tuple):
+        return [value]
+    start, end = value
+    values = []
+    while start < end:
+        integer, start = _protobuf_varint(data, start)
+        values.append(integer)
+    return values
+
+
+def _protobuf_int64(value):
+    """
+    Converts the unsigned representation of a protocol buffer int64 to a
+    signed integer
+
+    :param value:
+        An integer decoded from a varint
+
+    :return:
+        A signed integer
+    """
+
+    if value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+
+def _pprof_sample_index(profile, sample_types):
+    """
+    Chooses which value of each sample of a profile to report on
+
+    :param profile:
+        A dict from _read_pprof()
+
+    :param sample_types:
+        A list of unicode strings of preferred sample types
+
+    :return:
+        An integer index into the values of each sample
+    """
+
+    names = [type_ for type_, _ in profile['sample_types']]
+    for sample_type in sample_types:
+        if sample_type in names:
+            return names.index(sample_type)
+    if profile['default_sample_type'] in names:
+        return names.index(profile['default_sample_type'])
+    return max(len(names) - 1, 0)
+
+
+def _pprof_function_totals(profile, sample_index):
+    """
+    Aggregates the samples of a profile by function
+
+    :param profile:
+        A dict from _read_pprof()
+
+    :param sample_index:
+        An integer of the sample value to aggregate
+
+    :return:
+        A two-element tuple:
+         - [0] an integer of the total of the sample value
+         - [1] a dict with unicode string keys of the function name and
+           values of a dict with the keys "flat", "cum", "filename" and "line"
+    """
+
+    total = 0
+    functions = {}
+    for location_ids, values in profile['samples']:
+        if sample_index >= len(values):
+            continue
+        value = values[sample_index]
+        total += value
+
+        seen = set()
+        first = True
+        for location_id in location_ids:
+            for function_id, line in profile['locations'].get(location_id, []):
+                name, filename = profile['functions'].get(function_id, ('?', ''))
+                if name not in functions:
+                    functions[name] = {'flat': 0, 'cum': 0, 'filename': filename, 'line': line, 'lines': {}}
+                info = functions[name]
+                if first:
+                    info['flat'] += value
+                    info['lines'][line] = info['lines'].get(line, 0) + value
+                    first = False
+                if name not in seen:
+                    info['cum'] += value
+                    seen.add(name)
+
+    # Point each function at the line where it spends the most time itself
+    for name in functions:
+        lines = functions[name].pop('lines')
+        if lines:
+            functions[name]['line'] = max(lines, key=lambda line: lines[line])
+
+    return total, functions
+
+
+def _format_pprof_top(kind, profile, sample_types, working_dir):
+    """
+    Formats a table of the functions in a profile with the highest flat value
+
+    :param kind:
+        A unicode string of the kind of profile, e.g. "CPU"
+
+    :param profile:
+        A dict from _read_pprof()
+
+    :param sample_types:
+        A list of unicode strings of preferred sample types
+
+    :param working_dir:
+        A unicode string of the directory file paths are made relative to
+
+    :return:
+        A unicode string of the table
+    """
+
+    sample_index = _pprof_sample_index(profile, sample_types)
+    type_, unit = profile['sample_types'][sample_index] if profile['sample_types'] else ('', '')
+    total, functions = _pprof_function_totals(profile, sample_index)
+
+    names = sorted(functions, key=lambda name: (functions[name]['flat'], functions[name]['cum']), reverse=True)
+    names = names[:PROFILE_TOP]
+
+    rows = []
+    for name in names:
+        info = functions[name]
+        rows.append((
+            '%s:%d:' % (_relative_path(info['filename'], working_dir), info['line']),
+            _format_sample_value(info['flat'], unit),
+            _percent(info['flat'], total),
+            _format_sample_value(info['cum'], unit),
+            _percent(info['cum'], total),
+            name
+        ))
+
+    output = '> %s Profile (%s): %s total\n' % (kind, type_, _format_sample_value(total, unit))
+    width = max([len(row[0]) for row in rows] + [8])
+    output += '%s %10s %7s %10s %7s  %s\n' % ('location'.ljust(width), 'flat', 'flat%', 'cum', 'cum%', 'function')
+    for row in rows:
+        output += '%s %10s %6.2f%% %10s %6.2f%%  %s\n' % ((row[0].ljust(width),) + row[1:])
+    return output
+
+
+def _format_pprof_diff(kind, base, new, sample_types, working_dir):
+    """
+    Formats a table of the functions whose flat value changed the most
+    between two profiles
+
+    :param kind:
+        A unicode string of the kind of profile, e.g. "CPU"
+
+    :param base:
+        A dict from _read_pprof() of the base profile
+
+    :param new:
+        A dict from _read_pprof() of the new profile
+
+    :param sample_types:
+        A list of unicode strings of preferred sample types
+
+    :param working_dir:
+        A unicode string of the directory file paths are made relative to
+
+    :return:
+        A unicode string of the table
+    """
+
+    base_index = _pprof_sample_index(base, sample_types)
+    new_index = _pprof_sample_index(new, sample_types)
+    type_, unit = new['sample_types'][new_index] if new['sample_types'] else ('', '')
+    base_total, base_functions = _pprof_function_totals(base, base_index)
+    new_total, new_functions = _pprof_function_totals(new, new_index)
+
+    changes = []
+    for name in set(base_functions) | set(new_functions):
+        base_flat = base_functions.get(name, {}).get('flat', 0)
+        new_flat = new_functions.get(name, {}).get('flat', 0)
+        if base_flat == new_flat:
+            continue
+        info = new_functions.get(name) or base_functions.get(name)
+        changes.append((new_flat - base_flat, base_flat, new_flat, name, info))
+    changes.sort(key=lambda change: abs(change[0]), reverse=True)
+
+    output = '> %s Profile (%s): %s -> %s total\n' % (
+        kind,
+        type_,
+        _format_sample_value(base_total, unit),
+        _format_sample_value(new_total, unit)
+    )
+    rows = []
+    for delta, base_flat, new_flat, name, info in changes[:PROFILE_TOP]:
+        change = '%+0.1f%%' % (delta * 100.0 / base_flat) if base_flat else 'new'
+        rows.append((
+            '%s:%d:' % (_relative_path(info['filename'], working_dir), info['line']),
+            _format_sample_value(base_flat, unit),
+            _format_sample_value(new_flat, unit),
+            ('+' if delta > 0 else '-') + _format_sample_value(abs(delta), unit),
+            change,
+            name
+        ))
+    if not rows:
+        return output + '>   No differences\n'
+    width = max([len(row[0]) for row in rows] + [8])
+    output += '%s %10s %10s %11s %8s  %s\n' % ('location'.ljust(width), 'base', 'new', 'delta', 'change', 'function')
+    for row in rows:
+        output += '%s %10s %10s %11s %8s  %s\n' % ((row[0].ljust(width),) + row[1:])
+    return output
+
+
+def _format_sample_value(value, unit):
+    """
+    Formats a profile sample value for display
+
+    :param value:
+        An integer of the value
+
+    :param unit:
+        A unicode string of the unit, e.g. "nanoseconds", "bytes" or "count"
+
+    :return:
+        A unicode string
+    """
+
+    if value == 0:
+        return '0'
+    if unit == 'nanoseconds':
+        if abs(value) >= 1000000000:
+            return '%0.2fs' % (value / 1000000000.0)
+        if abs(value) >= 1000000:
+            return '%0.2fms' % (value / 1000000.0)
+        return '%0.2fus' % (value / 1000.0)
+    if unit == 'bytes':
+        for suffix, size in (('GB', 1 << 30), ('MB', 1 << 20), ('kB', 1 << 10)):
+            if abs(value) >= size:
+                return '%0.2f%s' % (value / float(size), suffix)
+        return '%dB' % value
+    return '%d' % value
+
+
+def _percent(value, total):
+    """
+    :param value:
+        A number
+
+    :param total:
+        A number
+
+    :return:
+        A float of value as a percentage of total, or 0.0 if total is 0
+    """
+
+    if not total:
+        return 0.0
+    return value * 100.0 / total
+
+
+def _relative_path(path, working_dir):
+    """
+    Shortens a path to be relative to the working directory, if it is inside
+    of it, for display in the output panel
+
+    :param path:
+        A unicode string of the path
+
+    :param working_dir:
+        None or a unicode string of the working directory
+
+    :return:
+        A unicode string of the path
+    """
+
+    if working_dir and path.startswith(working_dir + os.sep):
+        return path[len(working_dir) + 1:]
+    return path
+
+
+def _read_file_uvarint(f):
+    """
+    Reads an unsigned varint, as written by Go's encoding/binary package, from
+    a file
+
+    :param f:
+        A file object opened in binary mode
+
+    :raises:
+        EOFError - when the end of the file is reached
+
+    :return:
+        An integer
+    """
+
+    value = 0
+    shift = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise EOFError()
+        byte = ord(byte)
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value
+        shift += 7
+
+
+def _trace_block_category(reason):
+    """
+    :param reason:
+        A unicode string of the reason the runtime gave for a goroutine
+        blocking, e.g. "chan receive" or "network"
+
+    :return:
+        None if the reason is not reported, otherwise a unicode string of
+        "network" or "sync"
+    """
+
+    if reason == 'network':
+        return 'network'
+    if 'chan' in reason or 'sync' in reason or 'select' in reason:
+        return 'sync'
+    return None
+
+
+def _format_trace_summary(reader, trace_path, working_dir):
+    """
+    Formats the summary of an execution trace
+
+    :param reader:
+        A GolangTraceReader() object that has read the trace
+
+    :param trace_path:
+        A unicode string of the path to the trace
+
+    :param working_dir:
+        A unicode string of the working directory
+
+    :return:
+        A unicode string of the report
+    """
+
+    def duration(ticks):
+        return _format_sample_value(int(ticks * reader.tick_ns), 'nanoseconds')
+
+    span = 0
+    if reader.first_ts is not None:
+        span = reader.last_ts - reader.first_ts
+    output = '> Trace: %s, %s traced, Go 1.%d format\n' % (trace_path, duration(span), reader.version)
+    output += '>   Goroutines: %d created, %d alive at peak\n' % (reader.created, reader.peak)
+
+    for category in ('syscall', 'network', 'sync'):
+        ticks, count = reader.blocked.get(category, [0, 0])
+        output += '>   Blocked on %s: %s in %d events\n' % (category, duration(ticks), count)
+
+    output += '>   GC: %d cycles, %s running' % (reader.gc_count, duration(reader.gc_ticks))
+    ticks, count, longest = reader.stw.get('gc', [0, 0, 0])
+    if count:
+        output += ', %s stopped the world in %d pauses, longest %s' % (duration(ticks), count, duration(longest))
+    output += '\n'
+
+    if reader.longest:
+        output += '> Longest blocking events:\n'
+        for ticks, _, event in sorted(reader.longest, key=lambda entry: -entry[0]):
+            description = '%s %s' % (duration(ticks), event['category'])
+            if event['category'] != 'syscall' and event['reason'] != event['category']:
+                description += ' (%s)' % event['reason']
+            if event['location']:
+                file_name, line, function = event['location']
+                output += '    %s:%s: %s in %s\n' % (file_name, line, description, function)
+            else:
+                output += '>   %s\n' % description
+
+    if reader.skipped:
+        output += '> %d batches with event types unknown to Golang Build were partially skipped\n' % reader.skipped
+    if reader.truncated:
+        output += '> The trace was truncated\n'
+    return output.rstrip('\n')
+
+
+def _parse_cover_profile(path):
+    """
+    Parses a coverage profile written by "go test -coverprofile", one line at a
+    time so that large profiles are never held in memory
+
+    :param path:
+        A unicode string of the path to the profile
+
+    :return:
+        A two-element tuple:
+         - [0] a dict with unicode string keys of file names and values of
+           a tuple of (start line, end line) tuples of the uncovered lines
+         - [1] a dict with unicode string keys of package import paths and
+           values of a (covered statements, total statements) tuple
+    """
+
+    # Blocks may be listed more than once when a package is covered by the
+    # tests of multiple packages, so they are keyed by position. The values
+    # are [number of statements, count].
+    files = {}
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.decode('utf-8', 'replace').strip()
+            if not line or line.startswith('mode:'):
+                continue
+            match = re.match('^(.+):(\\d+)\\.(\\d+),(\\d+)\\.(\\d+) (\\d+) (\\d+)$', line)
+            if not match:
+                continue
+            file_name = match.group(1)
+            position = tuple(int(match.group(i)) for i in range(2, 6))
+            statements = int(match.group(6))
+            count = int(match.group(7))
+            blocks = files.setdefault(file_name, {})
+            if position in blocks:
+                blocks[position][1] = max(blocks[position][1], count)
+            else:
+                blocks[position] = [statements, count]
+
+    index = {}
+    packages = {}
+    for file_name in files:
+        package = file_name.rsplit('/', 1)[0]
+        covered, total = packages.get(package, (0, 0))
+        uncovered = []
+        for position in sorted(files[file_name]):
+            statements, count = files[file_name][position]
+            total += statements
+            if count > 0:
+                covered += statements
+                continue
+            start, end = position[0], position[2]
+            if uncovered and start <= uncovered[-1][1] + 1:
+                uncovered[-1] = (uncovered[-1][0], max(end, uncovered[-1][1]))
+            else:
+                uncovered.append((start, end))
+        packages[package] = (covered, total)
+        index[file_name] = tuple(uncovered)
+
+    return index, packages
+
+
+def _coverage_file_paths(index, go_bin, working_dir, env):
+    """
+    Changes the keys of a coverage index from the import path based file names
+    of the profile to the paths of the files. In module mode the import path
+    of a package does not have to match the directory it is in, so the
+    directories are found via "go list".
+
+    RUNS IN A THREAD
+
+    :param index:
+        A dict from _parse_cover_profile()
+
+    :param go_bin:
+        A unicode string of the path to the "go" executable
+
+    :param working_dir:
+        A unicode string of the working directory of the tests
+
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2)
+        of the environment variables of the tests
+
+    :return:
+        A dict with unicode string keys of file paths, using "/" as the
+        separator, and the same values as the index. File names of packages
+        that could not be found are kept as-is.
+    """
+
+    packages = sorted(set(file_name.rsplit('/', 1)[0] for file_name in index if '/' in file_name))
+    if not packages:
+        return index
+
+    dirs = {}
+    args = [go_bin, 'list', '-e', '-f', '{{.ImportPath}}\t{{.Dir}}'] + packages
+    returncode, stdout, _ = _run_capture(args, working_dir, env)
+    if returncode == 0:
+        for line in stdout.splitlines():
+            import_path, _, directory = line.partition('\t')
+            if directory.strip():
+                dirs[import_path] = directory.strip().replace('\\', '/')
+
+    result = {}
+    for file_name in index:
+        package, _, basename = file_name.rpartition('/')
+        if package in dirs:
+            result[dirs[package] + '/' + basename] = index[file_name]
+        else:
+            result[file_name] = index[file_name]
+    return result
+
+
+def _coverage_basenames(index):
+    """
+    Groups the file names in a coverage index by basename, to speed up
+    matching them to the paths of open files
+
+    :param index:
+        A dict from _parse_cover_profile()
+
+    :return:
+        A dict with unicode string keys of basenames and values of a list of
+        unicode string file names from the index
+    """
+
+    basenames = {}
+    for file_name in index:
+        basenames.setdefault(file_name.rsplit('/', 1)[-1], []).append(file_name)
+    return basenames
+
+
+def _annotate_coverage(file_names):
+    """
+    Updates the coverage regions of every open view of the files specified.
+    Must be run in the UI thread.
+
+    :param file_names:
+        A set of unicode strings of the coverage profile file names whose
+        coverage changed
+    """
+
+    index = _COVERAGE
+    basenames = _coverage_basenames(file_names)
+    for window in sublime.windows():
+        for view in window.views():
+            if view.file_name():
+                _annotate_coverage_view(view, index, basenames)
+
+
+def _annotate_coverage_view(view, index, basenames):
+    """
+    Marks the uncovered lines of a view, or clears them if the file is no
+    longer in the coverage index. Must be run in the UI thread.
+
+    :param view:
+        The sublime.View object to annotate
+
+    :param index:
+        A dict from _parse_cover_profile()
+
+    :param basenames:
+        A dict from _coverage_basenames() of the file names to consider
+    """
+
+    view_path = view.file_name().replace('\\', '/')
+    for file_name in basenames.get(view_path.rsplit('/', 1)[-1], []):
+        if view_path != file_name and not view_path.endswith('/' + file_name):
+            continue
+
+        regions = []
+        for start, end in index.get(file_name, ()):
+            for line in range(start, end + 1):
+                regions.append(view.line(view.text_point(line - 1, 0)))
+
+        if not regions:
+            view.erase_regions('golang_build_coverage')
+            return
+
+        flags = getattr(sublime, 'DRAW_NO_FILL', 0) | getattr(sublime, 'DRAW_NO_OUTLINE', 0)
+        if not flags:
+            flags = sublime.DRAW_OUTLINED
+        view.add_regions('golang_build_coverage', regions, 'markup.deleted.diff', 'dot', flags)
+        return
+
+
+def _package_test_functions(package_dir):
+    """
+    Lists the test functions of every _test.go file in a package directory,
+    using the cached index for files that have not been modified since they
+    were indexed
+
+    :param package_dir:
+        A unicode string of the directory of the package
+
+    :return:
+        A dict with unicode string keys of file paths and values of a list of
+        dicts from _find_test_functions()
+    """
+
+    try:
+        entries = os.listdir(package_dir)
+    except (OSError):
+        _TEST_INDEX.pop(package_dir, None)
+        return {}
+
+    previous = _TEST_INDEX.get(package_dir, {})
+    files = {}
+    for entry in entries:
+        if not entry.endswith('_test.go'):
+            continue
+        file_name = os.path.join(package_dir, entry)
+        try:
+            mtime = os.path.getmtime(file_name)
+            cached = previous.get(file_name)
+            if cached and cached[0] == mtime:
+                files[file_name] = cached
+                continue
+            with open(file_name, 'rb') as f:
+                functions = _find_test_functions(f.read().decode('utf-8', 'replace'))
+        except (IOError, OSError):
+            continue
+        files[file_name] = (mtime, functions)
+    # Files that were removed are dropped along with the rest of the old index
+    _TEST_INDEX[package_dir] = files
+
+    return dict((file_name, files[file_name][1]) for file_name in files)
+
+
+def _find_test_functions(source):
+    """
+    Finds the top-level Test, Benchmark, Fuzz and Example functions in Go
+    source code
+
+    :param source:
+        A unicode string of the contents of a _test.go file
+
+    :return:
+        A list of dicts, in source order, with the keys:
+         - "kind": a unicode string of "Test", "Benchmark", "Fuzz" or "Example"
+         - "name": a unicode string of the function name
+         - "start": an integer of the 1-based line the function starts on
+         - "end": an integer of the 1-based line the function ends on
+    """
+
+    functions = []
+    lines = source.splitlines()
+    for index, line in enumerate(lines):
+        match = re.match('^func\\s+((Test|Benchmark|Fuzz|Example)(\\w*))\\s*\\(', line)
+        if functions and functions[-1]['end'] is None and line.startswith('}'):
+            functions[-1]['end'] = index + 1
+        if not match:
+            continue
+        # As with the go tool, TestMain and names such as Testing are not tests
+        suffix = match.group(3)
+        if match.group(1) == 'TestMain' or (suffix and suffix[0].islower()):
+            continue
+        if functions and functions[-1]['end'] is None:
+            functions[-1]['end'] = index
+        functions.append({
+            'kind': match.group(2),
+            'name': match.group(1),
+            'start': index + 1,
+            'end': index + 1 if line.rstrip().endswith('}') else None,
+        })
+    if functions and functions[-1]['end'] is None:
+        functions[-1]['end'] = len(lines)
+    return functions
+
+
+def _scaling_cpu_counts(max_cpu):
+    """
+    Lists the GOMAXPROCS values to run benchmarks with for the
+    "benchmark_scaling" task
+
+    :param max_cpu:
+        An integer of the largest GOMAXPROCS value
+
+    :return:
+        A list of integers: the powers of two below max_cpu, plus max_cpu
+    """
+
+    counts = []
+    count = 1
+    while count < max_cpu:
+        counts.append(count)
+        count *= 2
+    counts.append(max_cpu)
+    return counts
+
+
+def _benchmark_cpu_counts(args, env):
+    """
+    Determines the GOMAXPROCS values a "go test" process runs benchmarks with
+
+    :param args:
+        A list of strings of the process path and any arguments
+
+    :param env:
+        A dict of the env of the process
+
+    :return:
+        None if the values are not known, otherwise a list of integers from
+        the -cpu flag, or of the GOMAXPROCS environment variable
+    """
+
+    value = None
+    for i, arg in enumerate(args):
+        if arg in ('-cpu', '-test.cpu') and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith('-cpu=') or arg.startswith('-test.cpu='):
+            value = arg.split('=', 1)[1]
+    if value is None:
+        value = _get_env(env, 'GOMAXPROCS')
+    if not value:
+        return None
+
+    try:
+        return [int(part) for part in value.split(',')]
+    except (ValueError):
+        return None
+
+
+def _parse_benchmark_line(line):
+    """
+    Parses a benchmark result line printed by "go test -bench"
+
+    :param line:
+        A unicode string of a line of output, such as
+        "BenchmarkX-8   1000   1234 ns/op   64 B/op   2 allocs/op"
+
+    :return:
+        None if the line is not a benchmark result, otherwise a three-element
+        tuple of (unicode string name including any -N suffix, integer
+        iterations, dict of unicode string unit to float value)
+    """
+
+    match = re.match('^(Benchmark\\S*)\\s+(\\d+)\\s+(.+)$', line.strip())
+    if not match:
+        return None
+
+    metrics = {}
+    for value, unit in re.findall('([0-9.]+(?:[eE][-+]?[0-9]+)?)\\s+(\\S+)', match.group(3)):
+        try:
+            metrics[unit] = float(value)
+        except (ValueError):
+            pass
+    if not metrics:
+        return None
+    return (match.group(1), int(match.group(2)), metrics)
+
+
+def _split_benchmark_procs(name, cpu_counts=None):
+    """
+    Splits the GOMAXPROCS suffix from a benchmark name. The go tool only adds
+    the suffix when GOMAXPROCS is not 1.
+
+    :param name:
+        A unicode string of a benchmark name, such as "BenchmarkX/size-10-8"
+
+    :param cpu_counts:
+        None, or a list of the integer GOMAXPROCS values passed via -cpu. When
+        provided, only those values are treated as a suffix, which avoids
+        mistaking the end of a sub-benchmark name for one.
+
+    :return:
+        A two-element tuple of (unicode string name, integer GOMAXPROCS)
+    """
+
+    match = re.match('^(.+)-(\\d+)$', name)
+    if not match:
+        return (name, 1)
+    procs = int(match.group(2))
+    if procs == 1 or (cpu_counts is not None and procs not in cpu_counts):
+        return (name, 1)
+    return (match.group(1), procs)
+
+
+def _format_scaling_table(names, results, cpu_counts):
+    """
+    Formats the speedup and parallel efficiency of benchmarks run with a list
+    of GOMAXPROCS values. Rows where adding CPUs gained less than 10% are
+    flagged as a plateau, and rows that got more than 5% slower are flagged as
+    slower.
+
+    :param names:
+        A list of unicode string benchmark names, in display order
+
+    :param results:
+        A dict with (name, GOMAXPROCS) tuple keys and values of a list of
+        float ns/op results
+
+    :param cpu_counts:
+        A list of the integer GOMAXPROCS values
+
+    :return:
+        A unicode string of the table
+    """
+
+    rows = [('Benchmark', 'CPUs', 'ns/op', 'Speedup', 'Efficiency', '')]
+    flagged = 0
+    for name in names:
+        base = None
+        previous = None
+        first = True
+        for procs in cpu_counts:
+            values = results.get((name, procs))
+            if not values:
+                continue
+            ns_op = sum(values) / len(values)
+            if base is None:
+                base = (procs, ns_op)
+            speedup = base[1] / ns_op if ns_op else 0.0
+            efficiency = speedup * base[0] / procs
+
+            note = ''
+            if previous is not None and ns_op:
+                step = previous / ns_op
+                if step < 0.95:
+                    note = 'slower'
+                elif step < 1.1:
+                    note = 'plateau'
+            if note:
+                flagged += 1
+            previous = ns_op
+
+            rows.append((
+                name if first else '',
+                '%d' % procs,
+                '%0.2f' % ns_op,
+                '%0.2fx' % speedup,
+                '%0.1f%%' % (efficiency * 100),
+                note
+            ))
+            first = False
+
+    widths = [max(len(row[column]) for row in rows) for column in range(5)]
+    output = '> Scaling:\n'
+    for row in rows:
+        output += ('>   %s  %s  %s  %s  %s  %s' % (
+            row[0].ljust(widths[0]),
+            row[1].rjust(widths[1]),
+            row[2].rjust(widths[2]),
+            row[3].rjust(widths[3]),
+            row[4].rjust(widths[4]),
+            row[5]
+        )).rstrip() + '\n'
+    output += '> %d rows where throughput plateaued or fell as CPUs were added' % flagged
+    return output
+
+
+def _benchmark_budget(budgets, name):
+    """
+    Finds the budget for a benchmark
+
+    :param budgets:
+        A dict from the "benchmark:budgets" setting
+
+    :param name:
+        A unicode string of the benchmark name, without a GOMAXPROCS suffix
+
+    :return:
+        None, or a dict of the budget. A key that equals the name is used
+        before any key that is a matching regular expression.
+    """
+
+    if isinstance(budgets.get(name), dict):
+        return budgets[name]
+    for pattern in sorted(budgets):
+        try:
+            matched = re.match('^(?:%s)$' % pattern, name)
+        except (re.error):
+            continue
+        if matched and isinstance(budgets[pattern], dict):
+            return budgets[pattern]
+    return None
+
+
+def _check_benchmark_budgets(budgets, averages, baseline):
+    """
+    Checks the average results of benchmarks against their budgets
+
+    :param budgets:
+        A dict from the "benchmark:budgets" setting
+
+    :param averages:
+        A dict with unicode string benchmark name keys and values of a dict
+        of unicode string units to float averages
+
+    :param baseline:
+        A dict in the same format as averages, of the baseline results
+
+    :return:
+        A list of four-element tuples of unicode strings: the benchmark name,
+        unit, result and a description of the budget that was exceeded
+    """
+
+    violations = []
+    for name in sorted(averages):
+        budget = _benchmark_budget(budgets, name)
+        if budget is None:
+            continue
+        for unit in sorted(averages[name]):
+            value = averages[name][unit]
+            limit = budget.get(unit)
+            if isinstance(limit, (int, float)) and value > limit:
+                violations.append((
+                    name,
+                    unit,
+                    '%0.2f' % value,
+                    'max %s (%+0.1f%%)' % (limit, (value - limit) / limit * 100 if limit else 0.0)
+                ))
+
+            max_change = budget.get('max_change')
+            base_value = baseline.get(name, {}).get(unit)
+            if unit not in ('ns/op', 'B/op', 'allocs/op') or not isinstance(max_change, (int, float)) or not base_value:
+                continue
+            change = (value - base_value) / base_value * 100
+            if change > max_change:
+                violations.append((
+                    name,
+                    unit,
+                    '%0.2f' % value,
+                    'max %+0.1f%% of baseline %0.2f (%+0.1f%%)' % (max_change, base_value, change)
+                ))
+    return violations
+
+
+def _format_benchmark_comparison(revision, rounds, samples):
+    """
+    Formats a comparison of the benchmark results of a base revision and the
+    working tree. A change is only shown when the Mann-Whitney U test finds it
+    significant at p < 0.05.
+
+    :param revision:
+        A unicode string of the base git revision
+
+    :param rounds:
+        An integer of the number of rounds that were run
+
+    :param samples:
+        A dict with two-element tuple keys of a unicode string benchmark name
+        and unit, and values of a dict with the keys "base" and "new" and
+        values of a list of floats
+
+    :return:
+        A unicode string of the comparison
+    """
+
+    units = ['ns/op', 'B/op', 'allocs/op']
+    for name, unit in samples:
+        if unit not in units:
+            units.append(unit)
+
+    rows = [('Benchmark', 'Unit', 'Base', 'New', 'Delta', '')]
+    for name, unit in sorted(samples, key=lambda key: (key[0], units.index(key[1]))):
+        base = samples[(name, unit)]['base']
+        new = samples[(name, unit)]['new']
+        if not base or not new:
+            continue
+        base_median = _median(base)
+        new_median = _median(new)
+        p_value = _mann_whitney_u(base, new)
+        if p_value < 0.05 and base_median:
+            delta = '%+0.2f%%' % ((new_median - base_median) / base_median * 100)
+        else:
+            delta = '~'
+        rows.append((
+            name,
+            unit,
+            _format_median(base, base_median),
+            _format_median(new, new_median),
+            delta,
+            'p=%0.3f n=%d+%d' % (p_value, len(base), len(new))
+        ))
+
+    if len(rows) == 1:
+        return '> No benchmark results to compare'
+
+    widths = [max(len(row[column]) for row in rows) for column in range(5)]
+    output = '> Comparison of %s (base) and the working tree (new), %d rounds:\n' % (revision, rounds)
+    for row in rows:
+        output += ('>   %s  %s  %s  %s  %s  %s' % (
+            row[0].ljust(widths[0]),
+            row[1].ljust(widths[1]),
+            row[2].rjust(widths[2]),
+            row[3].rjust(widths[3]),
+            row[4].rjust(widths[4]),
+            row[5]
+        )).rstrip() + '\n'
+    return output.rstrip('\n')
+
+
+def _median(values):
+    """
+    :param values:
+        A non-empty list of numbers
+
+    :return:
+        A float of the median of the values
+    """
+
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return float(ordered[middle])
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def _format_median(values, median):
+    """
+    Formats a median with the largest deviation from it as a percentage
+
+    :param values:
+        A list of floats
+
+    :param median:
+        A float of the median of the values
+
+    :return:
+        A unicode string such as "1234.00 ± 3%"
+    """
+
+    if not median:
+        return '%0.2f' % median
+    spread = max(abs(value - median) for value in values) / median * 100
+    return '%0.2f \u00b1 %d%%' % (median, round(spread))
+
+
+def _mann_whitney_u(a, b):
+    """
+    Performs a two-sided Mann-Whitney U test. The exact distribution of U is
+    used for small samples without ties, otherwise the normal approximation
+    with a tie correction is used.
+
+    :param a:
+        A non-empty list of floats
+
+    :param b:
+        A non-empty list of floats
+
+    :return:
+        A float of the p-value
+    """
+
+    n1 = len(a)
+    n2 = len(b)
+    combined = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+
+    # Assign average ranks to tied values
+    rank_sum = 0.0
+    tie_sizes = []
+    index = 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        rank = (index + end) / 2.0 + 1
+        for position in range(index, end + 1):
+            if combined[position][1] == 0:
+                rank_sum += rank
+        tie_sizes.append(end - index + 1)
+        index = end + 1
+
+    u1 = rank_sum - n1 * (n1 + 1) / 2.0
+    u = min(u1, n1 * n2 - u1)
+    has_ties = [size for size in tie_sizes if size > 1]
+
+    if not has_ties and n1 + n2 <= 40:
+        counts = _mann_whitney_counts(n1, n2)
+        below = sum(counts[:int(u) + 1])
+        return min(1.0, 2.0 * below / sum(counts))
+
+    n = n1 + n2
+    tie_term = sum(size ** 3 - size for size in tie_sizes) / float(n * (n - 1))
+    sigma = (n1 * n2 / 12.0 * ((n + 1) - tie_term)) ** 0.5
+    if sigma == 0:
+        return 1.0
+    z = max(abs(u1 - n1 * n2 / 2.0) - 0.5, 0.0) / sigma
+    return min(1.0, _erfc(z / 2 ** 0.5))
+
+
+def _mann_whitney_counts(n1, n2):
+    """
+    Counts the orderings of two samples that produce each value of U
+
+    :param n1:
+        An integer of the size of the first sample
+
+    :param n2:
+        An integer of the size of the second sample
+
+    :return:
+        A list of integers, indexed by U, of the number of orderings
+    """
+
+    # table[j] holds the counts for samples of size (i, j) as i increases
+    table = [[1] for j in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        new_table = [[1]]
+        for j in range(1, n2 + 1):
+            # The largest value comes from the first sample, adding j to U,
+            # or from the second sample, adding nothing
+            from_first = [0] * j + table[j]
+            from_second = new_table[j - 1]
+            length = max(len(from_first), len(from_second))
+            combined = []
+            for u in range(length):
+                combined.append(
+                    (from_first[u] if u < len(from_first) else 0) +
+                    (from_second[u] if u < len(from_second) else 0)
+                )
+            new_table.append(combined)
+        table = new_table
+    return table[n2]
+
+
+def _erfc(x):
+    """
+    The complementary error function, since math.erfc() is not available on
+    Python 2.6. Accurate to 1.2e-7.
+
+    :param x:
+        A float
+
+    :return:
+        A float of erfc(x)
+    """
+
+    z = abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    r = t * math.exp(
+        -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+            -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+                -0.82215223 + t * 0.17087277))))))))
+    )
+    if x >= 0:
+        return r
+    return 2.0 - r
+
+
+def _parse_race_report(block):
+    """
+    Parses a data race report from the race detector
+
+    :param block:
+        A list of unicode string lines between the "==================" lines
+
+    :return:
+        A list of two-element tuples of (unicode string title, list of
+        three-element tuples of (unicode string function, unicode string file
+        path, unicode string line number)). Addresses and goroutine numbers
+        are removed from titles.
+    """
+
+    sections = []
+    function = None
+    for line in block:
+        stripped = line.strip()
+        if not stripped or stripped == 'WARNING: DATA RACE':
+            continue
+        if not line.startswith(' ') and stripped.endswith(':'):
+            title = re.sub(' at 0x[0-9a-f]+', '', stripped[:-1])
+            title = re.sub('oroutine \\d+', 'oroutine', title)
+            sections.append((title, []))
+            function = None
+            continue
+        if not sections:
+            continue
+        match = re.match('^(.+):(\\d+)(?: \\+0x[0-9a-f]+)?$', stripped)
+        if match and function is not None:
+            sections[-1][1].append((function, match.group(1), match.group(2)))
+            function = None
+        else:
+            function = stripped
+    return sections
+
+
+def _percentile(ordered, percent):
+    """
+    :param ordered:
+        A non-empty sorted list of numbers
+
+    :param percent:
+        A number from 0 to 100
+
+    :return:
+        The value at the percentile, using the nearest rank
+    """
+
+    index = int(math.ceil(percent / 100.0 * len(ordered))) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def _get_env(env, name):
+    """
+    Reads an environment variable from an env dict for a subprocess
+
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2)
+
+    :param name:
+        A unicode string of the variable name
+
+    :return:
+        None or a unicode string of the value
+    """
+
+    if sys.version_info < (3,):
+        value = env.get(name.encode('ascii'))
+        return value.decode('utf-8') if value is not None else None
+    return env.get(name)
+
+
+def _set_env(env, name, value):
+    """
+    Sets an environment variable in an env dict for a subprocess
+
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2)
+
+    :param name:
+        A unicode string of the variable name
+
+    :param value:
+        A unicode string of the value
+    """
+
+    if sys.version_info < (3,):
+        env[name.encode('ascii')] = value.encode('utf-8')
+    else:
+        env[name] = value
+
+
+def _binary_size_enabled(window):
+    """
+    Checks if the size of executables should be reported after a build
+
+    :param window:
+        A sublime.Window object
+
+    :return:
+        A boolean - if the "binary_size:report" setting is not false
+    """
+
+    enabled, _ = golangconfig.setting_value(
+        'binary_size:report',
+        view=window.active_view(),
+        window=window
+    )
+    return enabled is not False
+
+
+def _read_symbol_sizes(path):
+    """
+    Reads the symbols of an ELF, Mach-O or PE executable, along with the
+    number of bytes each occupies in the file. Symbols in sections that take
+    no space in the file, such as .bss, are skipped.
+
+    :param path:
+        A unicode string of the path to the executable
+
+    :return:
+        A list of two-element tuples of (unicode string symbol name, integer
+        size). An empty list is returned if the executable has no symbol
+        table, such as when built with -ldflags=-s.
+
+    :raises:
+        ValueError - when the file is not an executable format that is
+        understood
+    """
+
+    with open(path, 'rb') as f:
+        magic = bytearray(f.read(4))
+        f.seek(0)
+        if magic == bytearray(b'\x7fELF'):
+            return _read_elf_symbols(f)
+        if magic[:2] == bytearray(b'MZ'):
+            return _read_pe_symbols(f)
+        if magic in (bytearray(b'\xcf\xfa\xed\xfe'), bytearray(b'\xce\xfa\xed\xfe'),
+                     bytearray(b'\xfe\xed\xfa\xcf'), bytearray(b'\xfe\xed\xfa\xce')):
+            return _read_macho_symbols(f)
+    raise ValueError('%s is not an ELF, Mach-O or PE executable' % path)
+
+
+def _read_at(f, offset, length):
+    """
+    Reads a range of bytes from a file
+
+    :param f:
+        A file object opened in binary mode
+
+    :param offset:
+        An integer of the offset to read from
+
+    :param length:
+        An integer of the number of bytes to read
+
+    :return:
+        A bytearray
+
+    :raises:
+        ValueError - when the file ends before the range does
+    """
+
+    f.seek(offset)
+    data = bytearray(f.read(length))
+    if len(data) != length:
+        raise ValueError('The executable is truncated')
+    return data
+
+
+def _unpack_uint(data, offset, length, little_endian):
+    """
+    Decodes an unsigned integer
+
+    :param data:
+        A bytearray
+
+    :param offset:
+        An integer of the offset of the integer in data
+
+    :param length:
+        An integer of the number of bytes in the integer
+
+    :param little_endian:
+        A boolean - if the integer is little endian
+
+    :return:
+        An integer
+    """
+
+    value = 0
+    indexes = range(length - 1, -1, -1) if little_endian else range(length)
+    for index in indexes:
+        value = (value << 8) | data[offset + index]
+    return value
+
+
+def _c_string(data, offset):
+    """
+    Decodes a null-terminated string
+
+    :param data:
+        A bytearray
+
+    :param offset:
+        An integer of the offset the string starts at
+
+    :return:
+        A unicode string
+    """
+
+    end = data.find(b'\x00', offset)
+    if end == -1:
+        end = len(data)
+    return data[offset:end].decode('utf-8', 'replace')
+
+
+def _sizes_from_addresses(symbols, section_ends):
+    """
+    Computes the size of symbols from the distance to the next symbol, for
+    formats that do not record symbol sizes
+
+    :param symbols:
+        A list of three-element tuples of (unicode string name, integer
+        section number, integer address)
+
+    :param section_ends:
+        A dict with integer section number keys and values of the integer
+        address of the end of the section
+
+    :return:
+        A list of two-element tuples of (unicode string name, integer size)
+    """
+
+    result = []
+    ordered = sorted(symbols, key=lambda symbol: (symbol[1], symbol[2]))
+    for index, (name, section, address) in enumerate(ordered):
+        if index + 1 < len(ordered) and ordered[index + 1][1] == section:
+            end = ordered[index + 1][2]
+        else:
+            end = section_ends[section]
+        result.append((name, max(end - address, 0)))
+    return result
+
+
+def _read_elf_symbols(f):
+    """
+    Reads the symbols from the .symtab section of an ELF file
+
+    :param f:
+        A file object opened in binary mode
+
+    :return:
+        A list of two-element tuples of (unicode string name, integer size)
+    """
+
+    header = _read_at(f, 0, 64)
+    is_64 = header[4] == 2
+    little = header[5] == 1
+
+    if is_64:
+        shoff = _unpack_uint(header, 0x28, 8, little)
+        shentsize = _unpack_uint(header, 0x3a, 2, little)
+        shnum = _unpack_uint(header, 0x3c, 2, little)
+    else:
+        shoff = _unpack_uint(header, 0x20, 4, little)
+        shentsize = _unpack_uint(header, 0x2e, 2, little)
+        shnum = _unpack_uint(header, 0x30, 2, little)
+
+    table = _read_at(f, shoff, shentsize * shnum)
+    sections = []
+    for index in range(shnum):
+        base = index * shentsize
+        if is_64:
+            sections.append({
+                'type': _unpack_uint(table, base + 4, 4, little),
+                'offset': _unpack_uint(table, base + 24, 8, little),
+                'size': _unpack_uint(table, base + 32, 8, little),
+                'link': _unpack_uint(table, base + 40, 4, little),
+            })
+        else:
+            sections.append({
+                'type': _unpack_uint(table, base + 4, 4, little),
+                'offset': _unpack_uint(table, base + 16, 4, little),
+                'size': _unpack_uint(table, base + 20, 4, little),
+                'link': _unpack_uint(table, base + 24, 4, little),
+            })
+
+    # SHT_SYMTAB
+    symtabs = [section for section in sections if section['type'] == 2]
+    if not symtabs:
+        return []
+    symtab = symtabs[0]
+    strtab = sections[symtab['link']]
+    strings = _read_at(f, strtab['offset'], strtab['size'])
+    entries = _read_at(f, symtab['offset'], symtab['size'])
+
+    entry_size = 24 if is_64 else 16
+    result = []
+    for base in range(0, len(entries) - entry_size + 1, entry_size):
+        name_offset = _unpack_uint(entries, base, 4, little)
+        if is_64:
+            info = entries[base + 4]
+            shndx = _unpack_uint(entries, base + 6, 2, little)
+            size = _unpack_uint(entries, base + 16, 8, little)
+        else:
+            size = _unpack_uint(entries, base + 8, 4, little)
+            info = entries[base + 12]
+            shndx = _unpack_uint(entries, base + 14, 2, little)
+        # Skip undefined, absolute and common symbols, and symbols that
+        # describe sections or files
+        if shndx == 0 or shndx >= 0xff00 or (info & 0xf) in (3, 4) or not size:
+            continue
+        # SHT_NOBITS sections take no space in the file
+        if shndx < len(sections) and sections[shndx]['type'] == 8:
+            continue
+        result.append((_c_string(strings, name_offset), size))
+    return result
+
+
+def _read_macho_symbols(f):
+    """
+    Reads the symbols from the LC_SYMTAB load command of a Mach-O file
+
+    :param f:
+        A file object opened in binary mode
+
+    :return:
+        A list of two-element tuples of (unicode string name, integer size)
+    """
+
+    header = _read_at(f, 0, 32)
+    little = header[0] in (0xcf, 0xce)
+    is_64 = header[0] == 0xcf or header[3] == 0xcf
+    ncmds = _unpack_uint(header, 16, 4, little)
+    sizeofcmds = _unpack_uint(header, 20, 4, little)
+    commands = _read_at(f, 32 if is_64 else 28, sizeofcmds)
+
+    # Section numbers are 1-based across every segment
+    section_ends = {}
+    zerofill = set()
+    symtab = None
+    offset = 0
+    for _ in range(ncmds):
+        cmd = _unpack_uint(commands, offset, 4, little)
+        cmdsize = _unpack_uint(commands, offset + 4, 4, little)
+        if cmd in (0x1, 0x19):
+            # LC_SEGMENT and LC_SEGMENT_64
+            wide = cmd == 0x19
+            nsects = _unpack_uint(commands, offset + (64 if wide else 48), 4, little)
+            section = offset + (72 if wide else 56)
+            for _ in range(nsects):
+                number = len(section_ends) + 1
+                if wide:
+                    addr = _unpack_uint(commands, section + 32, 8, little)
+                    size = _unpack_uint(commands, section + 40, 8, little)
+                    flags = _unpack_uint(commands, section + 64, 4, little)
+                    section += 80
+                else:
+                    addr = _unpack_uint(commands, section + 32, 4, little)
+                    size = _unpack_uint(commands, section + 36, 4, little)
+                    flags = _unpack_uint(commands, section + 56, 4, little)
+                    section += 68
+                section_ends[number] = addr + size
+                # S_ZEROFILL, S_GB_ZEROFILL and S_THREAD_LOCAL_ZEROFILL
+                if flags & 0xff in (0x1, 0xc, 0x12):
+                    zerofill.add(number)
+        elif cmd == 0x2:
+            # LC_SYMTAB
+            symtab = (
+                _unpack_uint(commands, offset + 8, 4, little),
+                _unpack_uint(commands, offset + 12, 4, little),
+                _unpack_uint(commands, offset + 16, 4, little),
+                _unpack_uint(commands, offset + 20, 4, little),
+            )
+        offset += cmdsize
+
+    if symtab is None:
+        return []
+    symoff, nsyms, stroff, strsize = symtab
+    entry_size = 16 if is_64 else 12
+    entries = _read_at(f, symoff, nsyms * entry_size)
+    strings = _read_at(f, stroff, strsize)
+
+    symbols = []
+    for base in range(0, len(entries), entry_size):
+        n_type = entries[base + 4]
+        n_sect = entries[base + 5]
+        # Skip debugging entries, and symbols not defined in a section
+        if n_type & 0xe0 or n_type & 0x0e != 0x0e or n_sect not in section_ends or n_sect in zerofill:
+            continue
+        name = _c_string(strings, _unpack_uint(entries, base, 4, little))
+        # Mach-O prefixes C-level names with an underscore
+        if name.startswith('_'):
+            name = name[1:]
+        symbols.append((name, n_sect, _unpack_uint(entries, base + 8, 8 if is_64 else 4, little)))
+    return _sizes_from_addresses(symbols, section_ends)
+
+
+def _read_pe_symbols(f):
+    """
+    Reads the symbols from the COFF symbol table of a PE file
+
+    :param f:
+        A file object opened in binary mode
+
+    :return:
+        A list of two-element tuples of (unicode string name, integer size)
+    """
+
+    pe_offset = _unpack_uint(_read_at(f, 0x3c, 4), 0, 4, True)
+    coff = _read_at(f, pe_offset, 24)
+    if coff[:4] != bytearray(b'PE\x00\x00'):
+        raise ValueError('The executable is not a valid PE file')
+    nsections = _unpack_uint(coff, 6, 2, True)
+    symoff = _unpack_uint(coff, 12, 4, True)
+    nsyms = _unpack_uint(coff, 16, 4, True)
+    optional_size = _unpack_uint(coff, 20, 2, True)
+    if not symoff or not nsyms:
+        return []
+
+    table = _read_at(f, pe_offset + 24 + optional_size, nsections * 40)
+    section_ends = {}
+    uninitialized = set()
+    for index in range(nsections):
+        base = index * 40
+        section_ends[index + 1] = _unpack_uint(table, base + 8, 4, True)
+        # IMAGE_SCN_CNT_UNINITIALIZED_DATA
+        if _unpack_uint(table, base + 36, 4, True) & 0x80:
+            uninitialized.add(index + 1)
+
+    entries = _read_at(f, symoff, nsyms * 18)
+    string_size = _unpack_uint(_read_at(f, symoff + nsyms * 18, 4), 0, 4, True)
+    strings = _read_at(f, symoff + nsyms * 18, max(string_size, 4))
+
+    symbols = []
+    index = 0
+    while index < nsyms:
+        base = index * 18
+        if entries[base:base + 4] == bytearray(4):
+            name = _c_string(strings, _unpack_uint(entries, base + 4, 4, True))
+        else:
+            name = _c_string(entries[base:base + 8] + bytearray(1), 0)
+        value = _unpack_uint(entries, base + 8, 4, True)
+        section = _unpack_uint(entries, base + 12, 2, True)
+        storage_class = entries[base + 16]
+        index += 1 + entries[base + 17]
+        # Only external and static symbols in real sections are counted,
+        # skipping the section symbols that start each section
+        if section not in section_ends or section in uninitialized or storage_class not in (2, 3):
+            continue
+        if storage_class == 3 and value == 0 and name.startswith('.'):
+            continue
+        symbols.append((name, section, value))
+    return _sizes_from_addresses(symbols, section_ends)
+
+
+def _symbol_package(name):
+    """
+    Determines the Go package a symbol belongs to
+
+    :param name:
+        A unicode string of the symbol name, such as
+        "net/http.(*Server).Serve" or "type:*encoding/json.Decoder"
+
+    :return:
+        A unicode string of the package import path, or a description in
+        parentheses for symbols that do not belong to a package
+    """
+
+    is_type = False
+    for prefix in ('type:', 'type.', 'go:itab.', 'go.itab.'):
+        if name.startswith(prefix) and len(name) > len(prefix):
+            name = name[len(prefix):].lstrip('*[]0123456789')
+            is_type = True
+            break
+    else:
+        if name.startswith('go:') or name.startswith('go.'):
+            return '(linker data)'
+
+    end = len(name)
+    for char in '([':
+        position = name.find(char)
+        if position != -1:
+            end = min(end, position)
+    slash = name.rfind('/', 0, end)
+    dot = name.find('.', slash + 1)
+    if dot <= 0 or name[0] in '._':
+        return '(types)' if is_type else '(C and other)'
+    # C compilers add suffixes such as ".part.0" and ".1234" to local symbols
+    if re.match('^[A-Za-z_]\\w*\\.([0-9]|(part|constprop|isra|cold|lto_priv|localalias)(\\.|$))', name):
+        return '(C and other)'
+    # The linker escapes dots in the last element of an import path
+    return name[:dot].replace('%2e', '.')
+
+
+def _binary_size_report(path, history_key, working_dir):
+    """
+    Attributes the size of an executable to Go packages, and records the
+    sizes so the next build of the same target may be compared
+
+    :param path:
+        A unicode string of the path to the executable
+
+    :param history_key:
+        A unicode string of the key the sizes of the target are stored under
+
+    :param working_dir:
+        A unicode string of the directory paths are displayed relative to
+
+    :return:
+        A unicode string of the report
+    """
+
+    try:
+        file_size = os.path.getsize(path)
+        symbols = _read_symbol_sizes(path)
+    except (OSError, IOError, ValueError, IndexError) as e:
+        return '> Binary size: %s could not be read - %s' % (_relative_path(path, working_dir), str_cls(e))
+
+    packages = {}
+    for name, size in symbols:
+        package = _symbol_package(name)
+        packages[package] = packages.get(package, 0) + size
+    attributed = sum(packages.values())
+    if symbols:
+        packages['(headers and unattributed)'] = max(file_size - attributed, 0)
+
+    sizes_path = _storage_path('binary_sizes.json')
+    _STORAGE_LOCK.acquire()
+    try:
+        stored = _load_json(sizes_path, {})
+        previous = stored.get(history_key, {})
+        history = previous.get('history', [])
+        history.append([int(time.time()), file_size])
+        stored[history_key] = {
+            'packages': packages,
+            'history': history[-BINARY_SIZE_HISTORY:],
+        }
+        _save_json(sizes_path, stored)
+    finally:
+        _STORAGE_LOCK.release()
+
+    previous_packages = previous.get('packages')
+    previous_size = history[-2][1] if len(history) > 1 else None
+
+    output = '> Binary size: %s is %s' % (
+        _relative_path(path, working_dir),
+        _format_sample_value(file_size, 'bytes')
+    )
+    if previous_size is not None:
+        output += ' (%s%s from the previous build)' % (
+            '+' if file_size >= previous_size else '-',
+            _format_sample_value(abs(file_size - previous_size), 'bytes')
+        )
+    output += '\n'
+
+    if not symbols:
+        return output + '> The executable has no symbol table, so the size can not be attributed to packages'
+
+    def _delta(package):
+        if previous_packages is None:
+            return ''
+        change = packages.get(package, 0) - previous_packages.get(package, 0)
+        if change == 0:
+            return ''
+        return '%s%s' % ('+' if change > 0 else '-', _format_sample_value(abs(change), 'bytes'))
+
+    rows = [('Package', 'Size', '%', 'Change')]
+    for package in sorted(packages, key=lambda package: -packages[package])[:BINARY_SIZE_TOP]:
+        rows.append((
+            package,
+            _format_sample_value(packages[package], 'bytes'),
+            '%0.1f%%' % _percent(packages[package], file_size),
+            _delta(package)
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(3)]
+    output += '> Largest packages:\n'
+    for row in rows:
+        output += ('>   %s  %s  %s  %s' % (
+            row[0].ljust(widths[0]),
+            row[1].rjust(widths[1]),
+            row[2].rjust(widths[2]),
+            row[3]
+        )).rstrip() + '\n'
+
+    if previous_packages is not None:
+        changes = []
+        for package in set(packages) | set(previous_packages):
+            change = packages.get(package, 0) - previous_packages.get(package, 0)
+            if change:
+                changes.append((-abs(change), package))
+        if changes:
+            output += '> Largest changes: %s\n' % ', '.join(
+                '%s %s' % (package, _delta(package)) for _, package in sorted(changes)[:5]
+            )
+
+    if len(history) > 1:
+        output += '> Size history: %s\n' % ', '.join(
+            _format_sample_value(size, 'bytes') for _, size in history[-5:]
+        )
+    return output.rstrip('\n')
+
+
+def _parse_go_duration(value):
+    """
+    Parses a duration formatted by Go's time.Duration.String(), such as
+    "1m30.5s"
+
+    :param value:
+        A unicode string of the duration
+
+    :return:
+        A float of the number of seconds, or None if the value is not a
+        duration
+    """
+
+    units = {
+        'h': 3600.0,
+        'm': 60.0,
+        's': 1.0,
+        'ms': 0.001,
+        'us': 0.000001,
+        '\u00b5s': 0.000001,
+        'ns': 0.000000001,
+    }
+    parts = re.findall('(\\d+(?:\\.\\d+)?)(h|ms|us|\u00b5s|ns|m|s)', value)
+    if not parts or ''.join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _profile_runs():
+    """
+    Lists the profiled benchmark runs that are stored on disk
+
+    :return:
+        A list of (unicode string directory, dict metadata) tuples, with the
+        most recent run first
+    """
+
+    profiles_dir = os.path.dirname(_storage_path('profiles', 'meta.json'))
+    runs = []
+    for entry in sorted(os.listdir(profiles_dir), reverse=True):
+        run_dir = os.path.join(profiles_dir, entry)
+        meta = _load_json(os.path.join(run_dir, 'meta.json'), None)
+        if meta is not None:
+            runs.append((run_dir, meta))
+    return runs
+
+
+def _prune_profile_runs():
+    """
+    Removes the oldest profiled benchmark runs, keeping PROFILE_RUNS
+    """
+
+    for run_dir, _ in _profile_runs()[PROFILE_RUNS:]:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _run_process(task, window, args, cwd, env, handlers=None, qos='foreground', panel=None, show=True):
+    """
+    Starts a GolangProcess() and creates a GolangProcessPrinter() for it
+
+    :param task:
+        A unicode string of the build task name, such as "build", "test",
+        "cross_compile", "get", "overlay" or any other task of "golang_build"
+
+    :param window:
+        A sublime.Window object of the window to display the output panel in
+
+    :param args:
+        A list of strings (unicode for Python 3, byte string for Python 2)
+        of the process path and any arguments passed to it
+
+    :param cwd:
+        A unicode string of the working directory for the process
+
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2)
+        to pass to the process as the environment variables
+
+    :param handlers:
+        None or a list of GolangOutputHandler() objects to pass the output of
+        the process through
+
+    :param qos:
+        A unicode string of the QoS class of the process - "foreground",
+        "background" or "idle"
+
+    :param panel:
+        None to print to the "golang_build" output panel, otherwise the
+        GolangPanel() to print to
+
+    :param show:
+        If the output panel should be shown
+
+    :return:
+        A GolangProcess() object
+    """
+
+    if panel is None:
+        panel = _get_panel(window)
+
+    # Everything that may fail is done before the process is started, so an
+    # exception can not leave a process running without a printer
+    progress = GolangProgress(window, task, cwd)
+    handlers = [_progress_handler(progress, task, True)] + (handlers or [])
+    prefetch = _find_prefetch(cwd)
+    if prefetch and qos == 'foreground':
+        report = prefetch.claim()
+        if report:
+            handlers.insert(1, GolangReportHandler(report))
+    sinks = _output_sinks(_jsonl_path(window))
+    _configure_metrics(window)
+
+    try:
+        proc = GolangProcess(args, cwd, env, qos=qos)
+    except (Exception):
+        # Stops the status bar updates
+        progress.finish('cancelled')
+        raise
+
+    # If there is no printer using the panel, reset it
+    if panel.printer_lock.acquire(False):
+        panel.reset(window)
+        panel.printer_lock.release()
+
+    # Overlay builds run every time the user stops typing, and would push
+    # every real build out of the history
+    recorder = False if task == 'overlay' else None
+    GolangProcessPrinter(proc, panel, handlers, sinks, task, recorder)
+
+    if show:
+        window.run_command('show_panel', {'panel': 'output.' + panel.name})
+
+    return proc
+
+
+def _progress_handler(progress, task, finishes):
+    """
+    Creates the GolangProgressHandler() for a process of a build
+
+    :param progress:
+        The GolangProgress() of the build
+
+    :param task:
+        A unicode string of the build task name
+
+    :param finishes:
+        If the process is the whole build
+
+    :return:
+        A GolangProgressHandler() object
+    """
+
+    # The output of these tasks includes the output of the user's program,
+    # which may contain lines that look like import paths
+    build_lines = task not in ('run', 'run_race', 'benchmark_compare')
+    return GolangProgressHandler(progress, build_lines, finishes)
+
+
+def _qos_setting(window, task, default):
+    """
+    Reads the "{task}:qos" setting
+
+    :param window:
+        A sublime.Window object
+
+    :param task:
+        A unicode string of the build task name
+
+    :param default:
+        A unicode string of the QoS class to use if the setting is not set
+
+    :return:
+        A unicode string of "foreground", "background" or "idle"
+    """
+
+    qos, _ = golangconfig.setting_value(
+        '%s:qos' % task,
+        view=window.active_view(),
+        window=window
+    )
+    return qos if qos in QOS_CLASSES else default
+
+
+def _qos_limit(qos):
+    """
+    :param qos:
+        A unicode string of the QoS class
+
+    :return:
+        None if the class is not limited, otherwise an integer of the value
+        for GOMAXPROCS and the -p flag
+    """
+
+    if qos == 'background':
+        return max(1, _cpu_count() // 2)
+    if qos == 'idle':
+        return 1
+    return None
+
+
+def _qos_args(args, limit):
+    """
+    Adds the -p flag to the args of a go command that accepts it
+
+    :param args:
+        A list of strings of the process path and any arguments
+
+    :param limit:
+        An integer of the number of programs to run in parallel
+
+    :return:
+        A list of strings of the args
+    """
+
+    if len(args) < 2 or args[1] not in _QOS_P_COMMANDS:
+        return args
+    for arg in args[2:]:
+        if arg == '-p' or arg.startswith('-p='):
+            return args
+    return args[:2] + ['-p', '%d' % limit] + args[2:]
+
+
+def _ioprio_setter():
+    """
+    Looks up the Linux ioprio_set() syscall
+
+    :return:
+        None if not available, otherwise a callable that accepts the integer
+        I/O priority class and level to set for the current process
+    """
+
+    if not sys.platform.startswith('linux'):
+        return None
+    number = _IOPRIO_SET_SYSCALLS.get(os.uname()[4])
+    if number is None:
+        return None
+    try:
+        import ctypes
+        syscall = ctypes.CDLL(None, use_errno=True).syscall
+    except (ImportError, OSError, AttributeError):
+        return None
+
+    def set_ioprio(ioprio_class, level):
+        # IOPRIO_WHO_PROCESS with a pid of 0 is the calling process
+        syscall(number, 1, 0, (ioprio_class << 13) | level)
+    return set_ioprio
+
+
+def _race_log_dir(window):
+    """
+    Finds the directory to write the data race reports of a window to. The
+    options in GORACE are separated by whitespace, so the path of the
+    directory can not contain any.
+
+    :param window:
+        A sublime.Window object
+
+    :return:
+        None if there is no such directory, otherwise a unicode string of the
+        path to an existing directory
+    """
+
+    log_dir = _temp_path('race', '%s' % window.id())
+    if sys.platform == 'win32' and re.search('\\s', log_dir):
+        log_dir = _short_path(log_dir)
+    if re.search('\\s', log_dir):
+        return None
+    return log_dir
+
+
+def _short_path(path):
+    """
+    Converts a path to its 8.3 form on Windows, which contains no whitespace
+
+    :param path:
+        A unicode string of the path to an existing file or directory
+
+    :return:
+        A unicode string of the short path, or the path unchanged if it
+        could not be converted, such as when 8.3 names are disabled
+    """
+
+    try:
+        import ctypes
+        buffer = ctypes.create_unicode_buffer(32768)
+        length = ctypes.windll.kernel32.GetShortPathNameW(path, buffer, len(buffer))
+    except (ImportError, AttributeError, OSError):
+        return path
+    if not length or length >= len(buffer):
+        return path
+    return buffer.value
 
-    # If a file is open, get the folder from the file, and error if the file
-    # has not been saved yet
-    if view:
-        if view.file_name():
-            working_dir = os.path.dirname(view.file_name())
 
-    # If no file is open, then get the list of folders and grab the first one
+def _may_download(env):
+    """
+    Checks if a go process may download modules, based on its environment
+
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2)
+        of the environment variables of the process
+
+    :return:
+        A boolean - False if GOPROXY is "off" or GOFLAGS contains
+        -mod=vendor, otherwise True
+    """
+
+    if (_get_env(env, 'GOPROXY') or '').strip() == 'off':
+        return False
+    goflags = _get_env(env, 'GOFLAGS') or ''
+    return re.search('(^|\\s)-mod=vendor(\\s|$)', goflags) is None
+
+
+def _qos_started(proc):
+    """
+    Pauses the running "background" and "idle" processes when a
+    "foreground" process starts, or pauses the new process if it is not
+    "foreground" and one is running
+
+    :param proc:
+        The GolangProcess() that started
+    """
+
+    _QOS_LOCK.acquire()
+    try:
+        if proc.qos == 'foreground':
+            _QOS_PROCS['foreground'].append(proc)
+            for background in _QOS_PROCS['background']:
+                background.pause()
+        elif proc.pausable:
+            _QOS_PROCS['background'].append(proc)
+            if _QOS_PROCS['foreground']:
+                proc.pause()
+    finally:
+        _QOS_LOCK.release()
+
+
+def _qos_finished(proc):
+    """
+    Resumes the paused processes once the last "foreground" process finishes
+
+    RUNS IN A THREAD
+
+    :param proc:
+        The GolangProcess() that finished
+    """
+
+    _QOS_LOCK.acquire()
+    try:
+        for procs in _QOS_PROCS.values():
+            if proc in procs:
+                procs.remove(proc)
+        if not _QOS_PROCS['foreground']:
+            for background in _QOS_PROCS['background']:
+                background.resume()
+    finally:
+        _QOS_LOCK.release()
+
+
+def _observe(histograms, key, buckets, value):
+    """
+    Adds an observation to a histogram of GolangMetrics()
+
+    :param histograms:
+        A dict with keys of the labels and values of a three-element list of a
+        list of integer counts per bucket, the float sum and integer count
+
+    :param key:
+        The key of the histogram in histograms
+
+    :param buckets:
+        A list of the float upper bounds of the buckets
+
+    :param value:
+        A float of the value to observe
+    """
+
+    if key not in histograms:
+        histograms[key] = [[0] * len(buckets), 0.0, 0]
+    histogram = histograms[key]
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            histogram[0][i] += 1
+            break
+    histogram[1] += value
+    histogram[2] += 1
+
+
+def _metrics_label(value):
+    """
+    :param value:
+        A unicode string
+
+    :return:
+        The string escaped for use as a Prometheus label value
+    """
+
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _start_metrics_server(metrics, port):
+    """
+    Serves the metrics via HTTP on 127.0.0.1 from a daemon thread
+
+    :param metrics:
+        The GolangMetrics() object to serve
+
+    :param port:
+        An integer of the port to listen on
+
+    :raises:
+        socket.error - when the port can not be listened on
+
+    :return:
+        The server object, which has a shutdown() method
+    """
+
+    if sys.version_info < (3,):
+        from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
     else:
-        folders = window.folders()
-        if len(folders) > 0:
-            working_dir = folders[0]
+        from http.server import HTTPServer, BaseHTTPRequestHandler
 
-    if working_dir is None or not os.path.exists(working_dir):
-        message = _format_message("""
-            Golang Build
+    class MetricsHandler(BaseHTTPRequestHandler):
 
-            No files or folders are open, or the open file or folder does not exist on disk
-        """)
-        sublime.error_message(message)
-        return None
+        def do_GET(self):
+            """
+            Responds to every path with the metrics
 
-    return working_dir
+            RUNS IN A THREAD
+            """
 
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
 
-def _get_config(executable_name, required_vars, optional_vars=None, view=None, window=None):
+        def log_message(self, *args):
+            """
+            Discards the access log, which would otherwise be written to the
+            Sublime Text console for every scrape
+            """
+
+            pass
+
+    server = HTTPServer(('127.0.0.1', port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def _stop_metrics_server(server):
     """
-    :param executable_name:
-        A unicode string of the executable to locate, e.g. "go" or "gofmt"
+    Stops a server started by _start_metrics_server() and closes its socket
 
-    :param required_vars:
-        A list of unicode strings of the environment variables that are
-        required, e.g. "GOPATH". Obtains values from setting_value().
+    :param server:
+        The server object
+    """
 
-    :param optional_vars:
-        A list of unicode strings of the environment variables that are
-        optional, but should be pulled from setting_value() if available - e.g.
-        "GOOS", "GOARCH". Obtains values from setting_value().
+    server.shutdown()
+    server.server_close()
 
-    :param view:
-        A sublime.View object to use in finding project-specific settings. This
-        should be passed whenever available.
+
+def _configure_metrics(window):
+    """
+    Applies the "metrics:file" and "metrics:port" settings
 
     :param window:
-        A sublime.Window object to use in finding project-specific settings.
-        This will only work for Sublime Text 3, and should only be passed if
-        no sublime.View object is available to pass via the view parameter.
+        A sublime.Window object
+    """
+
+    file_path, _ = golangconfig.setting_value(
+        'metrics:file',
+        view=window.active_view(),
+        window=window
+    )
+    if not file_path or not isinstance(file_path, str_cls):
+        file_path = None
+    else:
+        file_path = os.path.expanduser(file_path)
+
+    port, _ = golangconfig.setting_value(
+        'metrics:port',
+        view=window.active_view(),
+        window=window
+    )
+    if not isinstance(port, int) or port <= 0:
+        port = None
+
+    _METRICS.configure(file_path, port)
+
+
+def plugin_loaded():
+    """
+    Applies the metrics settings of the active window once the package is
+    loaded, so the metrics are served before the first build
+    """
+
+    window = sublime.active_window()
+    if window is not None:
+        _configure_metrics(window)
+
+
+def plugin_unloaded():
+    """
+    Stops serving the metrics, so the port is released when the package is
+    reloaded or removed
+    """
+
+    _METRICS.close()
+
+
+if sys.version_info < (3,):
+    # Sublime Text 2 does not call plugin_loaded(), and calls unload_handler()
+    # instead of plugin_unloaded()
+    sublime.set_timeout(plugin_loaded, 1)
+    unload_handler = plugin_unloaded
+
+
+def _jsonl_path(window):
+    """
+    :param window:
+        A sublime.Window object
 
     :return:
-        A two-element tuple.
+        None or a unicode string of the path from the "log:jsonl" setting
+    """
 
-        If there was an error finding the executable or required vars:
+    path, _ = golangconfig.setting_value(
+        'log:jsonl',
+        view=window.active_view(),
+        window=window
+    )
+    if not path or not isinstance(path, str_cls):
+        return None
+    return os.path.expanduser(path)
 
-         - [0] None
-         - [1] None
 
-        Otherwise:
+def _output_sinks(jsonl_path):
+    """
+    Creates the GolangOutputSink() objects for a GolangProcessPrinter()
 
-         - [0] A string of the path to the executable
-         - [1] A dict of environment variables for the executable
+    :param jsonl_path:
+        None or a unicode string of the path of the "log:jsonl" file
+
+    :return:
+        A list of GolangOutputSink() objects
+    """
+
+    if not jsonl_path:
+        return []
+    return [GolangJsonlSink(jsonl_path)]
+
+
+def _jsonl_writer(path):
     """
+    Returns the GolangJsonlWriter() for a file, creating it if necessary, so
+    that all records for a file are written by a single thread
 
+    :param path:
+        A unicode string of the path of the file
+
+    :return:
+        A GolangJsonlWriter() object
+    """
+
+    _JSONL_WRITERS_LOCK.acquire()
     try:
-        return golangconfig.subprocess_info(
-            executable_name,
-            required_vars,
-            optional_vars,
-            view=view,
-            window=window
-        )
+        if path not in _JSONL_WRITERS:
+            _JSONL_WRITERS[path] = GolangJsonlWriter(path)
+        return _JSONL_WRITERS[path]
+    finally:
+        _JSONL_WRITERS_LOCK.release()
 
-    except (golangconfig.ExecutableError) as e:
-        error_message = '''
-            Golang Build
 
-            The %s executable could not be found. Please ensure it is
-            installed and available via your PATH.
+def _show_report(window, working_dir, output):
+    """
+    Displays text that was not produced by a process in the output panel
 
-            Would you like to view documentation for setting a custom PATH?
-        '''
+    :param window:
+        A sublime.Window object of the window to display the output panel in
 
-        prompt = error_message % e.name
+    :param working_dir:
+        None or a unicode string of the directory relative file paths in the
+        output are based on
 
-        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
-            window.run_command(
-                'open_url',
-                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
-            )
+    :param output:
+        A unicode string to display
+    """
 
-    except (golangconfig.EnvVarError) as e:
-        error_message = '''
-            Golang Build
+    panel = _get_panel(window)
+    if not panel.printer_lock.acquire(False):
+        sublime.status_message('Golang Build: wait for the running build to finish')
+        return
+    try:
+        panel.reset(window)
+        if working_dir:
+            panel.set_base_dir(working_dir)
+        panel.write(output)
+    finally:
+        panel.printer_lock.release()
+    window.run_command('show_panel', {'panel': 'output.golang_build'})
 
-            The setting%s %s could not be found in your Sublime Text
-            settings or your shell environment.
 
-            Would you like to view the configuration documentation?
-        '''
+def _configure_output_view(view):
+    """
+    Sets the syntax and result navigation settings of a view that displays
+    build output
 
-        plural = 's' if len(e.missing) > 1 else ''
-        setting_names = ', '.join(e.missing)
-        prompt = error_message % (plural, setting_names)
+    :param view:
+        A sublime.View object of the output panel, or of a view opened from
+        the build history
+    """
 
-        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
-            window.run_command(
-                'open_url',
-                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
-            )
+    st_settings = sublime.load_settings('Preferences.sublime-settings')
+    view_settings = view.settings()
+    view_settings.set('syntax', 'Packages/Golang Build/Golang Build Output.tmLanguage')
+    view_settings.set('color_scheme', st_settings.get('color_scheme'))
+    view_settings.set('result_file_regex', '^\s*(.+\.go):([0-9]+):(?:([0-9]+):)?\s*(.*)')
+    view_settings.set('draw_white_space', 'selection')
+    view_settings.set('word_wrap', False)
+    view_settings.set("auto_indent", False)
 
-    except (golangconfig.GoRootNotFoundError, golangconfig.GoPathNotFoundError) as e:
-        error_message = '''
-            Golang Build
 
-            %s.
+def _set_proc(window, proc):
+    """
+    Sets the GolangProcess() object associated with a sublime.Window
+
+    :param window:
+        A sublime.Window object
+
+    :param proc:
+        A GolangProcess() object that is being run for the window
+    """
+
+    _PROCS[window.id()] = proc
+
+
+def _get_proc(window):
+    """
+    Returns the GolangProcess() object associated with a sublime.Window
+
+    :param window:
+        A sublime.Window object
+
+    :return:
+        None or a GolangProcess() object. The GolangProcess() may or may not
+        still be running.
+    """
+
+    return _PROCS.get(window.id())
+
+
+def _get_panel(window):
+    """
+    Returns the GolangPanel() object associated with a sublime.Window
+
+    :param window:
+        A sublime.Window object
+
+    :return:
+        A GolangPanel() object
+    """
+
+    _PANEL_LOCK.acquire()
+    try:
+        if window.id() not in _PANELS:
+            _PANELS[window.id()] = GolangPanel(window)
+        return _PANELS.get(window.id())
+    finally:
+        _PANEL_LOCK.release()
+
+
+def _get_overlay(window):
+    """
+    Returns the GolangOverlay() object associated with a sublime.Window
+
+    :param window:
+        A sublime.Window object
+
+    :return:
+        A GolangOverlay() object
+    """
+
+    if window.id() not in _OVERLAYS:
+        _OVERLAYS[window.id()] = GolangOverlay(window)
+    return _OVERLAYS[window.id()]
 
-            Would you like to view the configuration documentation?
-        '''
 
-        prompt = error_message % str_cls(e)
+def _get_prewarm(window):
+    """
+    Returns the GolangPrewarm() object associated with a sublime.Window
 
-        if sublime.ok_cancel_dialog(_format_message(prompt), 'Open Documentation'):
-            window.run_command(
-                'open_url',
-                {'url': 'https://github.com/golang/sublime-build/blob/master/docs/configuration.md'}
-            )
+    :param window:
+        A sublime.Window object
 
-    return (None, None)
+    :return:
+        A GolangPrewarm() object
+    """
 
+    if window.id() not in _PREWARMS:
+        _PREWARMS[window.id()] = GolangPrewarm()
+    return _PREWARMS[window.id()]
 
-class GolangProcess():
 
+def _module_root(working_dir):
     """
-    A wrapper around subprocess.Popen() that provides information about how
-    the process was started and finished, plus a queue.Queue of output
-    """
+    Finds the folder of the go.mod file of the module a directory is part of
 
-    # A float of the unix timestamp of when the process was started
-    started = None
+    :param working_dir:
+        A unicode string of a directory
 
-    # A list of strings (unicode for Python 3, byte string for Python 2) of
-    # the process path and any arguments passed to it
-    args = None
+    :return:
+        None if the directory is not in a module, otherwise a unicode string
+        of the folder containing the go.mod file
+    """
 
-    # A unicode string of the process working directory
-    cwd = None
+    current = working_dir
+    while True:
+        if os.path.isfile(os.path.join(current, 'go.mod')):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
 
-    # A dict of the env passed to the process
-    env = None
 
-    # A subprocess.Popen() object of the running process
-    proc = None
+def _list_dir(path):
+    """
+    Lists the files and subdirectories of a directory, using os.scandir()
+    when available so most file types are known without a stat() call
 
-    # A queue.Queue object of output from the process
-    output = None
+    :param path:
+        A unicode string of the directory path
 
-    # The result of the process, a unicode string of "cancelled", "success" or "error"
-    result = None
+    :return:
+        A two-element tuple of a list of [name, size, last used unix
+        timestamp] lists of the files, and a list of unicode strings of the
+        subdirectory names. Symlinks are not followed.
+    """
 
-    # A float of the unix timestamp of when the process ended
-    finished = None
+    files = []
+    dirs = []
+    scandir = getattr(os, 'scandir', None)
+    if scandir is not None:
+        for entry in scandir(path):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    info = entry.stat(follow_symlinks=False)
+                    files.append([entry.name, info.st_size, int(max(info.st_mtime, info.st_atime))])
+            except (OSError):
+                pass
+        return (files, dirs)
+
+    for name in os.listdir(path):
+        # Names that can not be decoded are returned as byte strings
+        if not isinstance(name, str_cls):
+            continue
+        try:
+            info = os.lstat(os.path.join(path, name))
+        except (OSError):
+            continue
+        if stat.S_ISDIR(info.st_mode):
+            dirs.append(name)
+        elif stat.S_ISREG(info.st_mode):
+            files.append([name, info.st_size, int(max(info.st_mtime, info.st_atime))])
+    return (files, dirs)
 
-    # A threading.Lock() used to prevent the stdout and stderr handlers from
-    # both trying to perform process cleanup at the same time
-    _cleanup_lock = None
 
-    def __init__(self, args, cwd, env):
-        """
-        :param args:
-            A list of strings (unicode for Python 3, byte string for Python 2)
-            of the process path and any arguments passed to it
+def _scan_caches(caches, rescan):
+    """
+    Scans the build and module caches, updating the stored index
 
-        :param cwd:
-            A unicode string of the working directory for the process
+    RUNS IN A THREAD
 
-        :param env:
-            A dict of strings (unicode for Python 3, byte string for Python 2)
-            to pass to the process as the environment variables
-        """
+    :param caches:
+        A list of two-element tuples of a unicode string of "build" or
+        "module", and the unicode string path of the cache
 
-        self.args = args
-        self.cwd = cwd
-        self.env = env
+    :param rescan:
+        If the stored index should be ignored
 
-        startupinfo = None
-        preexec_fn = None
-        if sys.platform == 'win32':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        else:
-            # On posix platforms we create a new process group by executing
-            # os.setsid() after the fork before the go binary is executed. This
-            # allows us to use os.killpg() to kill the whole process group.
-            preexec_fn = os.setsid
+    :return:
+        A list of four-element tuples of the kind, path, dict from
+        _cache_entries() and the GolangCacheScanner() of each cache
+    """
 
-        self._cleanup_lock = threading.Lock()
-        self.started = time.time()
-        self.proc = subprocess.Popen(
-            args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=cwd,
-            env=env,
-            startupinfo=startupinfo,
-            preexec_fn=preexec_fn
-        )
-        self.finished = False
+    index_path = _storage_path('cache_index.json')
+    _STORAGE_LOCK.acquire()
+    try:
+        stored = {} if rescan else _load_json(index_path, {})
+    finally:
+        _STORAGE_LOCK.release()
+
+    results = []
+    for kind, root in caches:
+        scanner = GolangCacheScanner(root, stored.get(root, {}))
+        index = scanner.scan()
+        stored[root] = index
+        results.append((kind, root, _cache_entries(kind, index), scanner))
+
+    # The index of a large module cache takes a while to encode, and the lock
+    # is also taken in the UI thread, so only the rename is done holding it
+    temp_path = _write_json_temp(index_path, stored)
+    _STORAGE_LOCK.acquire()
+    try:
+        _replace_file(temp_path, index_path)
+    finally:
+        _STORAGE_LOCK.release()
+    return results
 
-        self.output = queue.Queue()
 
-        self._stdout_thread = threading.Thread(
-            target=self._read_output,
-            args=(
-                self.output,
-                self.proc.stdout.fileno(),
-                'stdout'
-            )
-        )
-        self._stdout_thread.start()
+def _cache_entries(kind, index):
+    """
+    Groups the files of a cache into the entries that are removed together
 
-        self._stderr_thread = threading.Thread(
-            target=self._read_output,
-            args=(
-                self.output,
-                self.proc.stderr.fileno(),
-                'stderr'
-            )
-        )
-        self._stderr_thread.start()
+    :param kind:
+        A unicode string of "build" or "module"
 
-        self._cleanup_thread = threading.Thread(target=self._cleanup)
-        self._cleanup_thread.start()
+    :param index:
+        A dict of the index from GolangCacheScanner()
 
-    def wait(self):
-        """
-        Blocks waiting for the subprocess to complete
-        """
+    :return:
+        A dict with unicode string keys of the entry name and values of a dict
+        with the keys "size", "last_used" and "paths", a set of "/" separated
+        paths relative to the cache to remove. The "" key is for files that
+        are never removed, such as the metadata of the cache.
+    """
 
-        self._cleanup_thread.wait()
+    entries = {}
 
-    def terminate(self):
-        """
-        Terminates the subprocess
+    def _add(key, size, last_used, path):
         """
+        Adds a file to an entry, creating the entry if necessary
 
-        self._cleanup_lock.acquire()
-        try:
-            if not self.proc:
-                return
+        :param key:
+            A unicode string of the entry name
 
-            if sys.platform != 'win32':
-                # On posix platforms we send SIGTERM to the whole process
-                # group to ensure both go and the compiled temporary binary
-                # are killed.
-                os.killpg(os.getpgid(self.proc.pid), signal.SIGTERM)
-            else:
-                # On Windows, there is no API to get the child processes
-                # of a process and send signals to them all. Attempted to use
-                # startupinfo.dwFlags with CREATE_NEW_PROCESS_GROUP and then
-                # calling self.proc.send_signal(signal.CTRL_BREAK_EVENT),
-                # however that did not kill the temporary binary. taskkill is
-                # part of Windows XP and newer, so we use that.
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                kill_proc = subprocess.Popen(
-                    ['taskkill', '/F', '/T', '/PID', str_cls(self.proc.pid)],
-                    startupinfo=startupinfo
-                )
-                kill_proc.wait()
+        :param size:
+            An integer of the size of the file in bytes
 
-            self.result = 'cancelled'
-            self.finished = time.time()
-            self.proc = None
-        finally:
-            self._cleanup_lock.release()
+        :param last_used:
+            An integer unix timestamp of when the file was last used
 
-    def _read_output(self, output_queue, fileno, output_type):
+        :param path:
+            A unicode string of the "/" separated path relative to the cache
+            to remove along with the entry
         """
-        Handler to process output from stdout/stderr
 
-        RUNS IN A THREAD
+        if key not in entries:
+            entries[key] = {'size': 0, 'last_used': 0, 'paths': set()}
+        entry = entries[key]
+        entry['size'] += size
+        entry['last_used'] = max(entry['last_used'], last_used)
+        if key:
+            entry['paths'].add(path)
+
+    for relative in index:
+        parts = relative.split('/') if relative else []
+        for name, size, last_used in index[relative]['files']:
+            path = relative + '/' + name if relative else name
+            if kind == 'build':
+                # Files at the top level describe the cache itself
+                _add(path if parts else '', size, last_used, path)
+                continue
+
+            # Downloaded module files are named {version}.{ext} in a
+            # cache/download/{module}/@v directory, next to files such as
+            # list and list.lock that belong to no version
+            if parts[:2] == ['cache', 'download'] and len(parts) > 3 and parts[-1] == '@v':
+                match = re.match('^(v.+)\\.(info|mod|zip|ziphash|lock|partial)$', name)
+                if match:
+                    _add(_unescape_module_path('/'.join(parts[2:-1])) + '@' + match.group(1), size, last_used, path)
+                else:
+                    _add('', size, last_used, path)
+                continue
 
-        :param output_queue:
-            The queue.Queue object to add the output to
+            key = ''
+            for i, part in enumerate(parts):
+                if part == 'cache' and i == 0:
+                    break
+                if '@' in part:
+                    key = '/'.join(parts[:i + 1])
+                    break
+            _add(_unescape_module_path(key), size, last_used, key)
+    return entries
 
-        :param fileno:
-            The fileno to read output from
 
-        :param output_type:
-            A unicode string of "stdout" or "stderr"
-        """
+def _unescape_module_path(path):
+    """
+    Reverses the escaping of upper case letters in module cache paths
 
-        while self.proc and self.proc.poll() is None:
-            chunk = os.read(fileno, 32768)
-            if len(chunk) == 0:
-                break
-            output_queue.put((output_type, chunk.decode('utf-8')))
+    :param path:
+        A unicode string of an escaped path, such as "github.com/!burnt!sushi"
 
-    def _cleanup(self):
-        """
-        Cleans up the subprocess and marks the state of self appropriately
+    :return:
+        A unicode string of the module path
+    """
 
-        RUNS IN A THREAD
-        """
+    return re.sub('!([a-z])', lambda match: match.group(1).upper(), path)
 
-        self._stdout_thread.join()
-        self._stderr_thread.join()
 
-        self._cleanup_lock.acquire()
-        try:
-            if not self.proc:
-                return
-            # Get the returncode to prevent a zombie/defunct child process
-            self.proc.wait()
-            self.result = 'success' if self.proc.returncode == 0 else 'error'
-            self.finished = time.time()
-            self.proc = None
-        finally:
-            self._cleanup_lock.release()
-            self.output.put(('eof', None))
+def _cache_total(entries):
+    """
+    :param entries:
+        A dict from _cache_entries()
+
+    :return:
+        An integer of the total bytes of the entries
+    """
 
+    return sum(entry['size'] for entry in entries.values())
 
-class GolangProcessPrinter():
 
+def _format_cache_usage(results):
     """
-    Describes a Go process, the environment it was started in and its result
+    Formats the disk usage of the caches
+
+    :param results:
+        A list of the results from _scan_caches()
+
+    :return:
+        A unicode string of the report
     """
 
-    # The GolangProcess() object the printer is displaying output from
-    proc = None
+    now = time.time()
+    output = ''
+    listed = 0
+    reused = 0
+    elapsed = 0.0
+    for kind, root, entries, scanner in results:
+        listed += scanner.listed
+        reused += scanner.reused
+        elapsed += scanner.finished - scanner.started
+
+        title = 'Build cache' if kind == 'build' else 'Module cache'
+        if not scanner.index:
+            output += '> %s: %s does not exist\n' % (title, root)
+            continue
+
+        named = [key for key in entries if key]
+        other = entries.get('', {}).get('size', 0)
+        output += '> %s: %s\n' % (title, root)
+        output += '>   Size: %s in %d %s' % (
+            _format_sample_value(_cache_total(entries) - other, 'bytes'),
+            len(named),
+            'entries' if kind == 'build' else 'module versions'
+        )
+        if other:
+            output += ', plus %s of other files' % _format_sample_value(other, 'bytes')
+        output += '\n'
+
+        buckets = [0] * len(CACHE_AGE_BUCKETS)
+        for key in named:
+            age = (now - entries[key]['last_used']) / 86400.0
+            for i, (days, _) in enumerate(CACHE_AGE_BUCKETS):
+                if days is None or age < days:
+                    buckets[i] += entries[key]['size']
+                    break
+        width = max(len(label) for _, label in CACHE_AGE_BUCKETS)
+        output += '>   Last used:\n'
+        for i, (_, label) in enumerate(CACHE_AGE_BUCKETS):
+            output += '>     %s  %s\n' % (label.ljust(width), _format_sample_value(buckets[i], 'bytes'))
+
+        if kind == 'module' and named:
+            largest = sorted(named, key=lambda key: -entries[key]['size'])[:CACHE_TOP]
+            sizes = [_format_sample_value(entries[key]['size'], 'bytes') for key in largest]
+            width = max(len(size) for size in sizes)
+            output += '>   Largest module versions:\n'
+            for key, size in zip(largest, sizes):
+                output += '>     %s  %s\n' % (size.rjust(width), key)
+
+    output += '> Scanned %d directories in %0.3fs, %d unchanged since the previous scan' % (
+        listed + reused,
+        elapsed,
+        reused
+    )
+    return output
 
-    # The GolangPanel() object the information is written to
-    panel = None
 
-    def __init__(self, proc, panel):
-        """
-        :param proc:
-            A GolangProcess() object
+def _cache_trim_candidates(results, target):
+    """
+    Picks the least recently used cache entries to remove to shrink the
+    caches to a target size
 
-        :param panel:
-            A GolangPanel() object to write information to
-        """
+    :param results:
+        A list of the results from _scan_caches()
 
-        self.proc = proc
-        self.panel = panel
+    :param target:
+        An integer of the number of bytes the caches should use in total
 
-        self.thread = threading.Thread(
-            target=self._run
-        )
-        self.thread.start()
+    :return:
+        A list of three-element tuples of the unicode string cache path, the
+        entry name and the entry dict, least recently used first
+    """
 
-    def _run(self):
-        """
-        GolangProcess() output queue processor
+    total = sum(_cache_total(entries) for _, _, entries, _ in results)
+    ordered = []
+    for _, root, entries, _ in results:
+        for key in entries:
+            if key:
+                ordered.append((entries[key]['last_used'], root, key))
+    ordered.sort()
+
+    candidates = []
+    for _, root, key in ordered:
+        if total <= target:
+            break
+        entry = results[[result[1] for result in results].index(root)][2][key]
+        candidates.append((root, key, entry))
+        total -= entry['size']
+    return candidates
+
+
+def _trim_caches(candidates):
+    """
+    Removes cache entries, skipping any that were used since they were
+    scanned
 
-        RUNS IN A THREAD
-        """
+    RUNS IN A THREAD
 
-        self.panel.printer_lock.acquire()
-        self.panel.set_base_dir(self.proc.cwd)
+    :param candidates:
+        A list from _cache_trim_candidates()
 
-        try:
-            self._write_header()
+    :return:
+        A two-element tuple of the integer number of entries removed and the
+        integer number of bytes freed
+    """
 
-            while True:
-                message_type, message = self.proc.output.get()
+    removed = 0
+    freed = 0
+    for root, _, entry in candidates:
+        paths = [os.path.join(root, *path.split('/')) for path in entry['paths']]
+
+        # The go tool marks build cache files as used by updating their
+        # modification time, which does not change the modification time of
+        # their directory, so the index may be out of date
+        used = False
+        for path in paths:
+            try:
+                used = used or (not os.path.isdir(path) and int(os.stat(path).st_mtime) > entry['last_used'])
+            except (OSError):
+                pass
+        if used:
+            continue
+
+        for path in paths:
+            if os.path.isdir(path):
+                _remove_tree(path)
+            else:
+                _remove_file(path)
+        removed += 1
+        freed += entry['size']
+    return (removed, freed)
 
-                if message_type == 'eof':
-                    break
 
-                if message_type == 'stdout':
-                    output = message
+def _remove_tree(path):
+    """
+    Removes a directory tree, including the read-only directories the go
+    tool extracts modules into
 
-                if message_type == 'stderr':
-                    output = message
+    :param path:
+        A unicode string of the directory path
+    """
 
-                self.panel.write(output)
+    def _on_error(function, failed_path, exc_info):
+        """
+        Makes the path and its parent writable and retries the function that
+        failed. Called by shutil.rmtree().
 
-            self._write_footer()
+        :param function:
+            The function that raised the exception, such as os.remove
 
-        finally:
-            self.panel.printer_lock.release()
+        :param failed_path:
+            A unicode string of the path passed to the function
 
-    def _write_header(self):
-        """
-        Displays startup information about the process
+        :param exc_info:
+            The exception info from sys.exc_info()
         """
 
-        title = ''
+        try:
+            os.chmod(os.path.dirname(failed_path), stat.S_IRWXU)
+            os.chmod(failed_path, stat.S_IRWXU)
+            function(failed_path)
+        except (OSError):
+            pass
+
+    shutil.rmtree(path, onerror=_on_error)
+
+
+def _get_prefetch(folder):
+    """
+    Returns the GolangPrefetch() object for a folder
+
+    :param folder:
+        A unicode string of the folder containing a go.mod file
+
+    :return:
+        A GolangPrefetch() object
+    """
+
+    if folder not in _PREFETCHES:
+        _PREFETCHES[folder] = GolangPrefetch(folder)
+    return _PREFETCHES[folder]
 
-        env_vars = []
-        for var_name in GO_ENV_VARS:
-            var_key = var_name if sys.version_info >= (3,) else var_name.encode('ascii')
-            if var_key in self.proc.env:
-                value = self.proc.env.get(var_key)
-                if sys.version_info < (3,):
-                    value = value.decode('utf-8')
-                env_vars.append((var_name, value))
-        if env_vars:
-            title += '> Environment:\n'
-            for var_name, value in env_vars:
-                title += '>   %s=%s\n' % (var_name, value)
 
-        title += '> Directory: %s\n' % self.proc.cwd
-        title += '> Command: %s\n' % subprocess.list2cmdline(self.proc.args)
-        title += '> Output:\n'
+def _find_prefetch(working_dir):
+    """
+    Finds the GolangPrefetch() of the module a directory is part of
 
-        self.panel.write(title, content_separator='\n\n')
+    :param working_dir:
+        A unicode string of the directory of a build
 
-    def _write_footer(self):
-        """
-        Displays result information about the process, blocking until the
-        write is completed
-        """
+    :return:
+        None or a GolangPrefetch() object
+    """
 
-        formatted_result = self.proc.result.title()
-        runtime = self.proc.finished - self.proc.started
+    for folder in list(_PREFETCHES.keys()):
+        if working_dir == folder or working_dir.startswith(folder.rstrip(os.sep) + os.sep):
+            return _PREFETCHES[folder]
+    return None
 
-        output = '> Elapsed: %0.3fs\n> Result: %s' % (runtime, formatted_result)
 
-        event = threading.Event()
-        self.panel.write(output, content_separator='\n', event=event)
-        event.wait()
+def _go_mod_digest(folder):
+    """
+    Hashes the go.mod and go.sum files of a folder
 
-        package_events.notify(
-            'Golang Build',
-            'build_complete',
-            BuildCompleteEvent(
-                task='',
-                args=list(self.proc.args),
-                working_dir=self.proc.cwd,
-                env=self.proc.env.copy(),
-                runtime=runtime,
-                result=self.proc.result
-            )
-        )
+    :param folder:
+        A unicode string of the folder
 
+    :return:
+        None if go.mod could not be read, otherwise a unicode string of the
+        hex SHA-1 of the contents of both files
+    """
 
-BuildCompleteEvent = collections.namedtuple(
-    'BuildCompleteEvent',
-    [
-        'task',
-        'args',
-        'working_dir',
-        'env',
-        'runtime',
-        'result',
-    ]
-)
+    digest = hashlib.sha1()
+    for name in ('go.mod', 'go.sum'):
+        try:
+            with open(os.path.join(folder, name), 'rb') as f:
+                digest.update(f.read())
+        except (IOError, OSError):
+            if name == 'go.mod':
+                return None
+        digest.update(b'\0')
+    return digest.hexdigest()
 
 
-class GolangPanel():
+def _mtime(path):
+    """
+    :param path:
+        A unicode string of a file path
 
+    :return:
+        None if the file does not exist, otherwise a float of its
+        modification time
     """
-    Holds a reference to an output panel used by the Golang Build package,
-    and provides synchronization features to ensure output is printed in proper
-    order
+
+    try:
+        return os.stat(path).st_mtime
+    except (OSError):
+        return None
+
+
+def _normalize_goproxy(env):
     """
+    Rewrites any directory paths in the GOPROXY environment variable to the
+    file:// URLs the go tool requires, so a local module proxy can be set as
+    a plain path
 
-    # A sublime.View object of the output panel being printed to
-    panel = None
+    :param env:
+        A dict of strings (unicode for Python 3, byte string for Python 2) of
+        the environment variables, modified in place
+    """
 
-    # A queue.Queue() that holds all of the info to be written to the panel
-    queue = None
+    goproxy = _get_env(env, 'GOPROXY')
+    if not goproxy:
+        return
 
-    # A lock used to ensure only on GolangProcessPrinter() is using the panel
-    # at any given time
-    printer_lock = None
+    # Entries may be separated by commas or pipes, which are kept
+    parts = re.split('([,|])', goproxy)
+    for i, part in enumerate(parts):
+        if part not in (',', '|') and os.path.isabs(part) and os.path.isdir(part):
+            parts[i] = 'file:///' + part.replace(os.sep, '/').lstrip('/')
+    _set_env(env, 'GOPROXY', ''.join(parts))
 
-    def __init__(self, window):
-        """
-        :param window:
-            The sublime.Window object the output panel is contained within
-        """
 
-        self.printer_lock = threading.Lock()
-        self.reset(window)
+def _git_head(folder):
+    """
+    Reads the commit checked out in the git repository containing a folder,
+    without running git
 
-    def reset(self, window):
-        """
-        Creates a new, fresh output panel and output Queue object
+    :param folder:
+        A unicode string of a folder path
 
-        :param window:
-            The sublime.Window object the output panel is contained within
-        """
+    :return:
+        None if the folder is not in a git repository, otherwise a unicode
+        string of the commit hash, or the ref when it has no commits yet
+    """
 
-        if not isinstance(threading.current_thread(), threading._MainThread):
-            raise RuntimeError('GolangPanel.reset() must be run in the UI thread')
+    git_dir = None
+    current = folder
+    while True:
+        candidate = os.path.join(current, '.git')
+        if os.path.isdir(candidate):
+            git_dir = candidate
+            break
+        if os.path.isfile(candidate):
+            # Worktrees and submodules have a file pointing to the git dir
+            contents = _read_git_file(candidate)
+            if contents and contents.startswith('gitdir:'):
+                git_dir = os.path.normpath(os.path.join(current, contents[len('gitdir:'):].strip()))
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+
+    if git_dir is None:
+        return None
 
-        self.queue = queue.Queue()
-        self.panel = window.get_output_panel('golang_build')
+    head = _read_git_file(os.path.join(git_dir, 'HEAD'))
+    if head is None or not head.startswith('ref:'):
+        return head
+    ref = head[len('ref:'):].strip()
 
-        st_settings = sublime.load_settings('Preferences.sublime-settings')
-        panel_settings = self.panel.settings()
-        panel_settings.set('syntax', 'Packages/Golang Build/Golang Build Output.tmLanguage')
-        panel_settings.set('color_scheme', st_settings.get('color_scheme'))
-        panel_settings.set('result_file_regex', '^\s*(.+\.go):([0-9]+):(?:([0-9]+):)?\s*(.*)')
-        panel_settings.set('draw_white_space', 'selection')
-        panel_settings.set('word_wrap', False)
-        panel_settings.set("auto_indent", False)
-        panel_settings.set('line_numbers', False)
-        panel_settings.set('gutter', False)
-        panel_settings.set('scroll_past_end', False)
+    # Branches of worktrees are stored in the main git dir
+    common_dir = git_dir
+    common = _read_git_file(os.path.join(git_dir, 'commondir'))
+    if common:
+        common_dir = os.path.normpath(os.path.join(git_dir, common))
 
-    def set_base_dir(self, cwd):
-        """
-        Set the directory the process is being run in, for the sake of result
-        navigation
+    for base in (git_dir, common_dir):
+        commit = _read_git_file(os.path.join(base, *ref.split('/')))
+        if commit:
+            return commit
 
-        :param cwd:
-            A unicode string of the working directory
-        """
+    packed = _read_git_file(os.path.join(common_dir, 'packed-refs'))
+    for line in (packed or '').split('\n'):
+        if line.endswith(' ' + ref):
+            return line.split(' ')[0]
+    return ref
 
-        def _update_settings():
-            self.panel.settings().set('result_base_dir', cwd)
-        sublime.set_timeout(_update_settings, 1)
 
-    def write(self, string, content_separator=None, event=None):
-        """
-        Queues data to be written to the output panel. Normally this will be
-        called from a thread other than the UI thread.
+def _read_git_file(path):
+    """
+    Reads a small text file from a git dir
 
-        :param string:
-            A unicode string to write to the output panel
+    :param path:
+        A unicode string of the file path
 
-        :param content_separator:
-            A unicode string to prefix to the string param if there is already
-            output in the output panel. Is only prefixed if the previous number
-            of characters are not equal to this string.
+    :return:
+        None if the file could not be read, otherwise a unicode string of the
+        contents with surrounding whitespace removed
+    """
 
-        :param event:
-            An optional threading.Event() object to set once the data has been
-            written to the output panel
-        """
+    try:
+        with open(path, 'rb') as f:
+            return f.read().decode('utf-8').strip()
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
 
-        self.queue.put((string, content_separator, event))
-        sublime.set_timeout(self._process_queue, 1)
 
-    def _process_queue(self):
-        """
-        A callback that is run in the UI thread to actually perform writes to
-        the output panel. Reads from the queue until it is empty.
-        """
+def _change_count(view):
+    """
+    Returns a value that changes whenever the contents of a view change
 
-        try:
-            while True:
-                chars, content_separator, event = self.queue.get(False)
+    :param view:
+        A sublime.View object
 
-                if content_separator is not None and self.panel.size() > 0:
-                    end = self.panel.size()
-                    start = end - len(content_separator)
-                    if self.panel.substr(sublime.Region(start, end)) != content_separator:
-                        chars = content_separator + chars
+    :return:
+        An integer change count on Sublime Text 3, or a unicode string hash of
+        the view contents on Sublime Text 2
+    """
 
-                # In Sublime Text 2, the "insert" command does not handle newlines
-                if sys.version_info < (3,):
-                    edit = self.panel.begin_edit('golang_panel_print', [])
-                    self.panel.insert(edit, self.panel.size(), chars)
-                    self.panel.end_edit(edit)
+    if hasattr(view, 'change_count'):
+        return view.change_count()
+    contents = view.substr(sublime.Region(0, view.size()))
+    return hashlib.sha1(contents.encode('utf-8')).hexdigest()
 
-                else:
-                    self.panel.run_command('insert', {'characters': chars})
 
-                if event:
-                    event.set()
+def _temp_path(*parts):
+    """
+    Returns a directory inside of the temp directory managed by Golang Build,
+    creating it if necessary
 
-        except (queue.Empty):
-            pass
+    :param parts:
+        One or more unicode strings of path components
+
+    :return:
+        A unicode string of the directory path
+    """
 
+    path = os.path.join(tempfile.gettempdir(), 'golang_build', *parts)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
 
-def _run_process(task, window, args, cwd, env):
+
+def _remove_file(path):
     """
-    Starts a GolangProcess() and creates a GolangProcessPrinter() for it
+    Removes a file, ignoring errors if it does not exist
 
-    :param task:
-        A unicode string of the build task name - one of "build", "test",
-        "cross_compile", "install", "clean", "get"
+    :param path:
+        A unicode string of the file path to remove
+    """
 
-    :param window:
-        A sublime.Window object of the window to display the output panel in
+    try:
+        os.remove(path)
+    except (OSError):
+        pass
+
+
+def _run_capture(args, cwd, env):
+    """
+    Runs a process to completion and captures its output. Should not be run
+    in the UI thread.
 
     :param args:
         A list of strings (unicode for Python 3, byte string for Python 2)
@@ -1052,72 +10564,274 @@ def _run_process(task, window, args, cwd, env):
         to pass to the process as the environment variables
 
     :return:
-        A GolangProcess() object
+        A three-element tuple of the integer return code, and unicode strings
+        of stdout and stderr. The return code is -1 if the executable could
+        not be started.
     """
 
-    panel = _get_panel(window)
-
-    proc = GolangProcess(args, cwd, env)
+    startupinfo = None
+    if sys.platform == 'win32':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-    # If there is no printer using the panel, reset it
-    if panel.printer_lock.acquire(False):
-        panel.reset(window)
-        panel.printer_lock.release()
+    try:
+        proc = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            startupinfo=startupinfo
+        )
+    except (OSError) as e:
+        return (-1, '', str_cls(e))
+    stdout, stderr = proc.communicate()
+    return (proc.returncode, stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace'))
 
-    GolangProcessPrinter(proc, panel)
 
-    window.run_command('show_panel', {'panel': 'output.golang_build'})
+def _cpu_count():
+    """
+    :return:
+        An integer of the number of CPUs on the machine
+    """
 
-    return proc
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 2
 
 
-def _set_proc(window, proc):
+def _window_key(window):
     """
-    Sets the GolangProcess() object associated with a sublime.Window
+    Returns a value that identifies a window across Sublime Text restarts
 
     :param window:
         A sublime.Window object
 
-    :param proc:
-        A GolangProcess() object that is being run for the window
+    :return:
+        A unicode string of the project file, the first folder, or the window
+        ID if neither is available
     """
 
-    _PROCS[window.id()] = proc
+    if hasattr(window, 'project_file_name') and window.project_file_name():
+        return window.project_file_name()
+    folders = window.folders()
+    if folders:
+        return folders[0]
+    return str_cls(window.id())
 
 
-def _get_proc(window):
+def _results_key(window, working_dir):
     """
-    Returns the GolangProcess() object associated with a sublime.Window
+    Returns the key the test failures and benchmark results of a run are
+    stored under
 
     :param window:
         A sublime.Window object
 
+    :param working_dir:
+        A unicode string of the working directory of the run
+
     :return:
-        None or a GolangProcess() object. The GolangProcess() may or may not
-        still be running.
+        A unicode string
     """
 
-    return _PROCS.get(window.id())
+    return '%s\n%s' % (_window_key(window), working_dir)
 
 
-def _get_panel(window):
+def _storage_path(*parts):
     """
-    Returns the GolangPanel() object associated with a sublime.Window
+    Returns the path to a file used to persist information between Sublime
+    Text sessions, creating the containing directory if necessary
 
-    :param window:
-        A sublime.Window object
+    :param parts:
+        One or more unicode strings of path components
 
     :return:
-        A GolangPanel() object
+        A unicode string of the file path
     """
 
-    _PANEL_LOCK.acquire()
+    if hasattr(sublime, 'cache_path'):
+        base_dir = sublime.cache_path()
+    else:
+        base_dir = os.path.join(os.path.dirname(sublime.packages_path()), 'Cache')
+    path = os.path.join(base_dir, 'Golang Build', *parts)
+    dirname = os.path.dirname(path)
+    if not os.path.exists(dirname):
+        os.makedirs(dirname)
+    return path
+
+
+def _history_terms(line):
+    """
+    Finds the packages, tests and files an error line of output mentions
+
+    :param line:
+        A unicode string of a line of output
+
+    :return:
+        None if the line is not an error line, otherwise a list of unicode
+        strings
+    """
+
+    match = re.match('^FAIL\\s+(\\S+)', line)
+    if match and match.group(1) != '[build':
+        return [match.group(1)]
+    match = re.match('^\\s*--- FAIL: (\\S+)', line)
+    if match:
+        return [match.group(1)]
+    match = re.match('^# (\\S+)', line)
+    if match:
+        return [match.group(1)]
+    match = re.match('^\\s*(\\S+\\.go):\\d+(?::\\d+)?: ', line)
+    if match:
+        file_name = match.group(1).replace('\\', '/')
+        return [file_name, file_name.rsplit('/', 1)[-1]]
+    return None
+
+
+def _history_runs(query=None):
+    """
+    Lists the runs in the build history, newest first
+
+    :param query:
+        None or a unicode string - only runs with an error line mentioning a
+        package, test or file containing the string are returned
+
+    :return:
+        A list of dicts with the keys "id", "task", "command", "working_dir",
+        "started", "runtime", "result", "errors" and "size"
+    """
+
+    _STORAGE_LOCK.acquire()
     try:
-        if window.id() not in _PANELS:
-            _PANELS[window.id()] = GolangPanel(window)
-        return _PANELS.get(window.id())
+        index = _load_json(_storage_path('history', 'index.json'), {})
     finally:
-        _PANEL_LOCK.release()
+        _STORAGE_LOCK.release()
+
+    runs = index.get('runs', [])
+    if query:
+        ids = set()
+        for term, term_ids in index.get('terms', {}).items():
+            if query in term:
+                ids.update(term_ids)
+        runs = [run for run in runs if run['id'] in ids]
+    return list(reversed(runs))
+
+
+def _load_json(path, default):
+    """
+    Reads a JSON file written by _save_json()
+
+    :param path:
+        A unicode string of the file path
+
+    :param default:
+        The value to return if the file does not exist or is corrupt
+
+    :return:
+        The decoded JSON value
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        return default
+
+
+def _save_json(path, value):
+    """
+    Atomically writes a value to a JSON file
+
+    :param path:
+        A unicode string of the file path
+
+    :param value:
+        The value to encode as JSON
+    """
+
+    _replace_file(_write_json_temp(path, value), path)
+
+
+def _write_json_temp(path, value):
+    """
+    Writes a value to a temporary JSON file next to a path. The temporary
+    file is unique to the thread, so no lock needs to be held.
+
+    :param path:
+        A unicode string of the file path
+
+    :param value:
+        The value to encode as JSON
+
+    :return:
+        A unicode string of the path of the temporary file
+    """
+
+    temp_path = '%s.%s.tmp' % (path, threading.current_thread().ident)
+    with open(temp_path, 'wb') as f:
+        f.write(json.dumps(value).encode('utf-8'))
+    return temp_path
+
+
+def _replace_file(temp_path, path):
+    """
+    Renames a temporary file over a path
+
+    :param temp_path:
+        A unicode string of the path of the temporary file
+
+    :param path:
+        A unicode string of the path to replace
+    """
+
+    if sys.platform == 'win32':
+        _remove_file(path)
+    os.rename(temp_path, path)
+
+
+def _parse_rfc3339(value):
+    """
+    Parses an RFC 3339 timestamp, as written by Go's time.Time JSON encoding
+
+    :param value:
+        None or a unicode string of the timestamp
+
+    :return:
+        None if the value is missing or the zero time, otherwise a float of
+        the unix timestamp
+    """
+
+    if not value:
+        return None
+    match = re.match(
+        '^(\\d+)-(\\d+)-(\\d+)T(\\d+):(\\d+):(\\d+)(\\.\\d+)?(Z|([+-])(\\d+):(\\d+))$',
+        value
+    )
+    if not match:
+        return None
+    year = int(match.group(1))
+    if year <= 1:
+        return None
+    timestamp = calendar.timegm((
+        year,
+        int(match.group(2)),
+        int(match.group(3)),
+        int(match.group(4)),
+        int(match.group(5)),
+        int(match.group(6)),
+        0,
+        0,
+        0
+    ))
+    if match.group(7):
+        timestamp += float(match.group(7))
+    if match.group(9):
+        offset = int(match.group(10)) * 3600 + int(match.group(11)) * 60
+        timestamp -= offset if match.group(9) == '+' else -offset
+    return timestamp
 
 
 def _format_message(string):